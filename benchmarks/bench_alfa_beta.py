@@ -0,0 +1,177 @@
+"""
+IA de búsqueda alfa-beta (game.ai_rival.alpha_beta).
+Juega partidas sin pygame entre dos AIController, siguiendo el mismo protocolo
+que el estado en juego: una llamada a calcular_turno por acción y, tras mover o
+atacar, otra más si a la pieza le queda algo que hacer. Los bandos se alternan
+entre partidas para que la ventaja de la formación no cuente.
+Muestra las victorias de cada nivel contra SimpleAI, la profundidad media, los
+nodos por segundo y el uso de la tabla de transposición, y comprueba que ninguna
+decisión se pasa del tiempo asignado.
+Antes, a profundidad fija sobre posiciones de prueba, compara la búsqueda con y
+sin tabla (nodos y valor; una entrada más profunda de lo pedido puede mejorar el
+valor de una transposición) y comprueba que el hash incremental coincide siempre
+con el calculado desde cero.
+
+Uso: python -m benchmarks.bench_alfa_beta [partidas_por_nivel] [niveles...]
+(por defecto todos los niveles menos 'experto', que tarda varios segundos por turno)
+"""
+
+import statistics
+import sys
+import time
+
+from game.ai_rival import AIController, NIVELES
+from game.ai_rival.alpha_beta import BusquedaAlfaBeta
+from game.game_setup import crear_nuevo_juego, GeneradorPartida
+from game.logic import calcular_casillas_posibles, calcular_ataques_posibles
+from game.turn_actions import puede_mover, puede_atacar
+from game.turn_manager import TurnManager
+from game.turn_queue import TurnQueue
+from benchmarks.comun import generar_posiciones, piezas_de
+
+# Margen sobre el presupuesto de tiempo (el reloj se mira cada pocos nodos)
+MARGEN_SEGUNDOS = 0.05
+
+
+def jugar_partida(controladores, semilla, turnos_max=400, al_decidir=None):
+    """
+    Juega una partida; `controladores` es {jugador: AIController}.
+    `al_decidir(controlador, segundos)` se llama tras cada calcular_turno.
+    Devuelve (ganador o None, turnos jugados).
+    """
+    tablero = crear_nuevo_juego()
+    manager = TurnManager(tablero, GeneradorPartida(semilla))
+    cola = TurnQueue(manager)
+    for turno in range(1, turnos_max + 1):
+        pieza = cola.get_current_piece()
+        pieza.reiniciar_estado_turno()
+        controlador = controladores[pieza.jugador]
+        movimientos = calcular_casillas_posibles(pieza, tablero)
+        ataques = calcular_ataques_posibles(pieza, tablero)
+        while True:
+            inicio = time.perf_counter()
+            accion = controlador.calcular_turno(tablero, pieza, movimientos, ataques)
+            if al_decidir is not None:
+                al_decidir(controlador, time.perf_counter() - inicio)
+            if accion['tipo'] == 'mover':
+                assert accion['destino'] in movimientos, f"movimiento ilegal {accion}"
+                origen = pieza.posicion
+                fila, col = accion['destino']
+                tablero[origen[0]][origen[1]] = None
+                tablero[fila][col] = pieza
+                pieza.posicion = (fila, col)
+                pieza.ha_movido = True
+                movimientos = []
+                ataques = calcular_ataques_posibles(pieza, tablero) if puede_atacar(pieza) else []
+                if not ataques:
+                    break
+            elif accion['tipo'] == 'atacar':
+                assert accion['objetivo'] in ataques, f"ataque ilegal {accion}"
+                fila, col = accion['objetivo']
+                objetivo = tablero[fila][col]
+                pieza.ha_atacado = True
+                objetivo.hp -= pieza.atk
+                if not objetivo.esta_viva() and manager.registrar_muerte(objetivo):
+                    tablero[fila][col] = None
+                    cola.remove_dead_pieces()
+                if manager.ganador() is not None:
+                    return manager.ganador(), turno
+                ataques = []
+                movimientos = calcular_casillas_posibles(pieza, tablero) if puede_mover(pieza) else []
+                if not movimientos:
+                    break
+            else:
+                break
+        manager.programar_siguiente_turno(pieza)
+        cola.advance_turn()
+    return None, turnos_max
+
+
+class _BusquedaVerificada(BusquedaAlfaBeta):
+    """Comprueba el hash incremental en cada nodo."""
+
+    def _alfa_beta(self, profundidad, alfa, beta, ply):
+        assert self.hash == self.hash_desde_cero(), "hash incremental distinto del calculado desde cero"
+        return super()._alfa_beta(profundidad, alfa, beta, ply)
+
+
+def comparar_tabla(n_posiciones=10, profundidad=3):
+    """Búsqueda a profundidad fija con y sin tabla de transposición."""
+    nodos = {False: 0, True: 0}
+    tiempos = {False: 0.0, True: 0.0}
+    casos = iguales = 0
+    for tablero in generar_posiciones(n_posiciones, semilla=3):
+        TurnManager(tablero)  # ids y primer turno de cada pieza
+        piezas = piezas_de(tablero)
+        if len({pieza.jugador for pieza in piezas}) < 2:
+            continue
+        pieza = min(piezas, key=lambda p: (p.proximo_turno, p.id_pieza))
+        puntuaciones = []
+        for con_tabla in (False, True):
+            busqueda = _BusquedaVerificada(segundos=float('inf'), profundidad_max=profundidad,
+                                           cubos_tabla=1 << 16 if con_tabla else None)
+            inicio = time.perf_counter()
+            busqueda.buscar(tablero, pieza)
+            tiempos[con_tabla] += time.perf_counter() - inicio
+            nodos[con_tabla] += busqueda.estadisticas['nodos']
+            puntuaciones.append(busqueda.estadisticas['puntuacion'])
+        iguales += puntuaciones[0] == puntuaciones[1]
+        casos += 1
+    print(f"Tabla de transposición a profundidad {profundidad} (mismo valor con y sin tabla en {iguales} de {casos} posiciones): "
+          f"{nodos[False]} -> {nodos[True]} nodos, {tiempos[False]:.2f} -> {tiempos[True]:.2f} s; "
+          f"hash incremental verificado en cada nodo")
+
+
+def main():
+    n_partidas = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    niveles = sys.argv[2:] or [nivel for nivel in NIVELES if nivel != 'experto']
+
+    comparar_tabla()
+
+    for nivel in niveles:
+        segundos, max_nodos = NIVELES[nivel]
+        resultados = {'gana': 0, 'pierde': 0, 'tablas': 0}
+        profundidades, velocidades, tiempos, aciertos_tabla = [], [], [], []
+        tablas = []
+
+        def al_decidir(controlador, tiempo):
+            if controlador.busqueda is not None and controlador.busqueda.estadisticas:
+                estadisticas = controlador.busqueda.estadisticas
+                controlador.busqueda.estadisticas = {}
+                profundidades.append(estadisticas['profundidad'])
+                velocidades.append(estadisticas['nodos_por_segundo'])
+                aciertos_tabla.append(estadisticas['tasa_aciertos_tabla'])
+                tiempos.append(tiempo)
+
+        inicio = time.perf_counter()
+        turnos_totales = 0
+        for semilla in range(n_partidas):
+            equipo = 2 if semilla % 2 == 0 else 1
+            controladores = {
+                equipo: AIController(equipo, nivel=nivel),
+                3 - equipo: AIController(3 - equipo, rng=GeneradorPartida(semilla)),
+            }
+            ganador, turnos = jugar_partida(controladores, semilla, al_decidir=al_decidir)
+            tablas.append(controladores[equipo].busqueda.tabla)
+            turnos_totales += turnos
+            if ganador is None:
+                resultados['tablas'] += 1
+            else:
+                resultados['gana' if ganador == equipo else 'pierde'] += 1
+
+        presupuesto = f"{segundos:.2f} s" + (f", {max_nodos} nodos" if max_nodos else "")
+        print(f"{nivel} ({presupuesto}) contra SimpleAI: {resultados['gana']} ganadas, "
+              f"{resultados['pierde']} perdidas, {resultados['tablas']} sin terminar "
+              f"({turnos_totales} turnos, {time.perf_counter() - inicio:.1f} s)")
+        if tiempos:
+            print(f"  profundidad media {statistics.mean(profundidades):.2f} (máx. {max(profundidades)}), "
+                  f"{statistics.mean(velocidades):,.0f} nodos/s, "
+                  f"decisión media {statistics.mean(tiempos) * 1000:.0f} ms, máx. {max(tiempos) * 1000:.0f} ms")
+            print(f"  tabla de transposición: {statistics.mean(aciertos_tabla):.1%} de aciertos por búsqueda, "
+                  f"{statistics.mean(tabla.tasa_aciertos() for tabla in tablas):.1%} en toda la partida, "
+                  f"ocupación al final {statistics.mean(tabla.ocupacion() for tabla in tablas):.1%}")
+            assert max(tiempos) <= segundos + MARGEN_SEGUNDOS, "una decisión se pasó del presupuesto de tiempo"
+
+
+if __name__ == "__main__":
+    main()
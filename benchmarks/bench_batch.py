@@ -0,0 +1,96 @@
+"""
+Benchmark y comprobación de la generación por lotes con NumPy.
+Compara calcular_todos_movimientos con las funciones por pieza sobre posiciones
+aleatorias de distintas densidades (comprobación de propiedad: para cada pieza
+de cada posición las filas de las matrices deben coincidir exactamente) y
+después mide el tiempo por posición completa.
+
+Con --solo-comprobar hace únicamente la comprobación (sin medir tiempos) y
+termina con código 1 si alguna pieza difiere, indicando semilla, posición y
+pieza; sirve para repetirla sola cuando cambian las reglas.
+
+Uso: python -m benchmarks.bench_batch [--solo-comprobar] [num_posiciones]
+"""
+
+import sys
+import time
+
+from game.constants import COLUMNAS
+from game.logic import calcular_casillas_posibles, calcular_ataques_posibles, calcular_todos_movimientos
+from benchmarks.comun import generar_posiciones, piezas_de
+
+
+def casillas_de_fila(fila):
+    return {(i // COLUMNAS, i % COLUMNAS) for i in fila.nonzero()[0].tolist()}
+
+
+def generar_lotes(cantidad):
+    """Posiciones de distintas densidades: lista de (semilla, prob_baja, posiciones)."""
+    return [(semilla, prob_baja, generar_posiciones(cantidad // 4, semilla=semilla, prob_baja=prob_baja))
+            for semilla, prob_baja in enumerate((0.0, 0.3, 0.6, 0.9))]
+
+
+def comprobar_equivalencia(lotes):
+    """
+    Compara cada pieza con las funciones por pieza. Devuelve None si todo
+    coincide, o un texto con la semilla, la posición y la primera diferencia.
+    """
+    for semilla, prob_baja, posiciones in lotes:
+        for indice, tablero in enumerate(posiciones):
+            donde = f"semilla {semilla} (prob_baja {prob_baja}), posición {indice}"
+            piezas, movimientos, ataques = calcular_todos_movimientos(tablero)
+            if piezas != piezas_de(tablero):
+                return f"{donde}: las piezas no coinciden"
+            for i, pieza in enumerate(piezas):
+                obtenido, esperado = casillas_de_fila(movimientos[i]), set(calcular_casillas_posibles(pieza, tablero))
+                if obtenido != esperado:
+                    return (f"{donde}: movimientos difieren para {pieza} en {pieza.posicion}: "
+                            f"sobran {sorted(obtenido - esperado)}, faltan {sorted(esperado - obtenido)}")
+                obtenido, esperado = casillas_de_fila(ataques[i]), set(calcular_ataques_posibles(pieza, tablero))
+                if obtenido != esperado:
+                    return (f"{donde}: ataques difieren para {pieza} en {pieza.posicion}: "
+                            f"sobran {sorted(obtenido - esperado)}, faltan {sorted(esperado - obtenido)}")
+    return None
+
+
+def por_pieza(tablero):
+    for pieza in piezas_de(tablero):
+        calcular_casillas_posibles(pieza, tablero)
+        calcular_ataques_posibles(pieza, tablero)
+
+
+def medir(funcion, posiciones, repeticiones=5):
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for tablero in posiciones:
+            funcion(tablero)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor / len(posiciones) * 1e6
+
+
+def main():
+    argumentos = sys.argv[1:]
+    solo_comprobar = '--solo-comprobar' in argumentos
+    if solo_comprobar:
+        argumentos.remove('--solo-comprobar')
+    cantidad = int(argumentos[0]) if argumentos else 300
+    lotes = generar_lotes(cantidad)
+    posiciones = [tablero for _, _, tableros in lotes for tablero in tableros]
+
+    fallo = comprobar_equivalencia(lotes)
+    if fallo is not None:
+        print(f"Equivalencia FALLIDA: {fallo}")
+        sys.exit(1)
+    print(f"Equivalencia verificada en {len(posiciones)} posiciones aleatorias.\n")
+    if solo_comprobar:
+        return
+
+    t_pieza = medir(por_pieza, posiciones)
+    t_lote = medir(calcular_todos_movimientos, posiciones)
+    print(f"Por pieza: {t_pieza:9.1f} µs/posición")
+    print(f"Por lotes: {t_lote:9.1f} µs/posición  ({t_pieza / t_lote:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Analizador de equidad de turnos (game.turn_fairness).
+Imprime el informe por tipo para el ejército inicial y lo contrasta con una
+partida larga jugada con TurnManager y TurnQueue reales (bucle en Python):
+las cuotas de turnos deben coincidir salvo ruido estadístico.
+
+Uso: python -m benchmarks.bench_equidad_turnos [tics_por_replica] [replicas]
+"""
+
+import random
+import sys
+import time
+
+from game.game_setup import crear_nuevo_juego
+from game.turn_manager import TurnManager
+from game.turn_queue import TurnQueue
+from game.turn_fairness import equidad_por_tipo, informe_equidad
+from benchmarks.comun import piezas_de
+
+
+def cuotas_reales(tics, semilla=0):
+    """Cuota de turnos por tipo jugando TurnManager + TurnQueue hasta `tics`."""
+    manager = TurnManager(crear_nuevo_juego(), random.Random(semilla))
+    cola = TurnQueue(manager)
+    turnos = {}
+    while manager.reloj <= tics:
+        pieza = cola.get_current_piece()
+        turnos[pieza.nombre] = turnos.get(pieza.nombre, 0) + 1
+        manager.programar_siguiente_turno(pieza)
+        cola.advance_turn()
+    total = sum(turnos.values())
+    return {nombre: cantidad / total for nombre, cantidad in turnos.items()}
+
+
+def main():
+    tics = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    replicas = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    ejercito = piezas_de(crear_nuevo_juego())
+
+    inicio = time.perf_counter()
+    por_tipo = equidad_por_tipo(ejercito, tics=tics, replicas=replicas, semilla=1)
+    duracion = time.perf_counter() - inicio
+    print(informe_equidad(por_tipo))
+    print(f"\n{tics * replicas / 1e6:.1f} M tics ({replicas} réplicas) en {duracion:.2f} s\n")
+
+    inicio = time.perf_counter()
+    reales = cuotas_reales(2_000_000)
+    duracion = time.perf_counter() - inicio
+    print(f"TurnManager + TurnQueue, 2.0 M tics en {duracion:.2f} s:")
+    for nombre, datos in por_tipo.items():
+        print(f"  {nombre:<11} real {reales.get(nombre, 0):6.2%}   analizador {datos['cuota']:6.2%}")
+
+
+if __name__ == "__main__":
+    main()
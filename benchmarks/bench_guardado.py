@@ -0,0 +1,99 @@
+"""
+Guardado binario de partidas (game.save_game).
+- Guarda una partida larga a mitad de turno, la carga y comprueba que el estado
+  (tablero, piezas, reloj, cola, generador) es idéntico y que el historial
+  cargado deshace exactamente igual que el original.
+- Llena un directorio temporal con miles de partidas guardadas y compara el
+  tiempo de listarlas (solo cabeceras, vía mmap) con el de cargarlas enteras.
+
+Uso: python -m benchmarks.bench_guardado [numero_de_partidas]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from game.eventos import BusEventos
+from game.save_game import guardar_partida, cargar_partida, listar_partidas, LecturaPartida
+from benchmarks.bench_historial import jugar, huella
+
+
+def conectar(partida_cargada):
+    eventos = BusEventos()
+    partida_cargada['turn_manager'].conectar(eventos)
+    partida_cargada['turn_queue'].conectar(eventos)
+    partida_cargada['historial'].conectar(eventos)
+    return eventos
+
+
+def rebobinar(tablero, manager, cola, historial, eventos):
+    """Deshace hasta el principio y devuelve las huellas de cada parada."""
+    huellas = []
+    while historial.puede_deshacer():
+        ids = historial.deshacer(tablero)
+        eventos.emitir('deshacer', tablero)
+        cola.restaurar(ids)
+        pieza = cola.get_current_piece()
+        pieza.reiniciar_estado_turno()
+        eventos.emitir('turno', pieza, manager.reloj)
+        huellas.append(huella(tablero, manager, cola))
+    return huellas
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    directorio = tempfile.mkdtemp(prefix='gridfall_partidas_')
+    try:
+        partida = jugar(600, 11, 16 * 1024)
+        # A mitad de turno: la pieza activa ya se movió
+        pieza = partida.cola.get_current_piece()
+        pieza.ha_movido = True
+        ruta = guardar_partida(os.path.join(directorio, 'prueba.gfsave'), partida.manager, partida.cola,
+                               partida.historial, vs_ia=True, motor_ia='mcts')
+        print(f"Partida de 600 turnos guardada en {os.path.getsize(ruta)} bytes")
+
+        cargada = cargar_partida(ruta)
+        original = huella(partida.tablero, partida.manager, partida.cola)
+        assert huella(cargada['tablero'], cargada['turn_manager'], cargada['turn_queue']) == original
+        assert cargada['turn_queue'].get_current_piece().ha_movido and cargada['vs_ia']
+        assert cargada['motor_ia'] == 'mcts'
+        assert cargada['historial'].exportar() == partida.historial.exportar()
+        pieza.ha_movido = False
+        cargada['turn_queue'].get_current_piece().ha_movido = False
+        paradas_original = rebobinar(partida.tablero, partida.manager, partida.cola, partida.historial, partida.eventos)
+        paradas_cargada = rebobinar(cargada['tablero'], cargada['turn_manager'], cargada['turn_queue'],
+                                    cargada['historial'], conectar(cargada))
+        assert paradas_original == paradas_cargada
+        print(f"Estado y historial idénticos tras cargar ({len(paradas_cargada)} pasos de deshacer comparados)\n")
+
+        for i in range(cantidad):
+            shutil.copyfile(ruta, os.path.join(directorio, f"copia_{i}.gfsave"))
+
+        inicio = time.perf_counter()
+        cabeceras = listar_partidas(directorio)
+        t_listar = time.perf_counter() - inicio
+        assert len(cabeceras) == cantidad + 1
+
+        muestra = cabeceras[:200]
+        inicio = time.perf_counter()
+        for cabecera in muestra:
+            cargar_partida(cabecera.ruta)
+        t_cargar = (time.perf_counter() - inicio) / len(muestra) * len(cabeceras)
+
+        inicio = time.perf_counter()
+        for cabecera in muestra:
+            with LecturaPartida(cabecera.ruta) as lectura:
+                lectura.piezas()
+        t_piezas = (time.perf_counter() - inicio) / len(muestra) * len(cabeceras)
+
+        print(f"Listar {len(cabeceras)} partidas (solo cabeceras): {t_listar * 1000:8.1f} ms")
+        print(f"Decodificar solo las piezas de todas (estimado):  {t_piezas * 1000:8.1f} ms")
+        print(f"Cargarlas enteras (estimado):                     {t_cargar * 1000:8.1f} ms")
+    finally:
+        shutil.rmtree(directorio)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Historial de deshacer/rehacer (game.undo_log) en partidas largas.
+Juega una partida sin interfaz (acciones al azar, pocas bajas para que dure
+cientos de turnos), con un presupuesto de memoria pequeño para forzar el
+plegado en fotogramas clave. Después rebobina hasta el primer turno y vuelve a
+avanzar hasta el último, comprobando en cada parada que el estado (tablero,
+piezas, reloj, cola y generador) es exactamente el que hubo en ese turno.
+
+Uso: python -m benchmarks.bench_historial [turnos] [presupuesto_bytes]
+"""
+
+import copy
+import random
+import sys
+import time
+import tracemalloc
+
+from game.eventos import BusEventos
+from game.game_setup import crear_nuevo_juego, GeneradorPartida
+from game.logic import calcular_casillas_posibles, calcular_ataques_posibles
+from game.turn_manager import TurnManager
+from game.turn_queue import TurnQueue
+from game.undo_log import HistorialDeshacer
+
+
+def huella(tablero, manager, cola):
+    return (manager.reloj, tuple(cola.ids()), manager.rng.getstate(),
+            tuple(sorted((p.id_pieza, p.posicion, p.hp, p.proximo_turno) for p in manager.registro)),
+            tuple(tuple(p.id_pieza if p else None for p in fila) for fila in tablero))
+
+
+class Partida:
+    def __init__(self, semilla, presupuesto):
+        self.tablero = crear_nuevo_juego()
+        self.manager = TurnManager(self.tablero, GeneradorPartida(semilla))
+        self.cola = TurnQueue(self.manager)
+        self.eventos = BusEventos()
+        self.manager.conectar(self.eventos)
+        self.cola.conectar(self.eventos)
+        self.historial = HistorialDeshacer(self.manager, self.cola, presupuesto_bytes=presupuesto)
+        self.historial.conectar(self.eventos)
+
+    def empezar_turno(self):
+        pieza = self.cola.get_current_piece()
+        pieza.reiniciar_estado_turno()
+        self.eventos.emitir('turno', pieza, self.manager.reloj)
+        return pieza
+
+    def jugar_turno(self, pieza, rng):
+        tablero, eventos = self.tablero, self.eventos
+        ataques = calcular_ataques_posibles(pieza, tablero)
+        movimientos = calcular_casillas_posibles(pieza, tablero)
+        if ataques and rng.random() < 0.05:
+            fila, col = rng.choice(ataques)
+            objetivo = tablero[fila][col]
+            objetivo.hp -= pieza.atk
+            eventos.emitir('dano', objetivo, pieza.atk)
+            if not objetivo.esta_viva() and self.manager.registrar_muerte(objetivo):
+                tablero[fila][col] = None
+                eventos.emitir('muerte', objetivo, (fila, col))
+        elif movimientos and rng.random() < 0.9:
+            origen = pieza.posicion
+            fila, col = rng.choice(movimientos)
+            tablero[origen[0]][origen[1]] = None
+            tablero[fila][col] = pieza
+            pieza.posicion = (fila, col)
+            eventos.emitir('movimiento', pieza, origen, (fila, col))
+        self.manager.programar_siguiente_turno(pieza)
+        self.cola.advance_turn()
+
+    def mover_historial(self, rehacer):
+        historial = self.historial
+        ids = historial.rehacer(self.tablero) if rehacer else historial.deshacer(self.tablero)
+        self.eventos.emitir('deshacer', self.tablero)
+        self.cola.restaurar(ids)
+        self.empezar_turno()
+
+
+def jugar(turnos, semilla, presupuesto, huellas=None):
+    """Juega hasta `turnos` turnos (o el final) y deja empezado el siguiente."""
+    rng = random.Random(semilla)
+    partida = Partida(semilla, presupuesto)
+    for _ in range(turnos):
+        pieza = partida.empezar_turno()
+        if huellas is not None:
+            huellas.append(huella(partida.tablero, partida.manager, partida.cola))
+        if partida.manager.ganador() is not None:
+            return partida
+        partida.jugar_turno(pieza, rng)
+    partida.empezar_turno()
+    if huellas is not None:
+        huellas.append(huella(partida.tablero, partida.manager, partida.cola))
+    return partida
+
+
+def memoria_de(funcion):
+    """Memoria que queda reservada tras llamar a funcion() (y su resultado)."""
+    tracemalloc.start()
+    resultado = funcion()
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return memoria, resultado
+
+
+def main():
+    turnos = int(sys.argv[1]) if len(sys.argv) > 1 else 1500
+    presupuesto = int(sys.argv[2]) if len(sys.argv) > 2 else 32 * 1024
+
+    # Memoria: partida completa con el historial, frente a una copia profunda por turno
+    inicio = time.perf_counter()
+    memoria, partida = memoria_de(lambda: jugar(turnos, 7, presupuesto))
+    duracion = time.perf_counter() - inicio
+    copia, _ = memoria_de(lambda: (copy.deepcopy(partida.tablero), copy.deepcopy(partida.manager.piezas_en_juego)))
+    print(f"{turnos} turnos jugados en {duracion:.2f} s")
+    datos = partida.historial.estadisticas()
+    print(f"Historial: {datos['bytes'] / 1024:.1f} KB empaquetados (presupuesto {presupuesto / 1024:.0f} KB), "
+          f"{datos['turnos_con_deltas']} turnos con deltas, {datos['fotogramas_clave']} fotogramas clave, "
+          f"{datos['bloques_rng']} bloques del generador")
+    # Los bloques del generador que ya no usa ningún turno se descartan al plegar
+    assert datos['bytes'] <= presupuesto and datos['turnos_con_deltas'] > 0, "el historial no respeta el presupuesto"
+    print(f"Memoria de toda la partida con historial: {memoria / 1024:.0f} KB")
+    print(f"Una copia profunda por turno (historial anterior): {copia / 1024:.1f} KB por turno, "
+          f"{copia * turnos / 1024 ** 2:.1f} MB para {turnos} turnos\n")
+
+    # Verificación: rebobinar hasta el primer turno y volver
+    huellas = []
+    partida = jugar(turnos, 7, presupuesto, huellas)
+    historial = partida.historial
+    indices = {h: i for i, h in enumerate(huellas)}
+
+    # Rebobinar hasta el primer turno
+    visitados = [len(huellas) - 1]
+    inicio = time.perf_counter()
+    while historial.puede_deshacer():
+        partida.mover_historial(rehacer=False)
+        indice = indices.get(huella(partida.tablero, partida.manager, partida.cola))
+        assert indice is not None and indice < visitados[-1], "estado al deshacer que no corresponde a ningún turno"
+        visitados.append(indice)
+    duracion = time.perf_counter() - inicio
+    assert visitados[-1] == 0, "no se pudo volver al primer turno"
+    print(f"Rebobinado al turno 1 en {len(visitados) - 1} pasos ({duracion * 1000:.1f} ms); "
+          f"cada paso deja un turno jugado exacto")
+
+    # Y avanzar de nuevo hasta el final
+    pasos = 0
+    while historial.puede_rehacer():
+        partida.mover_historial(rehacer=True)
+        pasos += 1
+        assert huella(partida.tablero, partida.manager, partida.cola) == huellas[visitados[-1 - pasos]]
+    assert pasos == len(visitados) - 1
+    print(f"Rehecho hasta el último turno en {pasos} pasos, mismas paradas que al rebobinar")
+
+
+if __name__ == "__main__":
+    main()
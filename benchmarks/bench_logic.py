@@ -0,0 +1,65 @@
+"""
+Benchmark de la generación de movimientos y ataques.
+Compara la implementación original (referencia_logic) con la actual de game/logic.py,
+con y sin el backend de bitboards, y comprueba antes que todas devuelven
+exactamente las mismas casillas.
+
+Uso: python -m benchmarks.bench_logic
+"""
+
+import time
+
+from game import logic
+from game.bitboard import Bitboard
+from benchmarks import referencia_logic
+from benchmarks.comun import generar_posiciones, piezas_de, medir
+
+
+FUNCIONES = ('calcular_casillas_posibles', 'calcular_ataques_posibles')
+
+
+def comprobar_equivalencia(casos, bitboards):
+    """Lanza AssertionError si alguna pieza obtiene casillas distintas."""
+    for pieza, tablero in casos:
+        for nombre in FUNCIONES:
+            esperado = set(getattr(referencia_logic, nombre)(pieza, tablero))
+            obtenido = set(getattr(logic, nombre)(pieza, tablero))
+            assert esperado == obtenido, f"{nombre} difiere para {pieza} en {pieza.posicion}"
+            obtenido_bits = getattr(logic, nombre)(pieza, tablero, bitboards[id(tablero)])
+            assert esperado == set(obtenido_bits), f"{nombre} (bitboard) difiere para {pieza} en {pieza.posicion}"
+
+
+def posiciones_por_segundo(posiciones, usar_bitboard):
+    """Posiciones completas (movimientos y ataques de todas las piezas) evaluadas por segundo."""
+    inicio = time.perf_counter()
+    for tablero in posiciones:
+        bitboard = Bitboard.desde_tablero(tablero) if usar_bitboard else None
+        for pieza in piezas_de(tablero):
+            logic.calcular_casillas_posibles(pieza, tablero, bitboard)
+            logic.calcular_ataques_posibles(pieza, tablero, bitboard)
+    return len(posiciones) / (time.perf_counter() - inicio)
+
+
+def main():
+    posiciones = generar_posiciones(200)
+    casos = [(pieza, tablero) for tablero in posiciones for pieza in piezas_de(tablero)]
+    bitboards = {id(tablero): Bitboard.desde_tablero(tablero) for tablero in posiciones}
+
+    comprobar_equivalencia(casos, bitboards)
+    print(f"Equivalencia verificada en {len(casos)} piezas de {len(posiciones)} posiciones.\n")
+
+    print(f"{'función':<30}{'referencia':>14}{'tablas':>14}{'bitboard':>14}")
+    for nombre in FUNCIONES:
+        funcion = getattr(logic, nombre)
+        t_ref = medir(getattr(referencia_logic, nombre), casos)
+        t_act = medir(funcion, casos)
+        t_bits = medir(lambda pieza, tablero: funcion(pieza, tablero, bitboards[id(tablero)]), casos)
+        print(f"{nombre:<30}{t_ref:>11.2f} µs{t_act:>11.2f} µs{t_bits:>11.2f} µs")
+
+    print()
+    print(f"Posiciones/s (listas):   {posiciones_por_segundo(posiciones, False):>10.0f}")
+    print(f"Posiciones/s (bitboard): {posiciones_por_segundo(posiciones, True):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
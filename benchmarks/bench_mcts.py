@@ -0,0 +1,84 @@
+"""
+IA de Monte Carlo (game.ai_rival.mcts).
+Primero mide el rendimiento del motor (simulaciones por segundo) con un número
+fijo de simulaciones sobre posiciones de prueba, para seguir su evolución sin
+depender del reloj. Después juega partidas sin pygame contra SimpleAI y contra
+la búsqueda alfa-beta del mismo nivel (ver bench_alfa_beta.jugar_partida).
+
+Uso: python -m benchmarks.bench_mcts [partidas] [nivel]
+"""
+
+import random
+import statistics
+import sys
+import time
+
+from game.ai_rival import AIController
+from game.ai_rival.mcts import BusquedaMCTS, NIVELES
+from game.game_setup import GeneradorPartida
+from game.turn_manager import TurnManager
+from benchmarks.bench_alfa_beta import jugar_partida
+from benchmarks.comun import generar_posiciones, piezas_de
+
+
+def medir_rendimiento(n_posiciones=20, simulaciones=300):
+    """Simulaciones por segundo con un presupuesto fijo de simulaciones."""
+    busqueda = BusquedaMCTS(segundos=float('inf'), max_simulaciones=simulaciones, rng=random.Random(1))
+    total_simulaciones = total_segundos = 0
+    for tablero in generar_posiciones(n_posiciones, semilla=7):
+        TurnManager(tablero)  # ids y primer turno de cada pieza
+        piezas = piezas_de(tablero)
+        if len({pieza.jugador for pieza in piezas}) < 2:
+            continue
+        pieza = min(piezas, key=lambda p: (p.proximo_turno, p.id_pieza))
+        inicio = time.perf_counter()
+        busqueda.buscar(tablero, pieza)
+        total_segundos += time.perf_counter() - inicio
+        total_simulaciones += busqueda.estadisticas['simulaciones']
+    return total_simulaciones, total_segundos
+
+
+def enfrentar(nivel, rival, n_partidas):
+    """MCTS contra `rival(equipo, semilla)`; devuelve (ganadas, perdidas, sin terminar, estadísticas)."""
+    resultados = [0, 0, 0]
+    estadisticas = []
+
+    def al_decidir(controlador, tiempo):
+        if controlador.motor == 'mcts' and controlador.busqueda.estadisticas:
+            estadisticas.append(controlador.busqueda.estadisticas)
+            controlador.busqueda.estadisticas = {}
+
+    for semilla in range(n_partidas):
+        equipo = 2 if semilla % 2 == 0 else 1
+        controladores = {equipo: AIController(equipo, nivel=nivel, motor='mcts'),
+                         3 - equipo: rival(3 - equipo, semilla)}
+        ganador, _ = jugar_partida(controladores, semilla, al_decidir=al_decidir)
+        resultados[2 if ganador is None else (0 if ganador == equipo else 1)] += 1
+    return resultados, estadisticas
+
+
+def main():
+    n_partidas = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    nivel = sys.argv[2] if len(sys.argv) > 2 else 'normal'
+
+    simulaciones, segundos = medir_rendimiento()
+    print(f"Rendimiento: {simulaciones} simulaciones en {segundos:.2f} s, "
+          f"{simulaciones / segundos:,.0f} simulaciones/s")
+
+    rivales = {
+        'SimpleAI': lambda equipo, semilla: AIController(equipo, rng=GeneradorPartida(semilla)),
+        f'alfa-beta ({nivel})': lambda equipo, semilla: AIController(equipo, nivel=nivel, motor='alfa_beta'),
+    }
+    for nombre, rival in rivales.items():
+        inicio = time.perf_counter()
+        (ganadas, perdidas, sin_terminar), estadisticas = enfrentar(nivel, rival, n_partidas)
+        print(f"MCTS {nivel} ({NIVELES[nivel][0]:.2f} s) contra {nombre}: {ganadas} ganadas, {perdidas} perdidas, "
+              f"{sin_terminar} sin terminar ({time.perf_counter() - inicio:.1f} s)")
+        if estadisticas:
+            print(f"  {statistics.mean(e['simulaciones'] for e in estadisticas):.0f} simulaciones por turno, "
+                  f"{statistics.mean(e['simulaciones_por_segundo'] for e in estadisticas):,.0f} simulaciones/s, "
+                  f"decisión máx. {max(e['segundos'] for e in estadisticas) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark del mapa de alcance incremental.
+Juega movimientos al azar y, tras cada uno, consulta movimientos y ataques de
+todas las piezas: recalculando desde cero o leyendo del MapaAlcance.
+También comprueba que ambas vías devuelven siempre las mismas casillas.
+
+Uso: python -m benchmarks.bench_reach_map
+"""
+
+import random
+import time
+
+from game.logic import calcular_casillas_posibles, calcular_ataques_posibles
+from game.game_setup import crear_nuevo_juego, crear_estructuras_partida
+from benchmarks.comun import piezas_de
+
+
+def jugar(pasos, semilla, usar_mapa, verificar=False):
+    rng = random.Random(semilla)
+    tablero = crear_nuevo_juego()
+    estructuras = crear_estructuras_partida(tablero)
+    eventos, mapa = estructuras['eventos'], estructuras['mapa_alcance']
+
+    inicio = time.perf_counter()
+    for _ in range(pasos):
+        for pieza in piezas_de(tablero):
+            if usar_mapa:
+                movimientos, ataques = mapa.movimientos(pieza), mapa.ataques(pieza)
+            else:
+                movimientos = calcular_casillas_posibles(pieza, tablero)
+                ataques = calcular_ataques_posibles(pieza, tablero)
+            if verificar:
+                assert set(movimientos) == set(calcular_casillas_posibles(pieza, tablero))
+                assert set(ataques) == set(calcular_ataques_posibles(pieza, tablero))
+
+        pieza = rng.choice(piezas_de(tablero))
+        ataques = calcular_ataques_posibles(pieza, tablero)
+        movimientos = calcular_casillas_posibles(pieza, tablero)
+        if ataques:
+            f, c = rng.choice(ataques)
+            victima = tablero[f][c]
+            tablero[f][c] = None
+            eventos.emitir('muerte', victima, (f, c))
+        elif movimientos:
+            origen = pieza.posicion
+            f, c = rng.choice(movimientos)
+            tablero[origen[0]][origen[1]] = None
+            tablero[f][c] = pieza
+            pieza.posicion = (f, c)
+            eventos.emitir('movimiento', pieza, origen, (f, c))
+    return time.perf_counter() - inicio
+
+
+def main():
+    for semilla in range(5):
+        jugar(40, semilla, usar_mapa=True, verificar=True)
+    print("Equivalencia verificada en 5 partidas aleatorias.\n")
+
+    t_completo = sum(jugar(40, semilla, usar_mapa=False) for semilla in range(20))
+    t_mapa = sum(jugar(40, semilla, usar_mapa=True) for semilla in range(20))
+    print(f"Recalculo completo: {t_completo * 1000:8.1f} ms")
+    print(f"MapaAlcance:        {t_mapa * 1000:8.1f} ms  ({t_completo / t_mapa:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
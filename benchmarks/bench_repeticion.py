@@ -0,0 +1,195 @@
+"""
+Repeticiones (game.replay): grabación en segundo plano, motor sin interfaz y
+línea temporal con fotogramas clave.
+Juega partidas sin pygame siguiendo el mismo protocolo de eventos que el estado
+en juego (el jugador 2 decide con el generador de la partida, como la IA, y de
+vez en cuando se deshace o rehace un turno). Cada partida se graba, se vuelve a
+ejecutar con MotorRepeticion y se comprueba que el estado final y el ganador
+son exactamente los de la partida jugada. También se prueba un archivo cortado
+a la mitad (como si el juego se hubiera cerrado de golpe).
+Después se juega una partida larga y se salta con LineaTemporal a turnos al
+azar, comparando cada uno con el estado que hubo al empezar ese turno.
+
+Uso: python -m benchmarks.bench_repeticion [partidas] [turnos_max]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from game.eventos import BusEventos
+from game.game_setup import crear_nuevo_juego, GeneradorPartida
+from game.logic import calcular_casillas_posibles, calcular_ataques_posibles
+from game.replay import GrabadorRepeticion, MotorRepeticion, LineaTemporal, leer_repeticion
+from game.turn_manager import TurnManager
+from game.turn_queue import TurnQueue
+from game.undo_log import HistorialDeshacer
+from benchmarks.bench_historial import huella
+
+
+class PartidaGrabada:
+    def __init__(self, semilla, ruta, prob_ataque=0.7):
+        self.prob_ataque = prob_ataque
+        self.tablero = crear_nuevo_juego()
+        self.manager = TurnManager(self.tablero, GeneradorPartida(semilla))
+        self.cola = TurnQueue(self.manager)
+        self.historial = HistorialDeshacer(self.manager, self.cola)
+        self.eventos = BusEventos()
+        self.manager.conectar(self.eventos)
+        self.cola.conectar(self.eventos)
+        self.historial.conectar(self.eventos)
+        self.grabador = GrabadorRepeticion(ruta, self.manager, self.cola, self.historial, vs_ia=True)
+        self.grabador.conectar(self.eventos)
+
+    def empezar_turno(self):
+        pieza = self.cola.get_current_piece()
+        pieza.reiniciar_estado_turno()
+        self.eventos.emitir('turno', pieza, self.manager.reloj)
+        return pieza
+
+    def jugar_turno(self, pieza, rng_jugador):
+        # El jugador 2 "piensa" con el generador de la partida, como AIController
+        rng = self.manager.rng if pieza.jugador == 2 else rng_jugador
+        tablero, eventos = self.tablero, self.eventos
+        movimientos = calcular_casillas_posibles(pieza, tablero)
+        if movimientos and rng.random() < 0.8:
+            origen = pieza.posicion
+            fila, col = rng.choice(movimientos)
+            tablero[origen[0]][origen[1]] = None
+            tablero[fila][col] = pieza
+            pieza.posicion = (fila, col)
+            pieza.ha_movido = True
+            eventos.emitir('movimiento', pieza, origen, (fila, col))
+        ataques = calcular_ataques_posibles(pieza, tablero)
+        if ataques and rng.random() < self.prob_ataque:
+            fila, col = rng.choice(ataques)
+            objetivo = tablero[fila][col]
+            pieza.ha_atacado = True
+            eventos.emitir('ataque', pieza, (fila, col))
+            objetivo.hp -= pieza.atk
+            eventos.emitir('dano', objetivo, pieza.atk)
+            if not objetivo.esta_viva() and self.manager.registrar_muerte(objetivo):
+                tablero[fila][col] = None
+                eventos.emitir('muerte', objetivo, (fila, col))
+        if self.manager.ganador() is not None:
+            return
+        eventos.emitir('fin_turno', pieza)
+        self.manager.programar_siguiente_turno(pieza)
+        self.cola.advance_turn()
+
+    def mover_historial(self, rehacer):
+        historial = self.historial
+        ids = historial.rehacer(self.tablero) if rehacer else historial.deshacer(self.tablero)
+        self.eventos.emitir('historial', 'rehacer' if rehacer else 'deshacer')
+        self.eventos.emitir('deshacer', self.tablero)
+        self.cola.restaurar(ids)
+
+
+def jugar(semilla, ruta, turnos_max, prob_ataque=0.7, huellas=None):
+    """
+    Juega y graba una partida; devuelve (partida, segundos dentro del grabador).
+    En `huellas` deja el estado al empezar cada turno (el primero es el 1).
+    """
+    rng = random.Random(semilla)
+    partida = PartidaGrabada(semilla, ruta, prob_ataque)
+    for _ in range(turnos_max):
+        pieza = partida.empezar_turno()
+        if huellas is not None:
+            huellas.append(huella(partida.tablero, partida.manager, partida.cola))
+        partida.jugar_turno(pieza, rng)
+        if partida.manager.ganador() is not None:
+            break
+        if rng.random() < 0.05 and partida.historial.puede_deshacer():
+            partida.mover_historial(rehacer=False)
+            if rng.random() < 0.5 and partida.historial.puede_rehacer():
+                partida.mover_historial(rehacer=True)
+    inicio = time.perf_counter()
+    partida.grabador.cerrar(partida.manager.ganador())
+    return partida, time.perf_counter() - inicio
+
+
+def main():
+    n_partidas = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    turnos_max = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+
+    with tempfile.TemporaryDirectory() as directorio:
+        total_turnos = total_registros = total_bytes = 0
+        tiempo_juego = tiempo_cierre = tiempo_motor = 0.0
+        ganadas = {1: 0, 2: 0, None: 0}
+        for semilla in range(n_partidas):
+            ruta = os.path.join(directorio, f"partida_{semilla}.gfreplay")
+            inicio = time.perf_counter()
+            partida, cierre = jugar(semilla, ruta, turnos_max)
+            tiempo_juego += time.perf_counter() - inicio - cierre
+            tiempo_cierre += cierre
+
+            motor = MotorRepeticion(ruta)
+            resultado = motor.reproducir()
+            tiempo_motor += resultado['segundos']
+            assert huella(motor.tablero, motor.turn_manager, motor.turn_queue) == \
+                huella(partida.tablero, partida.manager, partida.cola), f"partida {semilla}: estado final distinto"
+            assert resultado['ganador'] == partida.manager.ganador() and resultado['completa']
+            ganadas[resultado['ganador']] += 1
+            total_turnos += resultado['turnos']
+            total_registros += resultado['registros']
+            total_bytes += os.path.getsize(ruta)
+
+        print(f"{n_partidas} partidas ({total_turnos} turnos, {total_registros} registros), "
+              f"ganador J1/J2/sin terminar: {ganadas[1]}/{ganadas[2]}/{ganadas[None]}")
+        print(f"Repeticiones en disco: {total_bytes / 1024:.1f} KB, {total_bytes / max(total_turnos, 1):.1f} bytes por turno")
+        print(f"Juego con grabación: {tiempo_juego * 1e6 / total_turnos:.1f} µs por turno; "
+              f"cerrar (esperar al hilo escritor): {tiempo_cierre * 1000 / n_partidas:.2f} ms por partida")
+        print(f"Motor sin interfaz: {total_turnos / tiempo_motor:,.0f} turnos/s; "
+              f"todas las repeticiones reproducen el mismo estado final y ganador")
+
+        # Archivo cortado: se lee hasta el último lote completo y sigue siendo coherente
+        ruta = os.path.join(directorio, "partida_0.gfreplay")
+        with open(ruta, 'rb') as archivo:
+            datos = archivo.read()
+        cortada = os.path.join(directorio, "cortada.gfreplay")
+        with open(cortada, 'wb') as archivo:
+            archivo.write(datos[:len(datos) // 2])
+        _, registros = leer_repeticion(ruta)
+        motor = MotorRepeticion(cortada)
+        resultado = motor.reproducir()
+        assert not resultado['completa']
+        print(f"Archivo cortado a la mitad: {len(motor.registros)} de {len(registros)} registros legibles, "
+              f"{resultado['turnos']} turnos reproducidos sin divergencias")
+
+        # Línea temporal: partida larga y saltos a turnos al azar
+        ruta = os.path.join(directorio, "larga.gfreplay")
+        huellas = [None]
+        partida, _ = jugar(1234, ruta, turnos_max, prob_ataque=0.03, huellas=huellas)
+        turnos = len(huellas) - 1
+        rng = random.Random(1)
+        with LineaTemporal(ruta) as linea:
+            assert linea.turnos == turnos
+            destinos = [rng.randint(1, turnos) for _ in range(300)] + [1, turnos]
+            tiempos = []
+            for turno in destinos:
+                inicio = time.perf_counter()
+                motor = linea.motor_en_turno(turno)
+                tiempos.append(time.perf_counter() - inicio)
+                assert huella(motor.tablero, motor.turn_manager, motor.turn_queue) == huellas[turno], \
+                    f"turno {turno}: estado distinto del jugado"
+            # Avanzar de uno en uno (como el deslizador) reutiliza el motor del tramo
+            inicio = time.perf_counter()
+            for turno in range(1, turnos + 1):
+                linea.motor_en_turno(turno)
+            paso_a_paso = (time.perf_counter() - inicio) / turnos
+            n_claves = len(linea.claves)
+        inicio = time.perf_counter()
+        MotorRepeticion(ruta).reproducir()
+        desde_cero = time.perf_counter() - inicio
+        print(f"\nLínea temporal: partida de {turnos} turnos, {n_claves} fotogramas clave, "
+              f"{os.path.getsize(ruta) / 1024:.1f} KB")
+        print(f"Saltar a un turno al azar: {sum(tiempos) / len(tiempos) * 1000:.2f} ms de media, "
+              f"{max(tiempos) * 1000:.2f} ms como mucho (reproducir desde el principio: {desde_cero * 1000:.0f} ms)")
+        print(f"Avanzar turno a turno: {paso_a_paso * 1e6:.0f} µs por turno; "
+              f"{len(destinos)} saltos con el mismo estado que al jugar")
+
+
+if __name__ == "__main__":
+    main()
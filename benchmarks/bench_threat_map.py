@@ -0,0 +1,76 @@
+"""
+Benchmark del mapa de amenazas (ThreatMap).
+Juega movimientos al azar y, tras cada uno, pregunta qué casillas de movimiento
+de una pieza son seguras: recalculando la zona de ataque de cada enemigo para
+cada casilla candidata, o consultando el ThreatMap mantenido por eventos.
+También comprueba que el mapa incremental coincide con uno reconstruido.
+
+Uso: python -m benchmarks.bench_threat_map
+"""
+
+import random
+import time
+
+from game.logic import calcular_casillas_posibles, calcular_ataques_posibles, ThreatMap
+from game.game_setup import crear_nuevo_juego, crear_estructuras_partida
+from benchmarks.comun import piezas_de
+
+
+def segura_sin_mapa(casilla, pieza, tablero):
+    for otra in piezas_de(tablero):
+        if otra.jugador != pieza.jugador and casilla in otra.plan_ataque.zona(otra, tablero):
+            return False
+    return True
+
+
+def jugar(pasos, semilla, usar_mapa, verificar=False):
+    rng = random.Random(semilla)
+    tablero = crear_nuevo_juego()
+    estructuras = crear_estructuras_partida(tablero)
+    eventos, amenazas = estructuras['eventos'], estructuras['mapa_amenazas']
+
+    inicio = time.perf_counter()
+    for _ in range(pasos):
+        pieza = rng.choice(piezas_de(tablero))
+        movimientos = calcular_casillas_posibles(pieza, tablero)
+        if usar_mapa:
+            seguras = [casilla for casilla in movimientos if amenazas.es_segura(casilla, pieza.jugador)]
+        else:
+            seguras = [casilla for casilla in movimientos if segura_sin_mapa(casilla, pieza, tablero)]
+
+        if verificar:
+            assert seguras == [casilla for casilla in movimientos if segura_sin_mapa(casilla, pieza, tablero)]
+            referencia = ThreatMap(tablero)
+            for fila in range(len(tablero)):
+                for col in range(len(tablero[0])):
+                    assert amenazas.atacantes((fila, col)) == referencia.atacantes((fila, col))
+
+        ataques = calcular_ataques_posibles(pieza, tablero)
+        if ataques:
+            f, c = rng.choice(ataques)
+            victima = tablero[f][c]
+            tablero[f][c] = None
+            eventos.emitir('muerte', victima, (f, c))
+        elif movimientos:
+            origen = pieza.posicion
+            f, c = rng.choice(seguras or movimientos)
+            tablero[origen[0]][origen[1]] = None
+            tablero[f][c] = pieza
+            pieza.posicion = (f, c)
+            eventos.emitir('movimiento', pieza, origen, (f, c))
+    return time.perf_counter() - inicio
+
+
+def main():
+    for semilla in range(5):
+        jugar(60, semilla, usar_mapa=True, verificar=True)
+    print("Equivalencia verificada en 5 partidas aleatorias.\n")
+
+    t_completo = sum(jugar(60, semilla, usar_mapa=False) for semilla in range(20))
+    t_mapa = sum(jugar(60, semilla, usar_mapa=True) for semilla in range(20))
+    print(f"Recalculo por casilla: {t_completo * 1000:8.1f} ms")
+    print(f"ThreatMap:             {t_mapa * 1000:8.1f} ms  ({t_completo / t_mapa:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
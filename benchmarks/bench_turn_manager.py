@@ -0,0 +1,84 @@
+"""
+Benchmark del planificador de turnos.
+Simula partidas sin tablero gráfico: pide la siguiente pieza, termina su turno
+(calcula su próximo turno) y de vez en cuando elimina una pieza al azar.
+Compara la agenda con montículo de TurnManager con la versión original que
+avanza el reloj tic a tic, y comprueba que ambas dan la misma secuencia de
+turnos (con un desempate determinista en lugar de barajar).
+
+Uso: python -m benchmarks.bench_turn_manager [num_turnos]
+"""
+
+import random
+import sys
+import time
+
+from game.game_setup import crear_nuevo_juego
+from game.turn_manager import TurnManager
+from benchmarks.referencia_turnos import TurnManagerReferencia
+
+
+def simular(clase, turnos, semilla, prob_muerte=0.02, determinista=False):
+    """Devuelve la secuencia de (reloj, jugador, casilla) de cada turno."""
+    rng = random.Random(semilla)
+    if clase is TurnManager:
+        manager = TurnManager(crear_nuevo_juego(), DesempateDeterminista() if determinista else None)
+    else:
+        manager = clase(crear_nuevo_juego())
+    secuencia = []
+    for _ in range(turnos):
+        pieza = manager.obtener_siguiente_pieza_activa()
+        if pieza is None:
+            break
+        secuencia.append((manager.reloj, pieza.jugador, pieza.posicion))
+        if isinstance(manager, TurnManager):
+            manager.programar_siguiente_turno(pieza)
+        else:
+            pieza.calcular_siguiente_turno(manager.reloj)
+
+        if rng.random() < prob_muerte and len(manager.piezas_en_juego) > 2:
+            victima = rng.choice(manager.piezas_en_juego)
+            victima.hp = 0
+            if isinstance(manager, TurnManager):
+                manager.registrar_muerte(victima)
+            else:
+                manager.piezas_en_juego.remove(victima)
+    return secuencia
+
+
+def desempate_determinista(piezas):
+    """Sustituto de random.shuffle: mismo orden sin importar cómo llegaron las piezas."""
+    piezas.sort(key=lambda pieza: (pieza.jugador, pieza.posicion))
+
+
+class DesempateDeterminista(random.Random):
+    """Generador para TurnManager con el mismo desempate que desempate_determinista."""
+    def shuffle(self, piezas):
+        desempate_determinista(piezas)
+
+
+def main():
+    turnos = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    barajar = random.shuffle
+    random.shuffle = desempate_determinista
+    try:
+        for semilla in range(10):
+            assert simular(TurnManager, 500, semilla, determinista=True) == simular(TurnManagerReferencia, 500, semilla), semilla
+    finally:
+        random.shuffle = barajar
+    print("Secuencias de turnos idénticas en 10 partidas simuladas.\n")
+
+    inicio = time.perf_counter()
+    simular(TurnManagerReferencia, turnos, 0, prob_muerte=0)
+    t_referencia = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    simular(TurnManager, turnos, 0, prob_muerte=0)
+    t_agenda = time.perf_counter() - inicio
+
+    print(f"Reloj tic a tic: {t_referencia / turnos * 1e6:8.1f} µs/turno")
+    print(f"Agenda:          {t_agenda / turnos * 1e6:8.1f} µs/turno  ({t_referencia / t_agenda:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Utilidades compartidas por los benchmarks: posiciones de prueba y medición de tiempos.
+"""
+
+import random
+import time
+
+from game.constants import FILAS, COLUMNAS
+from game.game_setup import crear_nuevo_juego
+
+
+def generar_posiciones(cantidad, semilla=1234, prob_baja=0.3):
+    """
+    Genera tableros de prueba a partir de la formación inicial,
+    retirando piezas al azar y repartiendo el resto por el tablero.
+    La primera posición es siempre la inicial sin modificar.
+    """
+    rng = random.Random(semilla)
+    posiciones = [crear_nuevo_juego()]
+    casillas = [(f, c) for f in range(FILAS) for c in range(COLUMNAS)]
+
+    while len(posiciones) < cantidad:
+        piezas = [p for fila in crear_nuevo_juego() for p in fila if p is not None]
+        piezas = [p for p in piezas if rng.random() >= prob_baja]
+        tablero = [[None for _ in range(COLUMNAS)] for _ in range(FILAS)]
+        for pieza, (f, c) in zip(piezas, rng.sample(casillas, len(piezas))):
+            pieza.posicion = (f, c)
+            tablero[f][c] = pieza
+        posiciones.append(tablero)
+    return posiciones
+
+
+def piezas_de(tablero):
+    """Lista de piezas de un tablero, en orden de filas."""
+    return [p for fila in tablero for p in fila if p is not None]
+
+
+def medir(funcion, casos, repeticiones=20):
+    """
+    Ejecuta funcion(pieza, tablero) sobre todos los casos y devuelve
+    el tiempo medio por llamada en microsegundos (mejor de las repeticiones).
+    """
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for pieza, tablero in casos:
+            funcion(pieza, tablero)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor / len(casos) * 1e6
@@ -1,37 +1,161 @@
+import copy
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, CancelledError
+
 from .simple_ai import SimpleAI
+from .alpha_beta import BusquedaAlfaBeta, NIVELES, NIVEL_POR_DEFECTO
+from .mcts import BusquedaMCTS
 # Importamos las funciones de lógica del juego para pasárselas a la IA
 from game.logic import calcular_casillas_posibles, calcular_ataques_posibles
+from game.turn_actions import puede_mover, puede_atacar
+
+# Motores de búsqueda disponibles (todos con para_nivel() y buscar(tablero, pieza))
+MOTORES = {
+    'alfa_beta': BusquedaAlfaBeta,
+    'mcts': BusquedaMCTS,
+}
+
+
+def instantanea_tablero(tablero):
+    """Copia inmutable del tablero para pensar en otro hilo: tuplas con copias de las piezas."""
+    return tuple(tuple(copy.copy(pieza) if pieza is not None else None for pieza in fila) for fila in tablero)
+
 
 class AIController:
     """
-    Clase adaptadora que conecta el sistema del juego con SimpleAI.
+    Clase adaptadora que conecta el sistema del juego con la IA.
+    Con `nivel` (ver NIVELES de cada motor) cada turno se decide con el motor de
+    búsqueda `motor` ('alfa_beta' o 'mcts'); sin él, con las reglas de SimpleAI.
+    pensar() hace lo mismo que calcular_turno() en un hilo aparte (la acción se
+    recoge con accion_pensada()).
     """
-    def __init__(self, team_id):
+    def __init__(self, team_id, rng=None, nivel=None, motor='alfa_beta'):
         self.team_id = team_id
-        self.cerebro = SimpleAI()
+        self.cerebro = SimpleAI(rng)
+        self.nivel = nivel
+        self.motor = motor
+        self.busqueda = MOTORES[motor].para_nivel(nivel) if nivel is not None else None
+        # Acciones que quedan del turno que decidió la búsqueda, y para qué pieza
+        self._plan = []
+        self._pieza_plan = None
+        # Hilo de la búsqueda (se crea al pensar por primera vez) y aviso de cancelación
+        self._ejecutor = None
+        self._cancelar = None
+        self._cerrojo = threading.Lock()
 
-    def calcular_turno(self, tablero, pieza_activa, movimientos_resaltados=None, ataques_resaltados=None):
+    def calcular_turno(self, tablero, pieza_activa, movimientos_resaltados=None, ataques_resaltados=None, mapa_alcance=None):
         """
         Método estandarizado que llama main.py.
         Adapta los datos del juego a lo que necesita SimpleAI.
+        Si recibe el MapaAlcance de la partida, las consultas de reglas salen de su caché.
+        Con búsqueda, el turno completo se decide en la primera llamada y las
+        siguientes (tras cada animación) devuelven sus acciones restantes.
+        """
+        if self.busqueda is not None:
+            if not pieza_activa.ha_movido and not pieza_activa.ha_atacado:
+                self._fijar_plan(self.busqueda.buscar(tablero, pieza_activa), pieza_activa)
+            accion = self._accion_del_plan(pieza_activa, movimientos_resaltados, ataques_resaltados)
+            if accion is not None:
+                return accion
+        return self._decidir_con_reglas(tablero, pieza_activa, movimientos_resaltados, ataques_resaltados, mapa_alcance)
+
+    def pensar(self, tablero, pieza_activa, movimientos_resaltados=None, ataques_resaltados=None, mapa_alcance=None):
+        """
+        Como calcular_turno(), pero sin bloquear: devuelve un concurrent.futures.Future
+        con la acción. La búsqueda corre en un hilo aparte sobre una instantánea
+        inmutable del tablero, así que la partida puede seguir dibujándose; mientras
+        el Future no esté listo no hay que tocar la pieza activa. Las acciones
+        restantes de un turno ya planificado y las reglas de SimpleAI son
+        inmediatas y llegan en un Future ya resuelto.
+        Cuando termina, la acción se recoge con accion_pensada() desde el hilo
+        principal. cancelar() abandona la búsqueda en curso (p.ej. al deshacer o al salir).
+        """
+        if self.busqueda is None or pieza_activa.ha_movido or pieza_activa.ha_atacado:
+            futuro = Future()
+            futuro.set_result(self.calcular_turno(tablero, pieza_activa, movimientos_resaltados,
+                                                  ataques_resaltados, mapa_alcance))
+            return futuro
+
+        self.cancelar()
+        cancelar = threading.Event()
+        self._cancelar = cancelar
+        instantanea = instantanea_tablero(tablero)
+        fila, col = pieza_activa.posicion
+        movimientos = tuple(movimientos_resaltados) if movimientos_resaltados is not None else None
+        ataques = tuple(ataques_resaltados) if ataques_resaltados is not None else None
+        if self._ejecutor is None:
+            self._ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ia')
+        return self._ejecutor.submit(self._pensar_en_segundo_plano, instantanea, instantanea[fila][col],
+                                     pieza_activa, movimientos, ataques, cancelar)
+
+    def _pensar_en_segundo_plano(self, instantanea, pieza, pieza_activa, movimientos, ataques, cancelar):
+        """
+        Devuelve la primera acción del plan, o None si no sirve. Las reglas de
+        SimpleAI no se usan aquí: tiran del rng de la partida, que el hilo
+        principal restaura al deshacer y que las repeticiones reproducen.
+        """
+        turno = self.busqueda.buscar(instantanea, pieza, cancelar)
+        with self._cerrojo:
+            # Con el cerrojo, una cancelación no puede colarse entre comprobarla y guardar el plan
+            if cancelar.is_set():
+                raise CancelledError()
+            self._fijar_plan(turno, pieza_activa)
+            return self._accion_del_plan(pieza_activa, movimientos, ataques)
+
+    def accion_pensada(self, futuro, tablero, pieza_activa, movimientos_resaltados=None, ataques_resaltados=None, mapa_alcance=None):
         """
+        Acción de un Future de pensar() ya terminado. Si el plan no dio una acción
+        válida, decide SimpleAI aquí, en el hilo principal, con el tablero real.
+        """
+        accion = futuro.result()
+        if accion is None:
+            accion = self._decidir_con_reglas(tablero, pieza_activa, movimientos_resaltados,
+                                              ataques_resaltados, mapa_alcance)
+        return accion
+
+    def cancelar(self):
+        """Abandona la búsqueda en curso, si la hay; su Future termina con CancelledError."""
+        with self._cerrojo:
+            if self._cancelar is not None:
+                self._cancelar.set()
+                self._cancelar = None
+
+    def cerrar(self):
+        """Cancela lo pendiente y libera el hilo de la búsqueda (al terminar la partida)."""
+        self.cancelar()
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown(wait=False)
+            self._ejecutor = None
+
+    def _decidir_con_reglas(self, tablero, pieza_activa, movimientos_resaltados=None, ataques_resaltados=None, mapa_alcance=None):
+        """Decisión de SimpleAI para la siguiente acción de la pieza."""
+
+        def casillas_posibles(pieza, tablero):
+            if mapa_alcance is not None:
+                return mapa_alcance.movimientos(pieza)
+            return calcular_casillas_posibles(pieza, tablero)
+
+        def ataques_posibles(pieza, tablero):
+            if mapa_alcance is not None:
+                return mapa_alcance.ataques(pieza)
+            return calcular_ataques_posibles(pieza, tablero)
 
         def obtener_movimientos():
             if movimientos_resaltados is not None:
                 return movimientos_resaltados
-            return calcular_casillas_posibles(pieza_activa, tablero)
+            return casillas_posibles(pieza_activa, tablero)
 
         def obtener_ataques():
             if ataques_resaltados is not None:
                 return ataques_resaltados
-            return calcular_ataques_posibles(pieza_activa, tablero)
+            return ataques_posibles(pieza_activa, tablero)
 
         def elegir_mejor_movimiento(movimientos):
             if not movimientos:
                 return None
             objetivo = self.cerebro.encontrar_objetivo(pieza_activa, tablero)
             if objetivo:
-                return min(movimientos, key=lambda mov: self.cerebro.distancia(mov, objetivo.posicion))
+                return self.cerebro.acercarse(movimientos, pieza_activa, tablero, objetivo)
             return movimientos[0]
 
         def elegir_mejor_objetivo(ataques):
@@ -41,7 +165,7 @@ class AIController:
 
         # Si ya atacó, no puede volver a atacar en este turno.
         if pieza_activa.ha_atacado:
-            if pieza_activa.tipo_turno == 2 and not pieza_activa.ha_movido:
+            if puede_mover(pieza_activa):
                 movimientos = obtener_movimientos()
                 destino = elegir_mejor_movimiento(movimientos)
                 if destino is not None:
@@ -50,7 +174,7 @@ class AIController:
 
         # Si ya se movió, puede atacar solo si su tipo de turno lo permite.
         if pieza_activa.ha_movido:
-            if pieza_activa.tipo_turno > 0 and not pieza_activa.ha_atacado:
+            if puede_atacar(pieza_activa):
                 ataques = obtener_ataques()
                 objetivo = elegir_mejor_objetivo(ataques)
                 if objetivo is not None:
@@ -60,8 +184,8 @@ class AIController:
         accion, valor = self.cerebro.elegir_accion(
             pieza_activa,
             tablero,
-            calcular_casillas_posibles,
-            calcular_ataques_posibles
+            casillas_posibles,
+            ataques_posibles
         )
         
         # Convertimos la respuesta de tupla (SimpleAI) a diccionario (Juego)
@@ -72,4 +196,31 @@ class AIController:
             return {'tipo': 'mover', 'destino': valor}
             
         else:
-            return {'tipo': 'pasar'}
\ No newline at end of file
+            return {'tipo': 'pasar'}
+
+    def _fijar_plan(self, turno, pieza_activa):
+        self._plan = turno.como_acciones()
+        self._pieza_plan = pieza_activa
+
+    def _accion_del_plan(self, pieza_activa, movimientos_resaltados, ataques_resaltados):
+        """
+        Siguiente acción del turno planificado, o None si no hay plan válido
+        (p.ej. una partida cargada a mitad de turno): entonces decide SimpleAI.
+        """
+        if self._pieza_plan is not pieza_activa:
+            return None
+
+        if not self._plan:
+            return {'tipo': 'pasar'}
+        accion = self._plan.pop(0)
+        if accion['tipo'] == 'mover':
+            valida = puede_mover(pieza_activa) and (movimientos_resaltados is None or accion['destino'] in movimientos_resaltados)
+        elif accion['tipo'] == 'atacar':
+            valida = puede_atacar(pieza_activa) and (ataques_resaltados is None or accion['objetivo'] in ataques_resaltados)
+        else:
+            valida = True
+        if not valida:
+            self._plan = []
+            self._pieza_plan = None
+            return None
+        return accion
@@ -0,0 +1,398 @@
+"""
+IA de búsqueda: alfa-beta sobre turnos completos.
+
+Cada nodo es el turno entero de una pieza (mover→atacar, atacar→mover, solo
+una acción o pasar, ver turn_actions.generar_turnos). Los turnos no alternan
+entre jugadores: quién juega a continuación se proyecta con el planificador de
+TurnManager, es decir, la pieza viva con menor proximo_turno y, al acabar su
+turno, esa pieza se reprograma a proximo_turno + 1000 // agi. Los empates se
+resuelven por id_pieza en lugar de al azar (la búsqueda no toca el generador de
+la partida). Un nodo maximiza si la pieza que juega es del equipo de la IA.
+
+La búsqueda trabaja sobre una copia del tablero con hacer/deshacer
+(aplicar_accion / revertir_accion), profundiza de forma iterativa y se corta
+por tiempo o por número de nodos: la fuerza depende del presupuesto (ver NIVELES).
+
+Las posiciones ya buscadas se guardan en una TablaTransposicion que se conserva
+entre iteraciones y entre turnos de la misma partida. La clave es un hash
+Zobrist de 64 bits (ver game.zobrist) del tablero, el HP y las banderas
+ha_movido/ha_atacado de cada pieza y el reloj del planificador (el
+proximo_turno de cada pieza), que se actualiza con XOR al hacer un turno y se
+recupera al deshacerlo. Entre turnos todas las banderas están a False (se
+limpian al terminar cada turno, como hará reiniciar_estado_turno), así dos
+órdenes de juego que llevan a la misma posición dan la misma clave.
+"""
+
+import copy
+import time
+
+from game.turn_actions import generar_turnos, aplicar_accion, revertir_accion
+from game.zobrist import clave_zobrist, aporte_pieza
+from .transposition import TablaTransposicion, EXACTO, INFERIOR, SUPERIOR
+
+# Nivel de dificultad -> (segundos por turno, máximo de nodos o None)
+NIVELES = {
+    'facil': (0.1, 150),
+    'normal': (0.4, None),
+    'dificil': (1.5, None),
+    'experto': (4.0, None),
+}
+NIVEL_POR_DEFECTO = 'normal'
+
+# Puntuaciones de la evaluación (desde el punto de vista del equipo de la IA)
+GANAR = 1_000_000
+VALOR_PIEZA = 40
+VALOR_HP = 10
+VALOR_ATK = 8
+VALOR_CERCANIA = 1
+
+# Parte del presupuesto que se reserva para salir de la búsqueda y devolver el turno:
+# el reloj se mira en cada nodo, pero un nodo interior (generar, ordenar y evaluar
+# sus turnos) puede tardar unos milisegundos después de mirarlo
+_MARGEN_SEGUNDOS = 0.015
+_FRACCION_MARGEN = 0.1
+# Puntuaciones a partir de las cuales el valor es una victoria o derrota forzada
+_UMBRAL_FORZADO = GANAR - 1000
+
+
+class _PresupuestoAgotado(Exception):
+    """Corta la búsqueda cuando se acaba el tiempo o los nodos."""
+
+
+def _distancia_minima(casilla, casillas):
+    """Distancia Manhattan de una casilla a la más cercana de `casillas`."""
+    fila, col = casilla
+    return min(abs(fila - f) + abs(col - c) for f, c in casillas)
+
+
+def _clave_turno(pieza):
+    """Parte del hash que corresponde al próximo turno de una pieza."""
+    return clave_zobrist('turno', pieza.id_pieza, pieza.proximo_turno)
+
+
+def _a_tabla(valor, ply):
+    """Las victorias forzadas se guardan como distancia desde el nodo, no desde la raíz."""
+    if valor >= _UMBRAL_FORZADO:
+        return valor + ply
+    if valor <= -_UMBRAL_FORZADO:
+        return valor - ply
+    return valor
+
+
+def _de_tabla(valor, ply):
+    if valor >= _UMBRAL_FORZADO:
+        return valor - ply
+    if valor <= -_UMBRAL_FORZADO:
+        return valor + ply
+    return valor
+
+
+def _primero(turnos, acciones):
+    """Pone primero el turno con esas acciones (p.ej. el mejor de la tabla), si está."""
+    for indice, turno in enumerate(turnos):
+        if turno.acciones == acciones:
+            if indice:
+                turnos.insert(0, turnos.pop(indice))
+            return
+
+
+def ordenar_turnos(pieza, turnos, tablero, piezas):
+    """
+    Ordena en el sitio los turnos de `pieza`: muertes primero (por valor de la
+    víctima), después el resto de ataques, los movimientos que más acercan a un
+    rival y por último pasar. Devuelve la misma lista.
+    """
+    rivales = [otra.posicion for otra in piezas if otra.hp > 0 and otra.jugador != pieza.jugador]
+
+    def prioridad(turno):
+        if turno.es_pasar:
+            return -1000
+        valor = 0
+        destino = None
+        for tipo, (fila, col) in turno.acciones:
+            if tipo == 'atacar':
+                objetivo = tablero[fila][col]
+                victima = objetivo.atk + objetivo.hp
+                valor += 10000 + victima if objetivo.hp <= pieza.atk else 1000 + victima
+            else:
+                destino = (fila, col)
+        if destino is not None and rivales:
+            valor -= _distancia_minima(destino, rivales)
+        return valor
+
+    turnos.sort(key=prioridad, reverse=True)
+    return turnos
+
+
+class BusquedaAlfaBeta:
+    """
+    Busca el mejor turno completo para la pieza activa.
+    `segundos` es un límite duro por turno; `max_nodos` (opcional) limita además
+    el trabajo de forma independiente de la velocidad del equipo.
+    `cubos_tabla` es el tamaño de la tabla de transposición (None la desactiva);
+    la tabla dura lo que dura la instancia, es decir, toda la partida.
+    Tras cada búsqueda deja en `estadisticas` la profundidad completada, los
+    nodos visitados, el tiempo usado, la puntuación del turno elegido y el uso
+    de la tabla.
+    """
+
+    def __init__(self, segundos=NIVELES[NIVEL_POR_DEFECTO][0], max_nodos=None, profundidad_max=32,
+                 cubos_tabla=1 << 16):
+        self.segundos = segundos
+        self.max_nodos = max_nodos
+        self.profundidad_max = profundidad_max
+        self.tabla = TablaTransposicion(cubos_tabla) if cubos_tabla else None
+        self.estadisticas = {}
+
+    @classmethod
+    def para_nivel(cls, nivel):
+        """Búsqueda con el presupuesto de un nivel de NIVELES."""
+        segundos, max_nodos = NIVELES[nivel]
+        return cls(segundos, max_nodos)
+
+    # --- Estado de la búsqueda ---
+
+    def _preparar(self, tablero, pieza_activa):
+        """Copia el tablero (piezas incluidas) y devuelve la copia de la pieza activa."""
+        self.tablero = [[copy.copy(pieza) if pieza is not None else None for pieza in fila] for fila in tablero]
+        piezas = [pieza for fila in self.tablero for pieza in fila if pieza is not None]
+        # Orden de desempate del planificador: id de pieza (las sin id, al final y en orden de filas)
+        piezas.sort(key=lambda pieza: (pieza.id_pieza is None, pieza.id_pieza or 0))
+        self.piezas = piezas
+        self.vivas = {}
+        for pieza in piezas:
+            self.vivas[pieza.jugador] = self.vivas.get(pieza.jugador, 0) + 1
+        self.jugador = pieza_activa.jugador
+        fila, col = pieza_activa.posicion
+        activa = self.tablero[fila][col]
+        # Solo la pieza activa está a mitad de turno; las demás empiezan el suyo desde cero
+        for pieza in piezas:
+            if pieza is not activa:
+                pieza.ha_movido = pieza.ha_atacado = False
+        self.hash = self.hash_desde_cero()
+        return activa
+
+    def hash_desde_cero(self):
+        """Hash de la posición de búsqueda calculado sin atajos (para comprobar el incremental)."""
+        valor = clave_zobrist('jugador', self.jugador)
+        for pieza in self.piezas:
+            if pieza.hp > 0:
+                valor ^= aporte_pieza(pieza) ^ _clave_turno(pieza)
+        return valor
+
+    def _hacer(self, pieza, acciones):
+        """
+        Juega un turno completo, limpia las banderas de la pieza, la reprograma y
+        actualiza el hash. Devuelve lo necesario para deshacerlo.
+        """
+        tablero = self.tablero
+        valor = self.hash ^ aporte_pieza(pieza) ^ _clave_turno(pieza)
+        registros = []
+        for accion in acciones:
+            if accion[0] == 'atacar':
+                fila, col = accion[1]
+                objetivo = tablero[fila][col]
+                valor ^= aporte_pieza(objetivo)
+                registro = aplicar_accion(tablero, pieza, accion)
+                if objetivo.esta_viva():
+                    valor ^= aporte_pieza(objetivo)
+                else:
+                    valor ^= _clave_turno(objetivo)
+                    self.vivas[objetivo.jugador] -= 1
+            else:
+                registro = aplicar_accion(tablero, pieza, accion)
+            registros.append(registro)
+        banderas = (pieza.ha_movido, pieza.ha_atacado)
+        pieza.ha_movido = pieza.ha_atacado = False
+        anterior = pieza.proximo_turno
+        pieza.proximo_turno = anterior + 1000 // pieza.agi
+        deshacer = (registros, anterior, banderas, self.hash)
+        self.hash = valor ^ aporte_pieza(pieza) ^ _clave_turno(pieza)
+        return deshacer
+
+    def _deshacer(self, pieza, deshacer):
+        registros, anterior, banderas, self.hash = deshacer
+        pieza.proximo_turno = anterior
+        pieza.ha_movido, pieza.ha_atacado = banderas
+        for registro in reversed(registros):
+            if registro[0] == 'atacar' and not registro[2].esta_viva():
+                self.vivas[registro[2].jugador] += 1
+            revertir_accion(self.tablero, registro)
+
+    def _siguiente_pieza(self):
+        """Pieza viva con menor proximo_turno (a igualdad, la de menor id)."""
+        siguiente = None
+        for pieza in self.piezas:
+            if pieza.hp > 0 and (siguiente is None or pieza.proximo_turno < siguiente.proximo_turno):
+                siguiente = pieza
+        return siguiente
+
+    def _resultado(self, ply):
+        """Puntuación de fin de partida, o None si sigue. Las victorias cercanas valen más."""
+        if not self.vivas.get(self.jugador):
+            return -GANAR + ply
+        if not any(n for jugador, n in self.vivas.items() if jugador != self.jugador):
+            return GANAR - ply
+        return None
+
+    def evaluar(self):
+        """Material (HP, ataque y piezas vivas) y cercanía a las piezas rivales."""
+        propias, rivales = [], []
+        for pieza in self.piezas:
+            if pieza.hp > 0:
+                (propias if pieza.jugador == self.jugador else rivales).append(pieza)
+        valor = 0
+        casillas_rivales = [pieza.posicion for pieza in rivales]
+        casillas_propias = [pieza.posicion for pieza in propias]
+        for pieza in propias:
+            valor += VALOR_PIEZA + pieza.hp * VALOR_HP + pieza.atk * VALOR_ATK
+            valor -= VALOR_CERCANIA * _distancia_minima(pieza.posicion, casillas_rivales)
+        for pieza in rivales:
+            valor -= VALOR_PIEZA + pieza.hp * VALOR_HP + pieza.atk * VALOR_ATK
+            valor += VALOR_CERCANIA * _distancia_minima(pieza.posicion, casillas_propias)
+        return valor
+
+    def _ordenar(self, pieza, turnos):
+        return ordenar_turnos(pieza, turnos, self.tablero, self.piezas)
+
+    # --- Alfa-beta ---
+
+    def _contar_nodo(self):
+        self.nodos += 1
+        if time.perf_counter() >= self._limite or (self._cancelar is not None and self._cancelar.is_set()):
+            raise _PresupuestoAgotado()
+        if self.max_nodos is not None and self.nodos >= self.max_nodos:
+            raise _PresupuestoAgotado()
+
+    def _alfa_beta(self, profundidad, alfa, beta, ply):
+        self._contar_nodo()
+        resultado = self._resultado(ply)
+        if resultado is not None:
+            return resultado
+        if profundidad == 0:
+            return self.evaluar()
+
+        tabla = self.tabla
+        jugada_tabla = None
+        if tabla is not None:
+            entrada = tabla.consultar(self.hash)
+            if entrada is not None:
+                profundidad_tabla, valor, tipo, jugada_tabla = entrada
+                if profundidad_tabla >= profundidad:
+                    valor = _de_tabla(valor, ply)
+                    if tipo == EXACTO:
+                        return valor
+                    if tipo == INFERIOR:
+                        alfa = max(alfa, valor)
+                    else:
+                        beta = min(beta, valor)
+                    if alfa >= beta:
+                        return valor
+        alfa_inicial, beta_inicial = alfa, beta
+
+        # La pieza empieza un turno nuevo con las banderas limpias (ver _hacer)
+        pieza = self._siguiente_pieza()
+        maximiza = pieza.jugador == self.jugador
+        turnos = self._ordenar(pieza, list(generar_turnos(pieza, self.tablero)))
+        if jugada_tabla is not None:
+            _primero(turnos, jugada_tabla)
+
+        mejor = -GANAR * 2 if maximiza else GANAR * 2
+        mejor_jugada = None
+        for turno in turnos:
+            deshacer = self._hacer(pieza, turno.acciones)
+            valor = self._alfa_beta(profundidad - 1, alfa, beta, ply + 1)
+            self._deshacer(pieza, deshacer)
+            if maximiza:
+                if valor > mejor:
+                    mejor, mejor_jugada = valor, turno.acciones
+                alfa = max(alfa, valor)
+            else:
+                if valor < mejor:
+                    mejor, mejor_jugada = valor, turno.acciones
+                beta = min(beta, valor)
+            if alfa >= beta:
+                break
+
+        if tabla is not None:
+            if mejor <= alfa_inicial:
+                tipo = SUPERIOR
+            elif mejor >= beta_inicial:
+                tipo = INFERIOR
+            else:
+                tipo = EXACTO
+            tabla.guardar(self.hash, profundidad, _a_tabla(mejor, ply), tipo, mejor_jugada)
+        return mejor
+
+    def _raiz(self, pieza, turnos, profundidad):
+        """Una iteración completa; en `_parcial` queda lo mejor encontrado hasta el momento."""
+        alfa, beta = -GANAR * 2, GANAR * 2
+        mejor, mejor_valor = None, None
+        self._parcial = None
+        for turno in turnos:
+            deshacer = self._hacer(pieza, turno.acciones)
+            valor = self._alfa_beta(profundidad - 1, alfa, beta, 1)
+            self._deshacer(pieza, deshacer)
+            if mejor is None or valor > mejor_valor:
+                mejor, mejor_valor = turno, valor
+                self._parcial = (mejor, mejor_valor)
+            alfa = max(alfa, valor)
+        return mejor, mejor_valor
+
+    def buscar(self, tablero, pieza_activa, cancelar=None):
+        """
+        Devuelve el mejor Turno para pieza_activa (respeta ha_movido / ha_atacado si
+        el turno ya empezó). El tablero solo se lee, así que puede ser una
+        instantánea inmutable (tuplas). Si `cancelar` (threading.Event) se activa,
+        la búsqueda termina en cuanto mira el reloj y devuelve lo que tenga.
+        """
+        inicio = time.perf_counter()
+        self._limite = inicio + self.segundos - min(_MARGEN_SEGUNDOS, self.segundos * _FRACCION_MARGEN)
+        self._cancelar = cancelar
+        self.nodos = 0
+        pieza = self._preparar(tablero, pieza_activa)
+        turnos = self._ordenar(pieza, list(generar_turnos(pieza, self.tablero)))
+        tabla = self.tabla
+        if tabla is not None:
+            tabla.nueva_busqueda()
+            consultas, aciertos = tabla.consultas, tabla.aciertos
+            # Si un turno anterior ya buscó esta posición, su mejor turno va primero
+            entrada = tabla.consultar(self.hash)
+            if entrada is not None and entrada[3] is not None:
+                _primero(turnos, entrada[3])
+        mejor, valor, completada = turnos[0], None, 0
+
+        if len(turnos) > 1:
+            for profundidad in range(1, self.profundidad_max + 1):
+                try:
+                    mejor, valor = self._raiz(pieza, turnos, profundidad)
+                except _PresupuestoAgotado:
+                    # El mejor de la iteración anterior va primero: si ya se evaluó,
+                    # lo encontrado en esta iteración es al menos igual de bueno.
+                    if self._parcial is not None:
+                        mejor, valor = self._parcial
+                    break
+                completada = profundidad
+                turnos.remove(mejor)
+                turnos.insert(0, mejor)
+                if tabla is not None:
+                    tabla.guardar(self.hash, profundidad, _a_tabla(valor, 0), EXACTO, mejor.acciones)
+                if abs(valor) >= GANAR - 1000:
+                    break  # Resultado forzado: más profundidad no cambia nada
+                if time.perf_counter() - inicio > self.segundos / 2:
+                    break  # La siguiente iteración no terminaría a tiempo
+
+        segundos = time.perf_counter() - inicio
+        self.estadisticas = {
+            'profundidad': completada,
+            'nodos': self.nodos,
+            'segundos': segundos,
+            'nodos_por_segundo': self.nodos / segundos if segundos > 0 else 0.0,
+            'puntuacion': valor,
+            'turnos_raiz': len(turnos),
+        }
+        if tabla is not None:
+            consultas = tabla.consultas - consultas
+            self.estadisticas['tasa_aciertos_tabla'] = (tabla.aciertos - aciertos) / consultas if consultas else 0.0
+            self.estadisticas['ocupacion_tabla'] = tabla.ocupacion()
+        return mejor
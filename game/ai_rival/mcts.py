@@ -0,0 +1,318 @@
+"""
+IA de Monte Carlo (MCTS) sobre turnos completos.
+
+Cada arista del árbol es el turno entero de una pieza (ver
+turn_actions.generar_turnos, que aplica las reglas de tipo_turno). Quién juega
+se decide igual que en TurnManager: la pieza viva con menor proximo_turno y, si
+varias coinciden, una al azar mientras las demás se retrasan un tic. Como los
+empates son aleatorios, el árbol es de "bucle abierto": un nodo es una secuencia
+de turnos y en cada simulación el estado se vuelve a jugar desde la raíz, así
+que un mismo nodo puede ver piezas distintas según cómo salgan los sorteos.
+
+Cada simulación:
+1. Selección: UCB1 entre los hijos legales en esta simulación, usando cuántas
+   veces estuvo disponible cada hijo en lugar de las visitas del padre.
+   El número de hijos crece con las visitas (ensanchamiento progresivo) y se
+   prueban primero los turnos mejor ordenados (muertes, ataques, acercarse).
+2. Expansión de un turno nuevo.
+3. Partida rápida al estilo de SimpleAI (atacar al objetivo de más valor, si no
+   acercarse al rival más cercano) durante unos pocos turnos, sin interfaz ni
+   eventos, sobre piezas copiadas al empezar la búsqueda.
+4. Retropropagación: victoria 1 / derrota 0 y, si la partida no terminó, la
+   fracción del material total que conserva cada jugador.
+
+La fuerza depende del presupuesto de tiempo o de simulaciones (ver NIVELES).
+"""
+
+import copy
+import math
+import random
+import time
+
+from game.logic import calcular_casillas_posibles, calcular_ataques_posibles
+from game.turn_actions import generar_turnos, aplicar_accion, puede_mover, puede_atacar, Turno
+from .alpha_beta import ordenar_turnos, VALOR_PIEZA, VALOR_HP, VALOR_ATK
+
+# Nivel de dificultad -> (segundos por turno, máximo de simulaciones o None)
+NIVELES = {
+    'facil': (0.1, 60),
+    'normal': (0.4, None),
+    'dificil': (1.5, None),
+    'experto': (4.0, None),
+}
+
+# Constante de exploración de UCB1 (las recompensas van de 0 a 1)
+EXPLORACION = 0.7
+# Hijos considerados en un nodo con n visitas: 1 + AMPLITUD * sqrt(n)
+AMPLITUD = 2.0
+# Turnos de la partida rápida antes de puntuar por material
+TURNOS_SIMULACION = 30
+# Probabilidad de mover al azar en la partida rápida (da variedad a las simulaciones)
+PROB_ALEATORIA = 0.1
+
+
+class _Nodo:
+    """Turno jugado por `jugador` desde el nodo padre, con sus estadísticas."""
+    __slots__ = ('jugador', 'acciones', 'hijos', 'visitas', 'recompensa', 'disponible', 'candidatos')
+
+    def __init__(self, jugador, acciones):
+        self.jugador = jugador
+        self.acciones = acciones
+        self.hijos = {}
+        self.visitas = 0
+        self.recompensa = 0.0
+        # Simulaciones en las que este turno era legal al pasar por el padre
+        self.disponible = 0
+        # (firma del estado, claves de los turnos ordenados) de la última vez
+        self.candidatos = None
+
+
+def _material(pieza):
+    return VALOR_PIEZA + pieza.hp * VALOR_HP + pieza.atk * VALOR_ATK
+
+
+class BusquedaMCTS:
+    """
+    Busca el mejor turno completo para la pieza activa con simulaciones.
+    `segundos` limita el tiempo por turno y `max_simulaciones` (opcional) el
+    número de simulaciones. Tras cada búsqueda deja en `estadisticas` las
+    simulaciones hechas, simulaciones por segundo y las visitas del turno elegido.
+    El generador `rng` es propio: la búsqueda no toca el de la partida.
+    """
+
+    def __init__(self, segundos=NIVELES['normal'][0], max_simulaciones=None, rng=None):
+        self.segundos = segundos
+        self.max_simulaciones = max_simulaciones
+        self.rng = rng if rng is not None else random.Random()
+        self.estadisticas = {}
+
+    @classmethod
+    def para_nivel(cls, nivel):
+        """Búsqueda con el presupuesto de un nivel de NIVELES."""
+        segundos, max_simulaciones = NIVELES[nivel]
+        return cls(segundos, max_simulaciones)
+
+    # --- Estado de la simulación ---
+
+    def _preparar(self, tablero, pieza_activa):
+        """Copia las piezas una vez y guarda el estado inicial para restaurarlo en cada simulación."""
+        self.tablero = [[None] * len(fila) for fila in tablero]
+        piezas = [copy.copy(pieza) for fila in tablero for pieza in fila if pieza is not None]
+        piezas.sort(key=lambda pieza: (pieza.id_pieza is None, pieza.id_pieza or 0))
+        self.piezas = piezas
+        self._inicial = [(p.posicion, p.hp, p.proximo_turno, p.ha_movido, p.ha_atacado) for p in piezas]
+        self._vivas_iniciales = {}
+        for pieza in piezas:
+            self._vivas_iniciales[pieza.jugador] = self._vivas_iniciales.get(pieza.jugador, 0) + 1
+        # La pieza activa juega ahora: su proximo_turno es el tic actual del reloj
+        self._reloj_inicial = int(pieza_activa.proximo_turno)
+        self._restaurar()
+        fila, col = pieza_activa.posicion
+        return self.tablero[fila][col]
+
+    def _restaurar(self):
+        tablero = self.tablero
+        for fila in tablero:
+            for col in range(len(fila)):
+                fila[col] = None
+        for pieza, (posicion, hp, proximo, ha_movido, ha_atacado) in zip(self.piezas, self._inicial):
+            pieza.posicion = posicion
+            pieza.hp = hp
+            pieza.proximo_turno = proximo
+            pieza.ha_movido = ha_movido
+            pieza.ha_atacado = ha_atacado
+            tablero[posicion[0]][posicion[1]] = pieza
+        self.vivas = dict(self._vivas_iniciales)
+        self.reloj = self._reloj_inicial
+
+    def _firma(self, pieza):
+        """Estado que determina los turnos legales de `pieza` al empezar su turno."""
+        return (pieza.id_pieza, pieza.posicion, tuple((otra.posicion, otra.hp) for otra in self.piezas))
+
+    def _terminada(self):
+        return sum(1 for n in self.vivas.values() if n) <= 1
+
+    def _siguiente_pieza(self):
+        """Como TurnManager: menor proximo_turno; los empates se sortean y las demás se retrasan un tic."""
+        minimo, empatadas = None, []
+        for pieza in self.piezas:
+            if pieza.hp > 0:
+                tiempo = pieza.proximo_turno
+                if minimo is None or tiempo < minimo:
+                    minimo, empatadas = tiempo, [pieza]
+                elif tiempo == minimo:
+                    empatadas.append(pieza)
+        elegida = empatadas[0]
+        if len(empatadas) > 1:
+            elegida = empatadas[self.rng.randrange(len(empatadas))]
+            for otra in empatadas:
+                if otra is not elegida:
+                    otra.proximo_turno += 1
+        self.reloj = int(minimo)
+        return elegida
+
+    def _aplicar(self, pieza, accion):
+        registro = aplicar_accion(self.tablero, pieza, accion)
+        if registro[0] == 'atacar' and not registro[2].esta_viva():
+            self.vivas[registro[2].jugador] -= 1
+
+    def _jugar_turno(self, pieza, acciones):
+        for accion in acciones:
+            self._aplicar(pieza, accion)
+        pieza.proximo_turno = self.reloj + 1000 // pieza.agi
+
+    # --- Partida rápida ---
+
+    def _mejor_objetivo(self, pieza, ataques):
+        tablero = self.tablero
+
+        def valor(casilla):
+            objetivo = tablero[casilla[0]][casilla[1]]
+            return (objetivo.hp <= pieza.atk, objetivo.atk + objetivo.hp)
+        return max(ataques, key=valor)
+
+    def _mover_rapido(self, pieza):
+        movimientos = calcular_casillas_posibles(pieza, self.tablero)
+        if not movimientos:
+            return
+        if self.rng.random() < PROB_ALEATORIA:
+            destino = self.rng.choice(movimientos)
+        else:
+            rivales = [otra.posicion for otra in self.piezas if otra.hp > 0 and otra.jugador != pieza.jugador]
+            destino = min(movimientos, key=lambda mov: min(abs(mov[0] - f) + abs(mov[1] - c) for f, c in rivales))
+        self._aplicar(pieza, ('mover', destino))
+
+    def _turno_rapido(self, pieza):
+        """Turno de la política de simulación: atacar si se puede y si no acercarse (y atacar después)."""
+        ataques = calcular_ataques_posibles(pieza, self.tablero)
+        if ataques:
+            self._aplicar(pieza, ('atacar', self._mejor_objetivo(pieza, ataques)))
+            if puede_mover(pieza) and not self._terminada():
+                self._mover_rapido(pieza)
+            return
+        self._mover_rapido(pieza)
+        if pieza.ha_movido and puede_atacar(pieza):
+            ataques = calcular_ataques_posibles(pieza, self.tablero)
+            if ataques:
+                self._aplicar(pieza, ('atacar', self._mejor_objetivo(pieza, ataques)))
+
+    def _simular(self):
+        """Juega la partida rápida y devuelve la recompensa de cada jugador."""
+        for _ in range(TURNOS_SIMULACION):
+            if self._terminada():
+                break
+            pieza = self._siguiente_pieza()
+            pieza.reiniciar_estado_turno()
+            self._turno_rapido(pieza)
+            pieza.proximo_turno = self.reloj + 1000 // pieza.agi
+
+        recompensas = {jugador: 0.0 for jugador in self.vivas}
+        if self._terminada():
+            for jugador, n in self.vivas.items():
+                if n:
+                    recompensas[jugador] = 1.0
+            return recompensas
+        total = 0
+        for pieza in self.piezas:
+            if pieza.hp > 0:
+                material = _material(pieza)
+                recompensas[pieza.jugador] += material
+                total += material
+        for jugador in recompensas:
+            recompensas[jugador] /= total
+        return recompensas
+
+    # --- Árbol ---
+
+    def _candidatos(self, nodo, pieza, turnos=None):
+        """Claves (acciones) de los turnos legales de la pieza, ordenadas; se reutilizan si el estado no cambió."""
+        firma = self._firma(pieza)
+        if nodo.candidatos is None or nodo.candidatos[0] != firma:
+            if turnos is None:
+                turnos = ordenar_turnos(pieza, list(generar_turnos(pieza, self.tablero)), self.tablero, self.piezas)
+            nodo.candidatos = (firma, [turno.acciones for turno in turnos])
+        return nodo.candidatos[1]
+
+    def _elegir_hijo(self, nodo, pieza, claves):
+        """Turno nuevo si el ensanchamiento lo permite; si no, el hijo legal con mejor UCB1."""
+        limite = 1 + int(AMPLITUD * math.sqrt(nodo.visitas))
+        disponibles = []
+        for acciones in claves[:limite]:
+            hijo = nodo.hijos.get((pieza.id_pieza, acciones))
+            if hijo is None:
+                hijo = _Nodo(pieza.jugador, acciones)
+                nodo.hijos[(pieza.id_pieza, acciones)] = hijo
+                hijo.disponible = 1
+                return hijo, True
+            disponibles.append(hijo)
+
+        mejor, mejor_valor = None, None
+        for hijo in disponibles:
+            hijo.disponible += 1
+            valor = hijo.recompensa / hijo.visitas + EXPLORACION * math.sqrt(math.log(hijo.disponible) / hijo.visitas)
+            if mejor is None or valor > mejor_valor:
+                mejor, mejor_valor = hijo, valor
+        return mejor, False
+
+    def _iteracion(self, raiz, pieza_raiz, turnos_raiz):
+        self._restaurar()
+        camino = [raiz]
+        nodo, pieza = raiz, pieza_raiz
+        claves = self._candidatos(raiz, pieza_raiz, turnos_raiz)
+        while True:
+            hijo, nuevo = self._elegir_hijo(nodo, pieza, claves)
+            self._jugar_turno(pieza, hijo.acciones)
+            camino.append(hijo)
+            nodo = hijo
+            if nuevo or self._terminada():
+                break
+            pieza = self._siguiente_pieza()
+            pieza.reiniciar_estado_turno()
+            claves = self._candidatos(nodo, pieza)
+
+        recompensas = self._simular()
+        raiz.visitas += 1
+        for nodo in camino[1:]:
+            nodo.visitas += 1
+            nodo.recompensa += recompensas[nodo.jugador]
+
+    def buscar(self, tablero, pieza_activa, cancelar=None):
+        """
+        Devuelve el Turno más visitado para pieza_activa (respeta ha_movido /
+        ha_atacado si el turno ya empezó). El tablero solo se lee, así que puede
+        ser una instantánea inmutable (tuplas). Si `cancelar` (threading.Event) se
+        activa, no se empiezan más simulaciones.
+        """
+        inicio = time.perf_counter()
+        limite = inicio + self.segundos
+        pieza = self._preparar(tablero, pieza_activa)
+        turnos = ordenar_turnos(pieza, list(generar_turnos(pieza, self.tablero)), self.tablero, self.piezas)
+        raiz = _Nodo(None, ())
+
+        simulaciones = 0
+        if len(turnos) > 1:
+            while time.perf_counter() < limite:
+                if self.max_simulaciones is not None and simulaciones >= self.max_simulaciones:
+                    break
+                if cancelar is not None and cancelar.is_set():
+                    break
+                self._iteracion(raiz, pieza, turnos)
+                simulaciones += 1
+
+        if raiz.hijos:
+            elegido = max(raiz.hijos.values(), key=lambda hijo: (hijo.visitas, hijo.recompensa))
+            acciones = elegido.acciones
+        else:
+            elegido, acciones = None, turnos[0].acciones
+
+        segundos = time.perf_counter() - inicio
+        self.estadisticas = {
+            'simulaciones': simulaciones,
+            'segundos': segundos,
+            'simulaciones_por_segundo': simulaciones / segundos if segundos > 0 else 0.0,
+            'visitas_elegido': elegido.visitas if elegido else 0,
+            'recompensa_media': elegido.recompensa / elegido.visitas if elegido and elegido.visitas else None,
+            'turnos_raiz': len(turnos),
+        }
+        self._restaurar()
+        return Turno(pieza, self.tablero, acciones)
@@ -1,9 +1,15 @@
 import random
 
+from game.logic import distancia_a_enemigos
+
 class SimpleAI:
     """
     IA básica para Gridfall. Prioriza ataques útiles y mueve hacia piezas rivales.
+    Usa el generador aleatorio de la partida si se le pasa uno.
     """
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random.Random()
+
     def elegir_accion(self, pieza, tablero, calcular_casillas_posibles, calcular_ataques_posibles):
         ataques = calcular_ataques_posibles(pieza, tablero)
         if ataques:
@@ -15,9 +21,8 @@ class SimpleAI:
             # Mueve hacia la pieza rival más cercana
             objetivo = self.encontrar_objetivo(pieza, tablero)
             if objetivo:
-                mejor_mov = min(movimientos, key=lambda mov: self.distancia(mov, objetivo.posicion))
-                return ('mover', mejor_mov)
-            return ('mover', random.choice(movimientos))
+                return ('mover', self.acercarse(movimientos, pieza, tablero, objetivo))
+            return ('mover', self.rng.choice(movimientos))
         return ('pasar', None)
 
     def valor_pieza(self, pieza):
@@ -33,5 +38,14 @@ class SimpleAI:
             return None
         return min(rivales, key=lambda p: self.distancia(pieza.posicion, p.posicion))
 
+    def acercarse(self, movimientos, pieza, tablero, objetivo):
+        """
+        Elige el movimiento que deja la pieza a menos pasos reales (rodeando piezas)
+        del rival más cercano; en caso de empate o si no hay camino, el más próximo al objetivo.
+        """
+        campo = distancia_a_enemigos(pieza.jugador, tablero)
+        sin_camino = len(tablero) * len(tablero[0])
+        return min(movimientos, key=lambda mov: (campo.get(mov, sin_camino), self.distancia(mov, objetivo.posicion)))
+
     def distancia(self, a, b):
         return abs(a[0] - b[0]) + abs(a[1] - b[1])
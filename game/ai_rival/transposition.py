@@ -0,0 +1,107 @@
+"""
+Tabla de transposición de tamaño fijo para la búsqueda alfa-beta.
+
+Cada cubo tiene dos huecos: uno que se queda con la entrada de mayor
+profundidad (salvo que sea de una búsqueda anterior) y otro que se reemplaza
+siempre. Una entrada guarda la clave completa de 64 bits, la profundidad
+buscada, el valor, el tipo de cota y el mejor turno (sus acciones).
+
+Los datos viven en listas paralelas preasignadas, así la tabla no crece nunca:
+con `cubos` cubos ocupa siempre 2 * cubos huecos.
+"""
+
+# Tipos de cota del valor guardado
+EXACTO = 0
+INFERIOR = 1   # el valor real es >= (hubo corte beta)
+SUPERIOR = 2   # el valor real es <= (ningún turno superó alfa)
+
+
+class TablaTransposicion:
+    """
+    Tabla con 2 * cubos huecos (cubos se redondea a potencia de dos).
+    Se comparte entre las iteraciones de una búsqueda y entre turnos de la
+    misma partida; nueva_busqueda() marca las entradas anteriores como viejas
+    para que el hueco de profundidad pueda reemplazarlas.
+    """
+
+    def __init__(self, cubos=1 << 16):
+        cubos = 1 << max(cubos - 1, 1).bit_length()
+        self.cubos = cubos
+        self._mascara = cubos - 1
+        huecos = 2 * cubos
+        self._claves = [None] * huecos
+        self._profundidades = [0] * huecos
+        self._valores = [0] * huecos
+        self._tipos = [EXACTO] * huecos
+        self._jugadas = [None] * huecos
+        self._generaciones = [0] * huecos
+        self.generacion = 0
+        self.ocupados = 0
+        self.consultas = 0
+        self.aciertos = 0
+        self.guardados = 0
+
+    def nueva_busqueda(self):
+        """Empieza una búsqueda nueva: las entradas existentes pasan a ser de generaciones anteriores."""
+        self.generacion += 1
+
+    def consultar(self, clave):
+        """Devuelve (profundidad, valor, tipo, jugada) de la posición, o None."""
+        self.consultas += 1
+        hueco = (clave & self._mascara) << 1
+        claves = self._claves
+        if claves[hueco] != clave:
+            hueco += 1
+            if claves[hueco] != clave:
+                return None
+        self.aciertos += 1
+        return self._profundidades[hueco], self._valores[hueco], self._tipos[hueco], self._jugadas[hueco]
+
+    def guardar(self, clave, profundidad, valor, tipo, jugada):
+        """
+        Guarda en el hueco de profundidad si está libre, es la misma posición, la
+        nueva búsqueda es al menos igual de profunda o la entrada es vieja; si no,
+        en el hueco de reemplazo siempre.
+        """
+        self.guardados += 1
+        hueco = (clave & self._mascara) << 1
+        anterior = self._claves[hueco]
+        if not (anterior is None or anterior == clave or profundidad >= self._profundidades[hueco]
+                or self._generaciones[hueco] != self.generacion):
+            hueco += 1
+            anterior = self._claves[hueco]
+        if anterior is None:
+            self.ocupados += 1
+        self._claves[hueco] = clave
+        self._profundidades[hueco] = profundidad
+        self._valores[hueco] = valor
+        self._tipos[hueco] = tipo
+        self._jugadas[hueco] = jugada
+        self._generaciones[hueco] = self.generacion
+
+    def ocupacion(self):
+        """Fracción de huecos ocupados."""
+        return self.ocupados / len(self._claves)
+
+    def tasa_aciertos(self):
+        return self.aciertos / self.consultas if self.consultas else 0.0
+
+    def estadisticas(self):
+        return {
+            'consultas': self.consultas,
+            'aciertos': self.aciertos,
+            'tasa_aciertos': self.tasa_aciertos(),
+            'guardados': self.guardados,
+            'ocupados': self.ocupados,
+            'huecos': len(self._claves),
+            'ocupacion': self.ocupacion(),
+        }
+
+    def limpiar(self):
+        huecos = len(self._claves)
+        self._claves = [None] * huecos
+        self._jugadas = [None] * huecos
+        self.ocupados = 0
+        self.consultas = 0
+        self.aciertos = 0
+        self.guardados = 0
@@ -0,0 +1,182 @@
+"""
+Generación vectorizada de movimientos y ataques para todas las piezas a la vez.
+El tablero se codifica como un array de NumPy con el propietario de cada casilla
+(las reglas de movimiento no dependen del tipo ni de los hp del contenido) y cada regla
+se aplica a una pila de máscaras (direcciones, piezas, casillas) en una sola pasada:
+desplazamientos para los rayos, dilatación iterativa para los 'steps' y un
+campo de distancias para los anillos de ataque ('steps', (a, b)).
+
+Las máscaras usan el tablero aplanado con un borde de una casilla: así un
+desplazamiento es un simple índice precalculado (un único take para las 8
+direcciones y todas las piezas) y el borde, que nunca es pasable, corta los rayos.
+
+Se usa a través de logic.calcular_todos_movimientos().
+"""
+
+import numpy as np
+
+from .move_tables import DIRECCIONES_RECT, DIRECCIONES_DIAG
+
+DIRECCIONES = DIRECCIONES_RECT + DIRECCIONES_DIAG
+
+# Caché de geometrías por (filas, columnas)
+_CACHE_GEOMETRIAS = {}
+
+
+class _GeometriaBorde:
+    """Índices del tablero aplanado con borde para un tamaño dado."""
+    def __init__(self, filas, columnas):
+        ancho = columnas + 2
+        self.total = (filas + 2) * ancho
+        self.interior = np.array([(f + 1) * ancho + c + 1 for f in range(filas) for c in range(columnas)])
+        # fuente[d, k]: casilla de la que llega el valor a k al desplazar en la dirección d
+        casillas = np.arange(self.total)
+        self.fuente = np.stack([
+            np.clip(casillas - (df * ancho + dc), 0, self.total - 1) for df, dc in DIRECCIONES
+        ])
+
+
+def _geometria(filas, columnas):
+    clave = (filas, columnas)
+    if clave not in _CACHE_GEOMETRIAS:
+        _CACHE_GEOMETRIAS[clave] = _GeometriaBorde(filas, columnas)
+    return _CACHE_GEOMETRIAS[clave]
+
+
+def codificar_tablero(tablero):
+    """
+    Devuelve (piezas, propietario). Las piezas van en orden de filas y el array
+    tiene forma (filas, columnas), con 0 en las casillas vacías.
+    """
+    piezas = [pieza for fila in tablero for pieza in fila if pieza is not None]
+    propietario = np.array([[pieza.jugador if pieza is not None else 0 for pieza in fila] for fila in tablero],
+                           dtype=np.int8)
+    return piezas, propietario
+
+
+def _resumir_reglas(piezas, reglas_de):
+    """
+    Resume las reglas de cada pieza en arrays por fila:
+    alcance rect, alcance diag, radio de 'steps' y la lista de anillos (min, max).
+    Varias reglas del mismo tipo se unen, así que basta con el máximo.
+    """
+    rect, diag, pasos, anillos = [], [], [], []
+    for pieza in piezas:
+        r = d = p = 0
+        propios = []
+        for tipo, valor in reglas_de(pieza):
+            if tipo in ('rect', 'allsides'):
+                r = max(r, valor)
+            if tipo in ('diag', 'allsides'):
+                d = max(d, valor)
+            if tipo == 'steps':
+                if isinstance(valor, tuple):
+                    propios.append(valor)
+                else:
+                    p = max(p, valor)
+        rect.append(r)
+        diag.append(d)
+        pasos.append(p)
+        anillos.append(propios)
+    return np.array(rect), np.array(diag), np.array(pasos), anillos
+
+
+def _rayos(origenes, indices, rect, diag, pasa, objetivo):
+    """
+    Recorre a la vez los rayos de las 8 direcciones de todas las piezas.
+    - pasa: casillas a través de las que el rayo continúa (P, N)
+    - objetivo: casillas que cuentan como resultado (P, N)
+    """
+    alcance = np.concatenate([np.repeat(rect[None], 4, axis=0), np.repeat(diag[None], 4, axis=0)])
+    resultado = np.zeros(origenes.shape, dtype=bool)
+    frente = np.repeat(origenes[None], len(DIRECCIONES), axis=0)
+    for i in range(1, int(alcance.max(initial=0)) + 1):
+        frente = frente.ravel()[indices]
+        resultado |= (frente & objetivo & (alcance >= i)[:, :, None]).any(axis=0)
+        frente &= pasa
+        if not frente.any():
+            break
+    return resultado
+
+
+def _distancias(origenes, indices_rect, pasables, radio):
+    """
+    Campo de distancias en pasos ortogonales para cada pieza, expandiendo solo
+    desde casillas pasables y hasta `radio` pasos. Las casillas no alcanzadas
+    valen radio + 1 (y el origen 0).
+    """
+    maximo = int(radio.max(initial=0))
+    distancia = np.full(origenes.shape, maximo + 1, dtype=np.int16)
+    distancia[origenes] = 0
+    visitadas = origenes.copy()
+    frente = origenes
+    for i in range(1, maximo + 1):
+        nuevas = frente.ravel()[indices_rect].any(axis=0) & ~visitadas & (radio >= i)[:, None]
+        if not nuevas.any():
+            break
+        distancia[nuevas] = i
+        visitadas |= nuevas
+        frente = nuevas & pasables
+    return distancia
+
+
+def calcular_todos_movimientos(tablero):
+    """
+    Devuelve (piezas, movimientos, ataques): movimientos y ataques son matrices
+    booleanas (piezas x casillas) con la casilla (f, c) en la columna f * columnas + c.
+    """
+    piezas, propietario = codificar_tablero(tablero)
+    filas, columnas = propietario.shape
+    total = len(piezas)
+    if total == 0:
+        vacio = np.zeros((0, filas * columnas), dtype=bool)
+        return piezas, vacio, vacio.copy()
+
+    geometria = _geometria(filas, columnas)
+    n = geometria.total
+    interior = geometria.interior
+
+    # Tablero con borde: -1 en el borde, que no es vacía ni enemiga de nadie
+    propietario_borde = np.full(n, -1, dtype=np.int8)
+    propietario_borde[interior] = propietario.ravel()
+
+    jugadores = np.array([pieza.jugador for pieza in piezas], dtype=np.int8)[:, None]
+    salta = np.array([pieza.puede_saltar for pieza in piezas], dtype=bool)[:, None]
+    origenes = np.zeros((total, n), dtype=bool)
+    origenes[np.arange(total), interior[[f * columnas + c for f, c in (p.posicion for p in piezas)]]] = True
+
+    en_tablero = propietario_borde >= 0
+    vacias = np.broadcast_to(propietario_borde == 0, (total, n))
+    enemigos = (propietario_borde[None] > 0) & (propietario_borde[None] != jugadores)
+
+    # Índices planos para desplazar la pila (direcciones, piezas, casillas) de una vez
+    desplazamiento_pieza = np.arange(total)[None, :, None] * n
+    indices = np.arange(len(DIRECCIONES))[:, None, None] * total * n + desplazamiento_pieza + geometria.fuente[:, None, :]
+    # Para los campos de distancias (pila de piezas sin eje de dirección)
+    indices_rect = desplazamiento_pieza + geometria.fuente[:len(DIRECCIONES_RECT), None, :]
+
+    # --- Movimientos ---
+    rect, diag, pasos, _ = _resumir_reglas(piezas, lambda pieza: pieza.movimientos)
+    movimientos = _rayos(origenes, indices, rect, diag, vacias | (salta & en_tablero), vacias)
+    if pasos.any():
+        distancia = _distancias(origenes, indices_rect, vacias, pasos)
+        movimientos |= (distancia > 0) & (distancia <= pasos[:, None])
+    movimientos &= vacias
+
+    # --- Ataques ---
+    rect, diag, _, anillos = _resumir_reglas(piezas, lambda pieza: pieza.rango_ataque)
+    pasables = en_tablero & ~enemigos
+    ataques = _rayos(origenes, indices, rect, diag, pasables | (salta & en_tablero), enemigos)
+    num_anillos = max(len(propios) for propios in anillos)
+    if num_anillos:
+        minimo = np.zeros((num_anillos, total), dtype=np.int16)
+        maximo = np.zeros((num_anillos, total), dtype=np.int16)
+        for i, propios in enumerate(anillos):
+            for j, (a, b) in enumerate(propios):
+                minimo[j, i], maximo[j, i] = a, b
+        distancia = _distancias(origenes, indices_rect, pasables, maximo.max(axis=0))
+        for j in range(num_anillos):
+            ataques |= (distancia > minimo[j][:, None]) & (distancia <= maximo[j][:, None])
+    ataques &= enemigos
+
+    return piezas, movimientos[:, interior], ataques[:, interior]
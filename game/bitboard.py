@@ -0,0 +1,243 @@
+"""
+Representación del tablero como bitboards.
+Cada casilla (fila, col) es el bit fila * COLUMNAS + col de un int de Python,
+así el tablero de 9x8 (72 casillas) cabe en un solo entero.
+Se mantiene en paralelo al `tablero` de listas, que sigue siendo la fuente para el dibujado.
+"""
+
+from .constants import FILAS, COLUMNAS
+from .move_tables import DIRECCIONES_RECT, DIRECCIONES_DIAG, obtener_tablas
+
+# Caché de geometrías por (filas, columnas)
+_CACHE_GEOMETRIAS = {}
+
+# Caché de zonas por (filas, columnas, casilla, reglas)
+_CACHE_ZONAS = {}
+
+
+class GeometriaBits:
+    """
+    Máscaras precalculadas para un tamaño de tablero.
+    Para cada dirección guarda (origenes_validos, izquierda, derecha): al enmascarar
+    antes de desplazar ningún bit se sale del tablero ni salta de fila. Uno de los
+    dos desplazamientos es siempre 0, así se aplica ((m & origenes) << izq) >> der
+    sin ramas en los bucles internos.
+    """
+    def __init__(self, filas, columnas):
+        self.filas = filas
+        self.columnas = columnas
+        self.lleno = (1 << (filas * columnas)) - 1
+        self.casillas = obtener_tablas(filas, columnas).casillas
+        self.casilla_de_indice = [self.casillas[i // columnas][i % columnas] for i in range(filas * columnas)]
+
+        self.desplazamientos = {}
+        for df, dc in DIRECCIONES_RECT + DIRECCIONES_DIAG:
+            origenes = 0
+            for f in range(filas):
+                for c in range(columnas):
+                    if 0 <= f + df < filas and 0 <= c + dc < columnas:
+                        origenes |= 1 << (f * columnas + c)
+            desplazamiento = df * columnas + dc
+            self.desplazamientos[(df, dc)] = (origenes, max(desplazamiento, 0), max(-desplazamiento, 0))
+        self.rect = tuple(self.desplazamientos[d] for d in DIRECCIONES_RECT)
+        self.diag = tuple(self.desplazamientos[d] for d in DIRECCIONES_DIAG)
+
+    def bit(self, casilla):
+        return 1 << (casilla[0] * self.columnas + casilla[1])
+
+    def a_casillas(self, mascara):
+        """Convierte una máscara en la lista de casillas (fila, col) que contiene."""
+        casillas = []
+        casilla_de_indice = self.casilla_de_indice
+        while mascara:
+            menor = mascara & -mascara
+            casillas.append(casilla_de_indice[menor.bit_length() - 1])
+            mascara ^= menor
+        return casillas
+
+
+def obtener_geometria(filas, columnas):
+    """Devuelve (y construye la primera vez) las máscaras para un tamaño de tablero."""
+    clave = (filas, columnas)
+    geometria = _CACHE_GEOMETRIAS.get(clave)
+    if geometria is None:
+        geometria = GeometriaBits(filas, columnas)
+        _CACHE_GEOMETRIAS[clave] = geometria
+    return geometria
+
+
+def zona_influencia(geometria, casilla, reglas):
+    """
+    Máscara de las casillas cuyo contenido puede alterar el resultado de unas
+    reglas (pieza.movimientos o pieza.rango_ataque) lanzadas desde `casilla`.
+    Ignora bloqueos, así que es un superconjunto seguro de lo que se examina:
+    los rayos hasta n casillas y el rombo de distancia Manhattan n para 'steps'.
+    """
+    clave = (geometria.filas, geometria.columnas, casilla, tuple(reglas))
+    zona = _CACHE_ZONAS.get(clave)
+    if zona is not None:
+        return zona
+
+    tablas = obtener_tablas(geometria.filas, geometria.columnas)
+    fila, col = casilla
+    zona = geometria.bit(casilla)
+    for tipo, valor in reglas:
+        rayos = ()
+        if tipo in ('rect', 'allsides'):
+            rayos += tablas.rayos_rect[fila][col]
+        if tipo in ('diag', 'allsides'):
+            rayos += tablas.rayos_diag[fila][col]
+        for rayo in rayos:
+            for otra in rayo[:valor]:
+                zona |= geometria.bit(otra)
+        if tipo == 'steps':
+            radio = valor[1] if isinstance(valor, tuple) else valor
+            for f in range(max(0, fila - radio), min(geometria.filas, fila + radio + 1)):
+                resto = radio - abs(f - fila)
+                for c in range(max(0, col - resto), min(geometria.columnas, col + resto + 1)):
+                    zona |= geometria.bit((f, c))
+
+    _CACHE_ZONAS[clave] = zona
+    return zona
+
+
+def _dilatar_ortogonal(mascara, rect):
+    """Casillas a un paso ortogonal de cualquier bit de la máscara."""
+    (o1, i1, d1), (o2, i2, d2), (o3, i3, d3), (o4, i4, d4) = rect
+    return (((mascara & o1) << i1) >> d1 | ((mascara & o2) << i2) >> d2
+            | ((mascara & o3) << i3) >> d3 | ((mascara & o4) << i4) >> d4)
+
+
+class Bitboard:
+    """
+    Máscaras de ocupación global, por jugador y por tipo de pieza (nombre).
+    Debe actualizarse en cada movimiento y muerte, igual que el tablero.
+    """
+    def __init__(self, filas=FILAS, columnas=COLUMNAS):
+        self.geometria = obtener_geometria(filas, columnas)
+        self.ocupadas = 0
+        self.por_jugador = {}
+        self.por_tipo = {}
+
+    @classmethod
+    def desde_tablero(cls, tablero):
+        bitboard = cls(len(tablero), len(tablero[0]))
+        bitboard.reconstruir(tablero)
+        return bitboard
+
+    def reconstruir(self, tablero):
+        """Recalcula todas las máscaras desde el tablero (usado al deshacer)."""
+        self.ocupadas = 0
+        self.por_jugador = {}
+        self.por_tipo = {}
+        for fila in tablero:
+            for pieza in fila:
+                if pieza is not None:
+                    self.colocar(pieza, pieza.posicion)
+
+    # --- Sincronización con el tablero ---
+
+    def colocar(self, pieza, casilla):
+        bit = self.geometria.bit(casilla)
+        self.ocupadas |= bit
+        self.por_jugador[pieza.jugador] = self.por_jugador.get(pieza.jugador, 0) | bit
+        self.por_tipo[pieza.nombre] = self.por_tipo.get(pieza.nombre, 0) | bit
+
+    def quitar(self, pieza, casilla):
+        bit = ~self.geometria.bit(casilla)
+        self.ocupadas &= bit
+        self.por_jugador[pieza.jugador] &= bit
+        self.por_tipo[pieza.nombre] &= bit
+
+    def mover(self, pieza, origen, destino):
+        self.quitar(pieza, origen)
+        self.colocar(pieza, destino)
+
+    def conectar(self, eventos):
+        """Se suscribe al BusEventos de la partida para seguir al tablero."""
+        eventos.suscribir('movimiento', self.mover)
+        eventos.suscribir('muerte', self.quitar)
+        eventos.suscribir('deshacer', self.reconstruir)
+
+    # --- Consultas ---
+
+    def aliados(self, pieza):
+        return self.por_jugador.get(pieza.jugador, 0)
+
+    def enemigos(self, pieza):
+        return self.ocupadas & ~self.aliados(pieza)
+
+    def a_casillas(self, mascara):
+        return self.geometria.a_casillas(mascara)
+
+    # --- Generación de movimientos ---
+
+    def _rayos(self, pieza, direcciones, n, is_attack):
+        """
+        Igual que los rayos de logic.py, pero devuelve solo lo útil:
+        casillas vacías para mover o enemigos alcanzados para atacar.
+        """
+        origen = self.geometria.bit(pieza.posicion)
+        resultado = 0
+        if pieza.puede_saltar:
+            for origenes, izq, der in direcciones:
+                frente = origen
+                for _ in range(n):
+                    frente = ((frente & origenes) << izq) >> der
+                    resultado |= frente
+            return resultado & (self.enemigos(pieza) if is_attack else ~self.ocupadas)
+
+        if is_attack:
+            enemigos = self.enemigos(pieza)
+            for origenes, izq, der in direcciones:
+                frente = origen
+                for _ in range(n):
+                    frente = ((frente & origenes) << izq) >> der
+                    if not frente:
+                        break
+                    if frente & enemigos:
+                        resultado |= frente
+                        break
+            return resultado
+
+        vacias = self.geometria.lleno & ~self.ocupadas
+        for origenes, izq, der in direcciones:
+            frente = origen
+            for _ in range(n):
+                frente = ((frente & origenes) << izq) >> der & vacias
+                if not frente:
+                    break
+                resultado |= frente
+        return resultado
+
+    def _zona_pasos(self, pieza, n, pasables, minimo=0):
+        """
+        Dilatación iterativa equivalente a logic._campo_pasos: casillas descubiertas
+        en n pasos expandiendo solo desde las pasables. Si minimo > 0 se quita
+        la zona alcanzada en `minimo` pasos (anillo de ataque a distancia).
+        """
+        rect = self.geometria.rect
+        visitadas = frente = self.geometria.bit(pieza.posicion)
+        zona_muerta = visitadas
+        if minimo >= n:
+            return 0
+        for paso in range(n):
+            if paso == minimo:
+                zona_muerta = visitadas
+            nuevas = _dilatar_ortogonal(frente, rect) & ~visitadas
+            visitadas |= nuevas
+            frente = nuevas & pasables
+            if not frente:
+                # La zona ya no crece: si aún no llegamos al mínimo, el anillo queda vacío.
+                if paso < minimo:
+                    return 0
+                break
+        return visitadas & ~zona_muerta
+
+    def movimientos(self, pieza):
+        """Máscara de casillas a las que la pieza puede moverse (según su plan compilado)."""
+        return pieza.plan_movimientos.mascara(pieza, self)
+
+    def ataques(self, pieza):
+        """Máscara de casillas con enemigos dentro del rango de ataque (según su plan compilado)."""
+        return pieza.plan_ataque.mascara(pieza, self)
@@ -112,6 +112,7 @@ def dibujar_ui(pantalla, fuente, pieza_activa):
     boton_volver = pygame.Rect(constants.OFFSET_X + 10, constants.OFFSET_Y + 10, 100, 40)
     boton_deshacer = pygame.Rect(constants.OFFSET_X + constants.ANCHO_TABLERO - 120, constants.OFFSET_Y + 10, 50, 40)
     boton_pasar = pygame.Rect(constants.OFFSET_X + constants.ANCHO_TABLERO - 60, constants.OFFSET_Y + 10, 50, 40)
+    boton_rehacer = obtener_boton_rehacer()
 
     # Boton Volver
     pygame.draw.rect(pantalla, (180, 50, 50), boton_volver, border_radius=5)
@@ -122,6 +123,11 @@ def dibujar_ui(pantalla, fuente, pieza_activa):
     pygame.draw.rect(pantalla, (90, 90, 90), boton_deshacer, border_radius=5)
     texto_deshacer = fuente.render("<-", True, (255, 255, 255))
     pantalla.blit(texto_deshacer, texto_deshacer.get_rect(center=boton_deshacer.center))
+
+    # Botón Rehacer
+    pygame.draw.rect(pantalla, (90, 90, 90), boton_rehacer, border_radius=5)
+    texto_rehacer = fuente.render("->", True, (255, 255, 255))
+    pantalla.blit(texto_rehacer, texto_rehacer.get_rect(center=boton_rehacer.center))
     
     # Botón de Pasar Turno
     pygame.draw.rect(pantalla, (90, 90, 90), boton_pasar, border_radius=5)
@@ -213,6 +219,25 @@ def dibujar_borde_turno(pantalla, pieza_activa):
     pygame.draw.rect(pantalla, color_borde, borde_rect, constants.GROSOR_BORDE)
 
 
+def dibujar_ia_pensando(pantalla, fuente, milisegundos):
+    """
+    Indicador "IA pensando..." sobre la parte de arriba del tablero mientras la IA
+    busca su acción. Los puntos avanzan con `milisegundos` (pygame.time.get_ticks()).
+    """
+    puntos = "." * (1 + milisegundos // 400 % 3)
+    texto = fuente.render(f"IA pensando{puntos}", True, (255, 215, 0))
+    # Se mide con tres puntos para que la caja no cambie de ancho
+    ancho, alto = fuente.size("IA pensando...")
+    caja = pygame.Rect(0, 0, ancho + 30, alto + 12)
+    caja.midtop = (constants.OFFSET_X + constants.ANCHO_TABLERO // 2, constants.OFFSET_Y + constants.UI_ALTO + 8)
+
+    fondo = pygame.Surface(caja.size, pygame.SRCALPHA)
+    fondo.fill((0, 0, 0, 170))
+    pantalla.blit(fondo, caja.topleft)
+    pygame.draw.rect(pantalla, (255, 80, 80), caja, 2, border_radius=6)  # COLOR_J2_VIBRANTE
+    pantalla.blit(texto, (caja.x + 15, caja.y + 6))
+
+
 def obtener_boton_volver():
     """Retorna el rectángulo del botón Volver con offsets aplicados."""
     return pygame.Rect(constants.OFFSET_X + 10, constants.OFFSET_Y + 10, 100, 40)
@@ -221,6 +246,10 @@ def obtener_boton_deshacer():
     """Retorna el rectángulo del botón Deshacer con offsets aplicados."""
     return pygame.Rect(constants.OFFSET_X + constants.ANCHO_TABLERO - 120, constants.OFFSET_Y + 10, 50, 40)
 
+def obtener_boton_rehacer():
+    """Retorna el rectángulo del botón Rehacer (sobre el panel de turnos) con offsets aplicados."""
+    return pygame.Rect(constants.OFFSET_X + constants.ANCHO_TABLERO + 10, constants.OFFSET_Y + 10, 50, 40)
+
 def obtener_boton_pasar():
     """Retorna el rectángulo del botón Pasar con offsets aplicados."""
     return pygame.Rect(constants.OFFSET_X + constants.ANCHO_TABLERO - 60, constants.OFFSET_Y + 10, 50, 40)
@@ -0,0 +1,36 @@
+"""
+Bus de eventos de la partida.
+El estado en juego emite un evento cada vez que cambia el tablero y las
+estructuras derivadas (bitboard, mapas de alcance...) se suscriben para
+mantenerse sincronizadas sin que in_game.py tenga que conocerlas una a una.
+
+Eventos emitidos:
+    'turno'      (pieza, reloj)  -> la pieza pasa a ser la activa
+    'movimiento' (pieza, origen, destino)
+    'ataque'     (pieza, objetivo)  -> se declara el ataque (ha_atacado ya es True)
+    'dano'       (pieza, cantidad)
+    'muerte'     (pieza, casilla)
+    'fin_turno'  (pieza)  -> la pieza termina su turno (antes de reprogramarla)
+    'historial'  (sentido)  -> 'deshacer' o 'rehacer'; justo antes de 'deshacer'
+    'deshacer'   (tablero)  -> el tablero se ha restaurado por completo
+    'reprogramacion' (pieza, proximo_turno_anterior)  -> lo emite TurnManager
+"""
+
+
+class BusEventos:
+    def __init__(self):
+        self._suscriptores = {}
+
+    def suscribir(self, evento, callback):
+        """Registra callback(*args) para el evento indicado."""
+        self._suscriptores.setdefault(evento, []).append(callback)
+
+    def desuscribir(self, evento, callback):
+        callbacks = self._suscriptores.get(evento, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def emitir(self, evento, *args):
+        """Notifica a los suscriptores en el orden en que se registraron."""
+        for callback in self._suscriptores.get(evento, ()):
+            callback(*args)
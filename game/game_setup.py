@@ -3,6 +3,23 @@ import random
 from .piece import (crear_soldado, crear_paladin, crear_mago,
                     crear_dragon, crear_destructor)
 from .constants import FILAS, COLUMNAS
+from .eventos import BusEventos
+from .bitboard import Bitboard
+from .reach_map import MapaAlcance
+from .logic import ThreatMap
+from .zobrist import HashZobrist, CacheReglasLRU
+
+class GeneradorPartida(random.Random):
+    """
+    Generador aleatorio propio de una partida. Guarda la semilla con la que se creó
+    para poder reproducir la partida (desempates de turnos, decisiones de la IA).
+    """
+    def __init__(self, semilla=None):
+        if semilla is None:
+            semilla = random.SystemRandom().randrange(2 ** 32)
+        self.semilla = semilla
+        super().__init__(semilla)
+
 
 def crear_nuevo_juego():
     """Crea y devuelve un tablero con todas las piezas iniciales."""
@@ -67,4 +84,34 @@ def crear_nuevo_juego():
             destructor.posicion = (0, 4)
             tablero[0][4] = destructor
     
-    return tablero
\ No newline at end of file
+    return tablero
+
+
+def crear_estructuras_partida(tablero, reloj=0, tamano_cache_reglas=4096):
+    """
+    Crea el bus de eventos de la partida y las estructuras derivadas del tablero,
+    ya suscritas. Devuelve un diccionario pensado para mezclarse con datos_en_juego.
+    """
+    eventos = BusEventos()
+
+    bitboard = Bitboard.desde_tablero(tablero)
+    bitboard.conectar(eventos)
+
+    hash_zobrist = HashZobrist(tablero, reloj)
+    hash_zobrist.conectar(eventos)
+    cache_reglas = CacheReglasLRU(tamano_cache_reglas)
+
+    mapa_alcance = MapaAlcance(tablero, bitboard, hash_zobrist, cache_reglas)
+    mapa_alcance.conectar(eventos)
+
+    mapa_amenazas = ThreatMap(tablero)
+    mapa_amenazas.conectar(eventos)
+
+    return {
+        'eventos': eventos,
+        'bitboard': bitboard,
+        'hash_zobrist': hash_zobrist,
+        'cache_reglas': cache_reglas,
+        'mapa_alcance': mapa_alcance,
+        'mapa_amenazas': mapa_amenazas,
+    }
@@ -1,4 +1,8 @@
+from collections import deque
+
 from .constants import FILAS, COLUMNAS # Importación relativa
+from .move_tables import tablas_de
+from .bitboard import obtener_geometria, zona_influencia
 
 # --- FUNCIONES DE CÁLCULO DE MOVIMIENTO ---
 
@@ -6,32 +10,79 @@ def es_valida(fila, col):
     """Comprueba si una coordenada está dentro del tablero."""
     return 0 <= fila < FILAS and 0 <= col < COLUMNAS
 
-def _buscar_pasos(pieza, n, tablero, is_attack=False):
-    if n == 0:
-        return set()
-    
-    fila_origen, col_origen = pieza.posicion
-    casillas_inrange = set()
-    cola = [((fila_origen, col_origen), 0)]
-    visitados = {(fila_origen, col_origen)}
+def campo_distancias(tablero, origenes, expandir, maximo=None):
+    """
+    BFS de una sola pasada (con deque) desde una o varias casillas de origen.
+    Devuelve {casilla: pasos} con la distancia ortogonal de cada casilla descubierta;
+    los orígenes valen 0.
+    - expandir(pieza_en_casilla): indica si se sigue explorando desde una casilla
+      descubierta (los orígenes siempre se expanden).
+    - maximo: si se indica, no se descubren casillas a más de `maximo` pasos.
+    Con varios orígenes cada casilla queda a la distancia del origen más cercano,
+    p.ej. la distancia a la pieza enemiga más próxima (ver distancia_a_enemigos).
+    """
+    vecinos = tablas_de(tablero).vecinos
+    distancias = {}
+    cola = deque()
+    for origen in origenes:
+        if origen not in distancias:
+            distancias[origen] = 0
+            cola.append(origen)
 
     while cola:
-        (f, c), pasos = cola.pop(0)
-        if pasos >= n:
+        f, c = cola.popleft()
+        siguiente = distancias[(f, c)] + 1
+        if maximo is not None and siguiente > maximo:
             continue
-        for df, dc in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-            nf, nc = f + df, c + dc
-            if es_valida(nf, nc) and (nf, nc) not in visitados:
-                visitados.add((nf, nc))
-                casillas_inrange.add((nf, nc))
+        for casilla in vecinos[f][c]:
+            if casilla not in distancias:
+                distancias[casilla] = siguiente
+                if expandir(tablero[casilla[0]][casilla[1]]):
+                    cola.append(casilla)
+    return distancias
+
+def _campo_pasos(pieza, n, tablero, is_attack=False):
+    """
+    Campo de distancias de una pieza hasta n pasos.
+    - Si es un movimiento, solo se sigue explorando desde casillas vacías.
+    - Si es un ataque, también a través de aliados.
+    """
+    jugador = pieza.jugador
+    if is_attack:
+        expandir = lambda otra: otra is None or otra.jugador == jugador
+    else:
+        expandir = lambda otra: otra is None
+    return campo_distancias(tablero, (pieza.posicion,), expandir, n)
+
+def distancia_a_enemigos(jugador, tablero):
+    """
+    Campo multiorigen: para cada casilla, los pasos ortogonales hasta la pieza
+    enemiga de `jugador` más cercana, avanzando solo por casillas vacías.
+    Las casillas inalcanzables no aparecen en el resultado.
+    """
+    enemigos = [pieza.posicion for fila in tablero for pieza in fila if pieza and pieza.jugador != jugador]
+    return campo_distancias(tablero, enemigos, lambda otra: otra is None)
 
-                pieza_en_casilla = tablero[nf][nc]
 
-                if pieza_en_casilla is None:  # Si la casilla está vacía, seguimos explorando.
-                    cola.append(((nf, nc), pasos + 1))
-                elif is_attack and pieza_en_casilla.jugador == pieza.jugador:
-                    cola.append(((nf, nc), pasos + 1))  # Si es un ataque, seguimos si es aliado.                    
-    return casillas_inrange
+def _recorrer_rayos(pieza, rayos, tablero, is_attack):
+    """
+    Recorre los rayos precalculados de una casilla, ya recortados a n pasos.
+    - Si es un movimiento, se detiene ante cualquier pieza.
+    - Si es un ataque, pasa a través de aliados y se detiene en enemigos.
+    """
+    casillas = []
+    jugador = pieza.jugador
+    for rayo in rayos:
+        for casilla in rayo:
+            pieza_bloqueante = tablero[casilla[0]][casilla[1]]
+            if pieza_bloqueante is not None:
+                if not is_attack:
+                    break  # Si hay una pieza, no podemos seguir en esa dirección.
+                if pieza_bloqueante.jugador != jugador:
+                    casillas.append(casilla)
+                    break
+            casillas.append(casilla)
+    return casillas
 
 
 def calcular_mov_rect(pieza, n, tablero, is_attack=False):
@@ -40,66 +91,20 @@ def calcular_mov_rect(pieza, n, tablero, is_attack=False):
     - Si es un movimiento, se detiene ante cualquier pieza.
     - Si es un ataque, pasa a través de aliados y se detiene en enemigos.
     """
-    casillas = set()
+    tablas = tablas_de(tablero)
     fila_origen, col_origen = pieza.posicion
     if pieza.puede_saltar:
         # Si puede saltar, consideramos que puede moverse hasta n casillas en línea recta.
-        for i in range(1, n + 1):
-            posiciones = [(fila_origen - i, col_origen), (fila_origen + i, col_origen),
-                          (fila_origen, col_origen - i), (fila_origen, col_origen + i)]
-            for f, c in posiciones:
-                if es_valida(f, c):
-                    casillas.add((f, c))
-        pass
-    else:
-        direcciones = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-        for df, dc in direcciones:
-            for i in range(1, n + 1):
-                nf, nc = fila_origen + i*df, col_origen + i*dc
-                if not es_valida(nf, nc):
-                    break
-
-                pieza_bloqueante = tablero[nf][nc]
-                if pieza_bloqueante is not None:
-                    if is_attack:
-                        if pieza_bloqueante.jugador != pieza.jugador:
-                            casillas.add((nf, nc))
-                            break
-                    else:
-                        break  # Si hay una pieza, no podemos seguir en esa dirección.
-                casillas.add((nf, nc))
-    return list(casillas)
+        return list(tablas.saltos(tablas.saltos_rect, fila_origen, col_origen, n))
+    return _recorrer_rayos(pieza, tablas.rayos(tablas.recortes_rect, fila_origen, col_origen, n), tablero, is_attack)
 
 def calcular_mov_diag(pieza, n, tablero, is_attack=False):
-    casillas = set()
+    tablas = tablas_de(tablero)
     fila_origen, col_origen = pieza.posicion
     if pieza.puede_saltar:
         # Si puede saltar, consideramos que puede moverse hasta n casillas en diagonal.
-        for i in range(1, n + 1):
-            posiciones = [(fila_origen - i, col_origen - i), (fila_origen - i, col_origen + i),
-                          (fila_origen + i, col_origen - i), (fila_origen + i, col_origen + i)]
-            for f, c in posiciones:
-                if es_valida(f, c):
-                    casillas.add((f, c))
-        pass
-    else:
-        direcciones = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-        for df, dc in direcciones:
-            for i in range(1, n + 1):
-                nf, nc = fila_origen + i*df, col_origen + i*dc
-                if not es_valida(nf, nc):
-                    break
-
-                pieza_bloqueante = tablero[nf][nc]
-                if pieza_bloqueante is not None:
-                    if is_attack:
-                        if pieza_bloqueante.jugador != pieza.jugador:
-                            casillas.add((nf, nc))
-                            break
-                    else:
-                        break
-                casillas.add((nf, nc))
-    return list(casillas)
+        return list(tablas.saltos(tablas.saltos_diag, fila_origen, col_origen, n))
+    return _recorrer_rayos(pieza, tablas.rayos(tablas.recortes_diag, fila_origen, col_origen, n), tablero, is_attack)
 
 def calcular_mov_allsides(pieza, n, tablero, is_attack=False):
     rectas = set(calcular_mov_rect(pieza, n, tablero, is_attack))
@@ -107,73 +112,151 @@ def calcular_mov_allsides(pieza, n, tablero, is_attack=False):
     return list(rectas.union(diagonales))
     
 def calcular_mov_steps(pieza, n, tablero):
-    casillas_accesibles = _buscar_pasos(pieza, n, tablero, is_attack=False)
-    movimientos_validos = set()
-    for f, c in casillas_accesibles:
-        if tablero[f][c] is None:
-            movimientos_validos.add((f, c))
-    return list(movimientos_validos)
+    if n <= 0:
+        return []
+    campo = _campo_pasos(pieza, n, tablero, is_attack=False)
+    return [(f, c) for (f, c), pasos in campo.items() if pasos > 0 and tablero[f][c] is None]
 
 def calcular_ran_steps(pieza, a, b, tablero):
-    zona_maxima = _buscar_pasos(pieza, b, tablero, is_attack=True)
-    if a <= 0:
-        return zona_maxima
-    zona_muerta = _buscar_pasos(pieza, a, tablero, is_attack=True)
-    zona_valida = zona_maxima - zona_muerta
-    return list(zona_valida)
-
-def calcular_casillas_posibles(pieza, tablero):
-    casillas_en_rango = set()
-
-    for tipo_mov, valor_mov in pieza.movimientos:
-        casillas_calculadas = []
-        if tipo_mov == 'rect':
-            casillas_calculadas = calcular_mov_rect(pieza, valor_mov, tablero)
-        elif tipo_mov == 'diag':
-            casillas_calculadas = calcular_mov_diag(pieza, valor_mov, tablero)
-        elif tipo_mov == 'allsides':
-            casillas_calculadas = calcular_mov_allsides(pieza, valor_mov, tablero)
-        elif tipo_mov == 'steps':
-            casillas_calculadas = calcular_mov_steps(pieza, valor_mov, tablero)
-
-        casillas_en_rango.update(casillas_calculadas)
-    
-    movimientos_validos = set()
-    for fila, col in casillas_en_rango:
-        if tablero[fila][col] is None:
-            movimientos_validos.add((fila, col))
+    """Anillo de ataque: casillas a más de `a` y como mucho `b` pasos, con un solo BFS."""
+    if b <= 0 or a >= b:
+        return []
+    campo = _campo_pasos(pieza, b, tablero, is_attack=True)
+    minimo = max(a, 0)
+    return [casilla for casilla, pasos in campo.items() if pasos > minimo]
 
-    return list(movimientos_validos)
+def calcular_casillas_posibles(pieza, tablero, bitboard=None):
+    """
+    Calcula las casillas vacías a las que la pieza puede moverse.
+    Ejecuta el plan compilado de la pieza (pieza.plan_movimientos).
+    Si se pasa un Bitboard sincronizado con el tablero, se usa ese backend.
+    """
+    plan = pieza.plan_movimientos
+    if bitboard is not None and plan.admite_bitboard:
+        return bitboard.a_casillas(plan.mascara(pieza, bitboard))
+    return plan.casillas(pieza, tablero)
 
-def calcular_ataques_posibles(pieza, tablero):
+def calcular_ataques_posibles(pieza, tablero, bitboard=None):
     """
     Calcula las casillas que contienen un enemigo y están en el rango de ataque.
+    Ejecuta el plan compilado de la pieza (pieza.plan_ataque).
+    Si se pasa un Bitboard sincronizado con el tablero, se usa ese backend.
+    """
+    plan = pieza.plan_ataque
+    if bitboard is not None and plan.admite_bitboard:
+        return bitboard.a_casillas(plan.mascara(pieza, bitboard))
+    return plan.casillas(pieza, tablero)
+
+def calcular_todos_movimientos(tablero):
+    """
+    Calcula movimientos y ataques de todas las piezas del tablero en una sola
+    pasada vectorizada con NumPy (ver game/batch_moves.py).
+    Devuelve (piezas, movimientos, ataques), donde movimientos y ataques son
+    matrices booleanas (piezas x casillas) y la casilla (f, c) es la columna
+    f * COLUMNAS + c. Coincide exactamente con las funciones por pieza.
+    """
+    # Importación diferida: NumPy solo hace falta para este cálculo por lotes.
+    from .batch_moves import calcular_todos_movimientos as calcular_en_lote
+    return calcular_en_lote(tablero)
+
+class ThreatMap:
+    """
+    Mapa de amenazas: para cada casilla, qué piezas de cada jugador pueden atacarla ahora.
+    Una casilla está amenazada por una pieza si cae en la zona de su plan de ataque:
+    los rayos atraviesan aliados y se detienen en el primer enemigo (incluido), y los
+    anillos 'steps' cuentan desde más de `a` hasta `b` pasos. Sobre una casilla con un
+    enemigo coincide con calcular_ataques_posibles.
+
+    Se mantiene por eventos: al mover o morir una pieza solo se recalculan las piezas
+    cuya zona de influencia toca las casillas que cambiaron.
     """
-    casillas_en_rango = set()
-
-    # 1. Obtenemos todas las casillas en rango de ataque.
-    for tipo_ran, valor_ran in pieza.rango_ataque:
-        casillas_calculadas = []
-        if tipo_ran == 'rect':
-            casillas_calculadas = calcular_mov_rect(pieza, valor_ran, tablero, is_attack=True)
-        elif tipo_ran == 'diag':
-            casillas_calculadas = calcular_mov_diag(pieza, valor_ran, tablero, is_attack=True)
-        elif tipo_ran == 'allsides':
-            casillas_calculadas = calcular_mov_allsides(pieza, valor_ran, tablero, is_attack=True)
-        elif tipo_ran == 'steps':
-            min_ran, max_ran = valor_ran
-            casillas_calculadas = calcular_ran_steps(pieza, min_ran, max_ran, tablero)
-        
-        casillas_en_rango.update(casillas_calculadas)
-
-    # 2. Filtramos para quedarnos solo con las que tienen un enemigo.
-    ataques_validos = set()
-    for fila, col in casillas_en_rango:
-        pieza_en_casilla = tablero[fila][col]
-        if pieza_en_casilla is not None and pieza_en_casilla.jugador != pieza.jugador:
-            ataques_validos.add((fila, col))
-            
-    return list(ataques_validos)
+    def __init__(self, tablero):
+        self.reconstruir(tablero)
+
+    def conectar(self, eventos):
+        """Se suscribe al BusEventos de la partida."""
+        eventos.suscribir('movimiento', self._al_mover)
+        eventos.suscribir('muerte', self._al_morir)
+        eventos.suscribir('deshacer', self.reconstruir)
+
+    def reconstruir(self, tablero):
+        self.tablero = tablero
+        self.geometria = obtener_geometria(len(tablero), len(tablero[0]))
+        # atacantes[f][c]: {jugador: set(piezas)}
+        self._atacantes = [[{} for _ in fila] for fila in tablero]
+        # pieza -> (casillas amenazadas, máscara de influencia)
+        self._zonas = {}
+        for fila in tablero:
+            for pieza in fila:
+                if pieza is not None:
+                    self._agregar(pieza)
+
+    # --- Consultas ---
+
+    def atacantes(self, casilla, jugador=None):
+        """Piezas que amenazan la casilla; solo las de `jugador` si se indica."""
+        por_jugador = self._atacantes[casilla[0]][casilla[1]]
+        if jugador is not None:
+            return set(por_jugador.get(jugador, ()))
+        return set().union(*por_jugador.values())
+
+    def amenazas_contra(self, casilla, jugador):
+        """Piezas rivales de `jugador` que amenazan la casilla."""
+        por_jugador = self._atacantes[casilla[0]][casilla[1]]
+        return set().union(*(piezas for otro, piezas in por_jugador.items() if otro != jugador))
+
+    def es_segura(self, casilla, jugador):
+        """True si ninguna pieza rival de `jugador` amenaza la casilla."""
+        por_jugador = self._atacantes[casilla[0]][casilla[1]]
+        return not any(piezas for otro, piezas in por_jugador.items() if otro != jugador)
+
+    def mapa_peligro(self, jugador):
+        """{casilla: número de piezas rivales que la amenazan}, útil para dibujar peligro."""
+        peligro = {}
+        for f, fila in enumerate(self._atacantes):
+            for c, por_jugador in enumerate(fila):
+                total = sum(len(piezas) for otro, piezas in por_jugador.items() if otro != jugador)
+                if total:
+                    peligro[(f, c)] = total
+        return peligro
+
+    def casillas_amenazadas(self, pieza):
+        return set(self._zonas[pieza][0]) if pieza in self._zonas else set()
+
+    # --- Mantenimiento ---
+
+    def _agregar(self, pieza):
+        casillas = pieza.plan_ataque.zona(pieza, self.tablero)
+        influencia = zona_influencia(self.geometria, pieza.posicion, pieza.rango_ataque)
+        self._zonas[pieza] = (casillas, influencia)
+        for f, c in casillas:
+            self._atacantes[f][c].setdefault(pieza.jugador, set()).add(pieza)
+
+    def _quitar(self, pieza):
+        entrada = self._zonas.pop(pieza, None)
+        if entrada is None:
+            return
+        for f, c in entrada[0]:
+            self._atacantes[f][c][pieza.jugador].discard(pieza)
+
+    def actualizar_casillas(self, *casillas):
+        """Recalcula las piezas cuya zona de influencia toca alguna casilla."""
+        mascara = 0
+        for casilla in casillas:
+            mascara |= self.geometria.bit(casilla)
+        afectadas = [pieza for pieza, (_, influencia) in self._zonas.items() if influencia & mascara]
+        for pieza in afectadas:
+            self._quitar(pieza)
+            self._agregar(pieza)
+
+    def _al_mover(self, pieza, origen, destino):
+        self._quitar(pieza)
+        self.actualizar_casillas(origen, destino)
+        self._agregar(pieza)
+
+    def _al_morir(self, pieza, casilla):
+        self._quitar(pieza)
+        self.actualizar_casillas(casilla)
 
 def verificar_ganador(piezas_en_juego):
     """
@@ -77,7 +77,8 @@ class MenuExpandible:
         if self.seccion_expandida == 'jugar':
             subopciones = [
                 {'texto': 'Nueva Partida Local', 'accion': 'nueva_partida', 'habilitado': True},
-                {'texto': 'vs IA', 'accion': 'vs_ia', 'habilitado': True, 'tooltip': 'Modo contra IA'}
+                {'texto': 'vs IA: Alfa-beta', 'accion': 'vs_ia', 'habilitado': True, 'tooltip': 'Modo contra IA'},
+                {'texto': 'vs IA: Monte Carlo', 'accion': 'vs_ia_mcts', 'habilitado': True, 'tooltip': 'Modo contra IA (MCTS)'}
             ]
             
             alto_sub = int(50 * constants.ESCALA_GLOBAL)
@@ -440,6 +441,8 @@ def mostrar_menu(pantalla_actual, fuente_grande, es_fullscreen=False):
                             return ('en_juego', pantalla, es_fullscreen)
                         elif valor == 'vs_ia':
                             return ('en_juego_vs_ia', pantalla, es_fullscreen)
+                        elif valor == 'vs_ia_mcts':
+                            return ('en_juego_vs_ia_mcts', pantalla, es_fullscreen)
                         elif valor == 'cargar':
                             return ('cargar_partida', pantalla, es_fullscreen)
             
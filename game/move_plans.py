@@ -0,0 +1,136 @@
+"""
+Compilador de reglas de movimiento y ataque.
+Cada especificación de un tipo de pieza (p.ej. [('rect', 4), ('diag', 3)]) se
+traduce una sola vez, al crear la pieza, a un PlanReglas: una tupla de
+generadores ya ligados a su valor, así calcular movimientos es recorrer el plan
+sin comparar cadenas. Los planes se guardan por especificación, de modo que
+todas las piezas de un mismo tipo comparten plan (y la tupla de reglas).
+
+Los tipos de regla se registran con @tipo_regla('nombre'); un tipo nuevo solo
+necesita su compilador, sin tocar logic.py ni el Bitboard.
+"""
+
+from .logic import calcular_mov_rect, calcular_mov_diag, calcular_mov_steps, calcular_ran_steps
+
+# tipo de regla -> compilador(valor, es_ataque) que devuelve una lista de pasos
+# (generador_casillas(pieza, tablero), generador_mascara(pieza, bitboard) o None)
+_COMPILADORES = {}
+
+# Caché de planes por (reglas, es_ataque)
+_CACHE_PLANES = {}
+
+
+def tipo_regla(nombre):
+    """Decorador que registra el compilador de un tipo de regla."""
+    def registrar(compilador):
+        _COMPILADORES[nombre] = compilador
+        return compilador
+    return registrar
+
+
+@tipo_regla('rect')
+def _compilar_rect(n, es_ataque):
+    return [(
+        lambda pieza, tablero: calcular_mov_rect(pieza, n, tablero, es_ataque),
+        lambda pieza, bitboard: bitboard._rayos(pieza, bitboard.geometria.rect, n, es_ataque),
+    )]
+
+
+@tipo_regla('diag')
+def _compilar_diag(n, es_ataque):
+    return [(
+        lambda pieza, tablero: calcular_mov_diag(pieza, n, tablero, es_ataque),
+        lambda pieza, bitboard: bitboard._rayos(pieza, bitboard.geometria.diag, n, es_ataque),
+    )]
+
+
+@tipo_regla('allsides')
+def _compilar_allsides(n, es_ataque):
+    return _compilar_rect(n, es_ataque) + _compilar_diag(n, es_ataque)
+
+
+@tipo_regla('steps')
+def _compilar_steps(valor, es_ataque):
+    if not es_ataque:
+        return [(
+            lambda pieza, tablero: calcular_mov_steps(pieza, valor, tablero),
+            lambda pieza, bitboard: bitboard._zona_pasos(pieza, valor, bitboard.geometria.lleno & ~bitboard.ocupadas),
+        )]
+    min_ran, max_ran = valor
+    return [(
+        lambda pieza, tablero: calcular_ran_steps(pieza, min_ran, max_ran, tablero),
+        lambda pieza, bitboard: bitboard._zona_pasos(
+            pieza, max_ran, bitboard.geometria.lleno & ~bitboard.enemigos(pieza), min_ran),
+    )]
+
+
+class PlanReglas:
+    """
+    Reglas de movimiento o de ataque compiladas para un tipo de pieza.
+    - casillas(pieza, tablero): igual que el cálculo por listas de logic.py.
+    - mascara(pieza, bitboard): igual que el backend de bitboard.
+    Los planes son inmutables y se comparten: copiarlos devuelve el mismo objeto.
+    """
+    def __init__(self, reglas, es_ataque):
+        self.reglas = reglas
+        self.es_ataque = es_ataque
+        pasos = []
+        for tipo, valor in reglas:
+            compilador = _COMPILADORES.get(tipo)
+            if compilador is None:
+                raise ValueError(f"Tipo de regla desconocido: {tipo!r}")
+            pasos.extend(compilador(valor, es_ataque))
+        self._casillas = tuple(generador for generador, _ in pasos)
+        self._mascaras = tuple(generador for _, generador in pasos)
+        self.admite_bitboard = all(generador is not None for generador in self._mascaras)
+
+    def zona(self, pieza, tablero):
+        """
+        Casillas alcanzadas por las reglas antes de filtrar por contenido. En un
+        plan de ataque son todas las casillas amenazadas: las vacías del alcance,
+        los aliados que los rayos atraviesan y el primer enemigo de cada rayo.
+        """
+        en_rango = set()
+        for generador in self._casillas:
+            en_rango.update(generador(pieza, tablero))
+        return en_rango
+
+    def casillas(self, pieza, tablero):
+        en_rango = self.zona(pieza, tablero)
+        if self.es_ataque:
+            jugador = pieza.jugador
+            resultado = []
+            for fila, col in en_rango:
+                otra = tablero[fila][col]
+                if otra is not None and otra.jugador != jugador:
+                    resultado.append((fila, col))
+            return resultado
+        return [(fila, col) for fila, col in en_rango if tablero[fila][col] is None]
+
+    def mascara(self, pieza, bitboard):
+        resultado = 0
+        for generador in self._mascaras:
+            resultado |= generador(pieza, bitboard)
+        if self.es_ataque:
+            return resultado & bitboard.enemigos(pieza)
+        return resultado & bitboard.geometria.lleno & ~bitboard.ocupadas
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        return f"PlanReglas({list(self.reglas)}, ataque={self.es_ataque})"
+
+
+def compilar_plan(reglas, es_ataque=False):
+    """Devuelve (y compila la primera vez) el plan de una lista de reglas."""
+    reglas = tuple(tuple(regla) for regla in reglas)
+    clave = (reglas, es_ataque)
+    plan = _CACHE_PLANES.get(clave)
+    if plan is None:
+        plan = PlanReglas(reglas, es_ataque)
+        _CACHE_PLANES[clave] = plan
+    return plan
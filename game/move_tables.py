@@ -0,0 +1,106 @@
+"""
+Tablas de movimiento precalculadas.
+Se construyen una sola vez por tamaño de tablero: rayos en las 8 direcciones
+(recortados al borde), vecinos ortogonales y destinos de salto.
+Las funciones de logic.py las recorren sin comprobar límites ni crear tuplas.
+"""
+
+DIRECCIONES_RECT = ((0, 1), (0, -1), (1, 0), (-1, 0))
+DIRECCIONES_DIAG = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
+# Caché de tablas por (filas, columnas)
+_CACHE_TABLAS = {}
+
+
+class TablasMovimiento:
+    """
+    Tablas indexadas como [fila][col]. Todas las casillas son las mismas
+    tuplas de self.casillas, así que recorrerlas no reserva memoria.
+    """
+    def __init__(self, filas, columnas):
+        self.filas = filas
+        self.columnas = columnas
+        self.alcance_max = max(filas, columnas)
+        self.casillas = [[(f, c) for c in range(columnas)] for f in range(filas)]
+
+        self.rayos_rect = self._construir_rayos(DIRECCIONES_RECT)
+        self.rayos_diag = self._construir_rayos(DIRECCIONES_DIAG)
+        self.vecinos = [
+            [tuple(rayo[0] for rayo in self.rayos_rect[f][c] if rayo) for c in range(columnas)]
+            for f in range(filas)
+        ]
+        # recortes_x[f][c][n] -> los rayos de la casilla recortados a n pasos
+        self.recortes_rect = self._construir_recortes(self.rayos_rect)
+        self.recortes_diag = self._construir_recortes(self.rayos_diag)
+        # saltos_x[f][c][n] -> casillas a distancia 1..n en los rayos, ignorando piezas
+        self.saltos_rect = self._construir_saltos(self.rayos_rect)
+        self.saltos_diag = self._construir_saltos(self.rayos_diag)
+
+    def _construir_rayos(self, direcciones):
+        rayos = []
+        for f in range(self.filas):
+            fila_rayos = []
+            for c in range(self.columnas):
+                rayos_casilla = []
+                for df, dc in direcciones:
+                    rayo = []
+                    nf, nc = f + df, c + dc
+                    while 0 <= nf < self.filas and 0 <= nc < self.columnas:
+                        rayo.append(self.casillas[nf][nc])
+                        nf, nc = nf + df, nc + dc
+                    rayos_casilla.append(tuple(rayo))
+                fila_rayos.append(tuple(rayos_casilla))
+            rayos.append(fila_rayos)
+        return rayos
+
+    def _construir_recortes(self, rayos):
+        recortes = []
+        for f in range(self.filas):
+            fila_recortes = []
+            for c in range(self.columnas):
+                por_distancia = [()]
+                for n in range(1, self.alcance_max + 1):
+                    # Un rayo que ya cabe en n pasos es la misma tupla de rayos_x
+                    por_distancia.append(tuple(rayo if len(rayo) <= n else rayo[:n] for rayo in rayos[f][c]))
+                fila_recortes.append(tuple(por_distancia))
+            recortes.append(fila_recortes)
+        return recortes
+
+    def _construir_saltos(self, rayos):
+        saltos = []
+        for f in range(self.filas):
+            fila_saltos = []
+            for c in range(self.columnas):
+                por_distancia = [()]
+                for n in range(1, self.alcance_max + 1):
+                    por_distancia.append(tuple(casilla for rayo in rayos[f][c] for casilla in rayo[:n]))
+                fila_saltos.append(tuple(por_distancia))
+            saltos.append(fila_saltos)
+        return saltos
+
+    def rayos(self, tabla, fila, col, n):
+        """Devuelve los rayos desde (fila, col) recortados a n pasos (tabla: recortes_x)."""
+        if n <= 0:
+            return ()
+        return tabla[fila][col][min(n, self.alcance_max)]
+
+    def saltos(self, tabla, fila, col, n):
+        """Devuelve los destinos de salto hasta n casillas desde (fila, col)."""
+        if n <= 0:
+            return ()
+        return tabla[fila][col][min(n, self.alcance_max)]
+
+
+def obtener_tablas(filas, columnas):
+    """Devuelve (y construye la primera vez) las tablas para un tamaño de tablero."""
+    clave = (filas, columnas)
+    tablas = _CACHE_TABLAS.get(clave)
+    if tablas is None:
+        tablas = TablasMovimiento(filas, columnas)
+        _CACHE_TABLAS[clave] = tablas
+    return tablas
+
+
+def tablas_de(tablero):
+    """Atajo: tablas correspondientes a las dimensiones de un tablero."""
+    return obtener_tablas(len(tablero), len(tablero[0]))
@@ -1,6 +1,10 @@
+from .move_plans import compilar_plan
+
 class Pieza:
     """
     Versión actualizada para manejar múltiples reglas de movimiento y ataque.
+    Las reglas se compilan al crear la pieza (ver move_plans.py); las piezas del
+    mismo tipo comparten el plan y la tupla de reglas.
     """
     def __init__(self, nombre, jugador, hp, atk, agi, movimientos, rango_ataque, tipo_turno, tipo_ataque, puede_saltar=False):
         self.nombre = nombre
@@ -9,12 +13,15 @@ class Pieza:
         self.hp = hp
         self.atk = atk
         self.agi = agi
-        self.movimientos = movimientos
-        self.rango_ataque = rango_ataque
+        self.plan_movimientos = compilar_plan(movimientos, es_ataque=False)
+        self.plan_ataque = compilar_plan(rango_ataque, es_ataque=True)
+        self.movimientos = self.plan_movimientos.reglas
+        self.rango_ataque = self.plan_ataque.reglas
         self.tipo_turno = tipo_turno #0: move or attack, 1: move then attack, 2: move & attack
         self.tipo_ataque = tipo_ataque #melee, ranged, magic
         self.puede_saltar = puede_saltar
         self.posicion = None
+        self.id_pieza = None  # Lo asigna RegistroPiezas; las copias lo conservan
 
         self.ha_movido = False
         self.ha_atacado = False
@@ -0,0 +1,73 @@
+"""
+Registro de piezas de una partida.
+Cada pieza recibe un id entero estable (pieza.id_pieza) la primera vez que se
+registra; las copias (p.ej. las del historial para deshacer) conservan el id,
+así la cola, el historial, las repeticiones y la IA pueden referirse a una
+pieza por su id aunque el objeto cambie. Índices por id, por jugador y por tipo.
+"""
+
+
+class RegistroPiezas:
+    def __init__(self, piezas=()):
+        self._siguiente_id = 1
+        self.por_id = {}
+        self.por_jugador = {}
+        self.por_tipo = {}
+        for pieza in piezas:
+            self.registrar(pieza)
+
+    def registrar(self, pieza):
+        """Añade la pieza (asignándole id si no tiene) y devuelve su id. O(1)."""
+        if pieza.id_pieza is None:
+            pieza.id_pieza = self._siguiente_id
+        self._siguiente_id = max(self._siguiente_id, pieza.id_pieza + 1)
+
+        id_pieza = pieza.id_pieza
+        self.por_id[id_pieza] = pieza
+        self.por_jugador.setdefault(pieza.jugador, set()).add(id_pieza)
+        self.por_tipo.setdefault(pieza.nombre, set()).add(id_pieza)
+        return id_pieza
+
+    def quitar(self, pieza):
+        """
+        Quita la pieza si es la registrada con su id. Devuelve False si no estaba
+        (o si ese id pertenece ya a otra copia, p.ej. tras deshacer). O(1).
+        """
+        id_pieza = pieza.id_pieza
+        if self.por_id.get(id_pieza) is not pieza:
+            return False
+        del self.por_id[id_pieza]
+        self.por_jugador[pieza.jugador].discard(id_pieza)
+        self.por_tipo[pieza.nombre].discard(id_pieza)
+        return True
+
+    def reemplazar(self, piezas):
+        """Sustituye todo el contenido (al deshacer); los ids de las copias se conservan."""
+        self.por_id = {}
+        self.por_jugador = {}
+        self.por_tipo = {}
+        for pieza in piezas:
+            self.registrar(pieza)
+
+    # --- Consultas ---
+
+    def obtener(self, id_pieza):
+        return self.por_id.get(id_pieza)
+
+    def contiene(self, pieza):
+        return self.por_id.get(pieza.id_pieza) is pieza
+
+    def ids_de_jugador(self, jugador):
+        return self.por_jugador.get(jugador, set())
+
+    def ids_de_tipo(self, nombre):
+        return self.por_tipo.get(nombre, set())
+
+    def piezas_de_jugador(self, jugador):
+        return [self.por_id[id_pieza] for id_pieza in self.ids_de_jugador(jugador)]
+
+    def __len__(self):
+        return len(self.por_id)
+
+    def __iter__(self):
+        return iter(self.por_id.values())
@@ -0,0 +1,90 @@
+"""
+Mapa de alcance incremental.
+Guarda los movimientos y ataques calculados de cada pieza y, cuando una pieza
+se mueve o muere, invalida solo las piezas cuya zona de influencia (sus rayos
+o su región de pasos) contiene alguna de las casillas que cambiaron.
+"""
+
+from .bitboard import Bitboard, zona_influencia
+from .logic import calcular_casillas_posibles, calcular_ataques_posibles
+
+class MapaAlcance:
+    """
+    Caché de casillas alcanzables por pieza, mantenida por eventos.
+    Las consultas devuelven copias, así quien las reciba puede modificarlas.
+    Si recibe un HashZobrist y una CacheReglasLRU, los recálculos pasan
+    primero por esa caché, que acierta cuando la posición se repite.
+    """
+    def __init__(self, tablero, bitboard=None, hash_zobrist=None, cache_reglas=None):
+        self.tablero = tablero
+        self.bitboard = bitboard if bitboard is not None else Bitboard.desde_tablero(tablero)
+        self.geometria = self.bitboard.geometria
+        self.hash_zobrist = hash_zobrist
+        self.cache_reglas = cache_reglas
+        # pieza -> (casillas, zona de influencia)
+        self._movimientos = {}
+        self._ataques = {}
+
+    def conectar(self, eventos):
+        """Se suscribe al BusEventos de la partida. Conectar después del bitboard."""
+        eventos.suscribir('movimiento', self._al_mover)
+        eventos.suscribir('muerte', self._al_morir)
+        eventos.suscribir('deshacer', self._al_deshacer)
+
+    # --- Consultas ---
+
+    def movimientos(self, pieza):
+        """Equivalente a calcular_casillas_posibles(pieza, tablero)."""
+        entrada = self._movimientos.get(pieza)
+        if entrada is None:
+            if self.cache_reglas is not None:
+                casillas = self.cache_reglas.movimientos(pieza, self.tablero, self.hash_zobrist.valor, self.bitboard)
+            else:
+                casillas = calcular_casillas_posibles(pieza, self.tablero, self.bitboard)
+            entrada = (casillas, zona_influencia(self.geometria, pieza.posicion, pieza.movimientos))
+            self._movimientos[pieza] = entrada
+        return list(entrada[0])
+
+    def ataques(self, pieza):
+        """Equivalente a calcular_ataques_posibles(pieza, tablero)."""
+        entrada = self._ataques.get(pieza)
+        if entrada is None:
+            if self.cache_reglas is not None:
+                casillas = self.cache_reglas.ataques(pieza, self.tablero, self.hash_zobrist.valor, self.bitboard)
+            else:
+                casillas = calcular_ataques_posibles(pieza, self.tablero, self.bitboard)
+            entrada = (casillas, zona_influencia(self.geometria, pieza.posicion, pieza.rango_ataque))
+            self._ataques[pieza] = entrada
+        return list(entrada[0])
+
+    # --- Invalidación ---
+
+    def invalidar_casillas(self, *casillas):
+        """Descarta las entradas cuya zona de influencia toca alguna casilla."""
+        mascara = 0
+        for casilla in casillas:
+            mascara |= self.geometria.bit(casilla)
+        for cache in (self._movimientos, self._ataques):
+            afectadas = [pieza for pieza, (_, zona) in cache.items() if zona & mascara]
+            for pieza in afectadas:
+                del cache[pieza]
+
+    def olvidar(self, pieza):
+        self._movimientos.pop(pieza, None)
+        self._ataques.pop(pieza, None)
+
+    def _al_mover(self, pieza, origen, destino):
+        self.olvidar(pieza)
+        self.invalidar_casillas(origen, destino)
+
+    def _al_morir(self, pieza, casilla):
+        self.olvidar(pieza)
+        self.invalidar_casillas(casilla)
+
+    def _al_deshacer(self, tablero):
+        # Deshacer revierte las mismas piezas en el sitio, pero sin eventos por cada
+        # cambio: posiciones, hp y muertes pueden haber cambiado en cualquier pieza,
+        # así que se vacía la caché entera.
+        self.tablero = tablero
+        self._movimientos.clear()
+        self._ataques.clear()
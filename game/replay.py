@@ -0,0 +1,636 @@
+"""
+Repeticiones: registro de la partida en disco mientras se juega, motor para
+volver a ejecutarla sin interfaz y línea temporal para saltar a cualquier turno.
+
+Formato del archivo (little-endian, solo se añade al final):
+    cabecera fija   magia 'GRDR', versión, flags, fecha, semilla
+    flujo zlib      registros (tipo de 1 byte + datos); cada lote termina con
+                    Z_SYNC_FLUSH, así un archivo cortado (el juego se cerró de
+                    golpe) se puede leer hasta el último lote completo
+    pie             índice de fotogramas clave (turno, desplazamiento en el
+                    archivo) y al final nº de claves, nº de turnos y 'GRDI';
+                    solo lo tienen las repeticiones cerradas con normalidad
+
+Registros:
+    'S' instantánea inicial: la partida en el formato de guardado (save_game)
+    'K' turno, fotograma clave: la partida sin historial al empezar ese turno
+    'T' id, reloj           empieza el turno de la pieza
+    'M' id, fila, columna   movimiento
+    'A' id, fila, columna, posición del generador   ataque (se resuelve entero)
+    'F' id, posición del generador                  fin del turno
+    'N' bloque de 624 palabras del generador (vale para los 'A'/'F' siguientes)
+    'U' / 'R'               deshacer / rehacer un turno
+    'G' ganador             fin de la partida (0 si se abandonó)
+
+Se anotan las decisiones, no el estado: el motor las vuelve a aplicar con las
+mismas reglas (TurnManager, TurnQueue, HistorialDeshacer). Lo único que no se
+puede reproducir así es lo que la IA saca del generador compartido al pensar,
+por eso los ataques y los finales de turno llevan la posición del generador
+(y un bloque nuevo cuando cambia, unas pocas veces por partida).
+
+Cada fotograma clave empieza tras un Z_FULL_FLUSH, que reinicia el diccionario
+de zlib: desde su desplazamiento se puede descomprimir sin leer lo anterior. Hay
+uno cada `intervalo_claves` turnos y otro en el primer turno tras deshacer o
+rehacer, así entre un fotograma clave y el turno buscado nunca hay que deshacer
+nada (el fotograma clave no lleva historial). Llegar a cualquier turno cuesta
+como mucho descomprimir y aplicar un tramo de `intervalo_claves` turnos.
+
+El grabador no escribe nunca desde el bucle de juego: junta los registros en un
+búfer y pasa lotes a un hilo que comprime y escribe. El mismo hilo anota dónde
+empieza cada fotograma clave y escribe el índice en el pie al terminar.
+"""
+
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_right
+
+from .eventos import BusEventos
+from .save_game import codificar_partida, partida_desde_bytes, LecturaPartida, DIRECTORIO_PARTIDAS
+
+MAGIA = b'GRDR'
+MAGIA_INDICE = b'GRDI'
+VERSION = 2
+EXTENSION = '.gfreplay'
+DIRECTORIO_REPETICIONES = os.path.join(DIRECTORIO_PARTIDAS, 'repeticiones')
+
+# Flags de la cabecera
+VS_IA = 1
+
+# magia, versión, flags, fecha, semilla
+_CABECERA = struct.Struct('<4sHHdQ')
+_INSTANTANEA = struct.Struct('<I')
+_TURNO = struct.Struct('<Hq')
+_CASILLA = struct.Struct('<HBB')
+_ATAQUE = struct.Struct('<HBBH')
+_FIN = struct.Struct('<HH')
+_GANADOR = struct.Struct('<B')
+_CLAVE = struct.Struct('<II')
+# Pie: (turno, desplazamiento) por fotograma clave; nº de claves, nº de turnos, magia
+_ENTRADA_INDICE = struct.Struct('<IQ')
+_PIE = struct.Struct('<II4s')
+_PALABRAS_RNG = 624
+_BLOQUE_RNG = _PALABRAS_RNG * 4
+
+_FORMATOS = {b'T': _TURNO, b'M': _CASILLA, b'A': _ATAQUE, b'F': _FIN, b'G': _GANADOR}
+
+
+class FormatoRepeticionError(ValueError):
+    """El archivo no es una repetición válida o es de una versión desconocida."""
+
+
+class RepeticionDivergenteError(RuntimeError):
+    """Al volver a aplicar el registro las reglas dan un resultado distinto del grabado."""
+
+
+# --- Escritura ---
+
+class _EscritorRepeticion(threading.Thread):
+    """Hilo que comprime y escribe los lotes que le pasa el grabador."""
+
+    def __init__(self, ruta, cabecera):
+        super().__init__(name='escritor-repeticion', daemon=True)
+        self.ruta = ruta
+        self._cabecera = cabecera
+        self._pendientes = queue.SimpleQueue()
+        self.bytes_escritos = 0
+        # (turno, desplazamiento) de cada fotograma clave; la instantánea inicial es el turno 0
+        self.indice = [(0, len(cabecera))]
+        self.error = None
+
+    def enviar(self, lote):
+        self._pendientes.put(('lote', lote))
+
+    def enviar_clave(self, turno, registro):
+        self._pendientes.put(('clave', turno, registro))
+
+    def terminar(self, turnos):
+        self._pendientes.put(('fin', turnos))
+        self.join()
+
+    def run(self):
+        compresor = zlib.compressobj(6)
+        archivo = None
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.ruta)), exist_ok=True)
+            archivo = open(self.ruta, 'wb')
+            archivo.write(self._cabecera)
+            self.bytes_escritos = len(self._cabecera)
+        except OSError as error:
+            self.error = error
+            print(f"[Repetición] No se puede escribir {self.ruta}: {error}")
+        while True:
+            pendiente = self._pendientes.get()
+            tipo = pendiente[0]
+            if archivo is None:
+                if tipo == 'fin':
+                    return
+                continue
+            try:
+                if tipo == 'lote':
+                    archivo.write(compresor.compress(pendiente[1]) + compresor.flush(zlib.Z_SYNC_FLUSH))
+                elif tipo == 'clave':
+                    _, turno, registro = pendiente
+                    archivo.write(compresor.flush(zlib.Z_FULL_FLUSH))
+                    self.indice.append((turno, archivo.tell()))
+                    archivo.write(compresor.compress(registro) + compresor.flush(zlib.Z_SYNC_FLUSH))
+                else:
+                    archivo.write(compresor.flush(zlib.Z_FINISH))
+                    archivo.write(b''.join(_ENTRADA_INDICE.pack(*entrada) for entrada in self.indice))
+                    archivo.write(_PIE.pack(len(self.indice), pendiente[1], MAGIA_INDICE))
+                archivo.flush()
+                self.bytes_escritos = archivo.tell()
+            except OSError as error:
+                self.error = error
+                print(f"[Repetición] Error escribiendo {self.ruta}: {error}")
+                archivo.close()
+                archivo = None
+                continue
+            if tipo == 'fin':
+                archivo.close()
+                return
+
+
+class GrabadorRepeticion:
+    """
+    Anota la partida en curso. Se crea al empezar (o cargar) la partida, se
+    conecta al BusEventos y se cierra al terminar con cerrar(ganador).
+    El estado en juego emite además 'fin_turno' e 'historial' para él.
+    """
+
+    def __init__(self, ruta, turn_manager, turn_queue, historial, vs_ia=False, turno_empezado=False,
+                 bytes_por_lote=4096, segundos_por_lote=2.0, intervalo_claves=20):
+        self.ruta = ruta
+        self.turn_manager = turn_manager
+        self.turn_queue = turn_queue
+        self.vs_ia = vs_ia
+        self.bytes_por_lote = bytes_por_lote
+        self.segundos_por_lote = segundos_por_lote
+        self.intervalo_claves = intervalo_claves
+        self.registros = 0
+        self.lotes = 0
+        self.turnos = 0
+        self.cerrado = False
+        self._clave_pendiente = False
+        self._bufer = bytearray()
+        self._ultimo_envio = time.monotonic()
+        self._bloque_rng = turn_manager.rng.getstate()[1][:_PALABRAS_RNG]
+
+        cabecera = _CABECERA.pack(MAGIA, VERSION, VS_IA * bool(vs_ia), time.time(), turn_manager.semilla or 0)
+        self._escritor = _EscritorRepeticion(ruta, cabecera)
+        self._escritor.start()
+
+        instantanea = codificar_partida(turn_manager, turn_queue, historial, vs_ia, turno_empezado)
+        self._anotar(b'S', _INSTANTANEA.pack(len(instantanea)) + instantanea)
+        self._enviar()
+
+    def conectar(self, eventos):
+        """Se suscribe al BusEventos de la partida."""
+        eventos.suscribir('turno', self._al_empezar_turno)
+        eventos.suscribir('movimiento', self._al_mover)
+        eventos.suscribir('ataque', self._al_atacar)
+        eventos.suscribir('fin_turno', self._al_terminar_turno)
+        eventos.suscribir('historial', self._al_navegar)
+
+    @property
+    def bytes_escritos(self):
+        return self._escritor.bytes_escritos
+
+    @property
+    def indice(self):
+        """(turno, desplazamiento) de los fotogramas clave escritos hasta ahora."""
+        return list(self._escritor.indice)
+
+    def _anotar(self, tipo, datos=b''):
+        self._bufer += tipo
+        self._bufer += datos
+        self.registros += 1
+
+    def _enviar(self):
+        if self._bufer:
+            self._escritor.enviar(bytes(self._bufer))
+            self._bufer.clear()
+            self.lotes += 1
+        self._ultimo_envio = time.monotonic()
+
+    def _enviar_si_toca(self):
+        """Pasa el búfer al hilo escritor si es grande o lleva un rato esperando."""
+        if (len(self._bufer) >= self.bytes_por_lote
+                or time.monotonic() - self._ultimo_envio >= self.segundos_por_lote):
+            self._enviar()
+
+    def _posicion_rng(self):
+        """Posición del generador; antes anota su bloque si ha cambiado desde el último."""
+        _, estado, _ = self.turn_manager.rng.getstate()
+        bloque = estado[:_PALABRAS_RNG]
+        if bloque != self._bloque_rng:
+            self._bloque_rng = bloque
+            self._anotar(b'N', array('I', bloque).tobytes())
+        return estado[_PALABRAS_RNG]
+
+    # --- Eventos ---
+
+    def _escribir_clave(self, turno):
+        """Fotograma clave del estado actual (sin historial) antes del turno `turno`."""
+        self._enviar()
+        instantanea = codificar_partida(self.turn_manager, self.turn_queue, None, self.vs_ia, False)
+        self._escritor.enviar_clave(turno, b'K' + _CLAVE.pack(turno, len(instantanea)) + instantanea)
+        self.registros += 1
+        self._clave_pendiente = False
+        # El motor que empiece en esta clave toma el bloque del generador de la instantánea
+        self._bloque_rng = self.turn_manager.rng.getstate()[1][:_PALABRAS_RNG]
+
+    def _al_empezar_turno(self, pieza, reloj):
+        self.turnos += 1
+        if self._clave_pendiente or self.turnos % self.intervalo_claves == 0:
+            self._escribir_clave(self.turnos)
+        self._anotar(b'T', _TURNO.pack(pieza.id_pieza, reloj))
+
+    def _al_mover(self, pieza, origen, destino):
+        self._anotar(b'M', _CASILLA.pack(pieza.id_pieza, *destino))
+
+    def _al_atacar(self, pieza, objetivo):
+        self._anotar(b'A', _ATAQUE.pack(pieza.id_pieza, objetivo[0], objetivo[1], self._posicion_rng()))
+
+    def _al_terminar_turno(self, pieza):
+        id_pieza = pieza.id_pieza if pieza is not None else 0
+        self._anotar(b'F', _FIN.pack(id_pieza, self._posicion_rng()))
+        self._enviar_si_toca()
+
+    def _al_navegar(self, sentido):
+        self._anotar(b'R' if sentido == 'rehacer' else b'U')
+        self._clave_pendiente = True
+        self._enviar()
+
+    def cerrar(self, ganador=None):
+        """Anota el resultado, vacía el búfer y espera a que el hilo termine de escribir."""
+        if self.cerrado:
+            return
+        self.cerrado = True
+        self._anotar(b'G', _GANADOR.pack(ganador or 0))
+        self._enviar()
+        self._escritor.terminar(self.turnos)
+
+
+def nueva_ruta_repeticion(directorio=DIRECTORIO_REPETICIONES):
+    """Ruta libre para la repetición de una partida nueva, con la fecha en el nombre."""
+    base = time.strftime('repeticion_%Y%m%d_%H%M%S')
+    ruta = os.path.join(directorio, base + EXTENSION)
+    contador = 1
+    while os.path.exists(ruta):
+        contador += 1
+        ruta = os.path.join(directorio, f"{base}_{contador}{EXTENSION}")
+    return ruta
+
+
+# --- Lectura ---
+
+class CabeceraRepeticion:
+    __slots__ = ('ruta', 'version', 'flags', 'fecha', 'semilla')
+
+    def __init__(self, ruta, version, flags, fecha, semilla):
+        self.ruta = ruta
+        self.version = version
+        self.flags = flags
+        self.fecha = fecha
+        self.semilla = semilla
+
+    @property
+    def vs_ia(self):
+        return bool(self.flags & VS_IA)
+
+
+def _decodificar_registros(datos, ruta):
+    """Lista de (tipo, valores). Un registro cortado al final se descarta."""
+    registros = []
+    desplazamiento = 0
+    while desplazamiento < len(datos):
+        tipo = datos[desplazamiento:desplazamiento + 1]
+        desplazamiento += 1
+        formato = _FORMATOS.get(tipo)
+        if formato is not None:
+            if desplazamiento + formato.size > len(datos):
+                break
+            valores = formato.unpack_from(datos, desplazamiento)
+            desplazamiento += formato.size
+        elif tipo == b'N':
+            if desplazamiento + _BLOQUE_RNG > len(datos):
+                break
+            bloque = array('I')
+            bloque.frombytes(datos[desplazamiento:desplazamiento + _BLOQUE_RNG])
+            valores = (tuple(bloque),)
+            desplazamiento += _BLOQUE_RNG
+        elif tipo in (b'S', b'K'):
+            formato = _INSTANTANEA if tipo == b'S' else _CLAVE
+            if desplazamiento + formato.size > len(datos):
+                break
+            *turno, longitud = formato.unpack_from(datos, desplazamiento)
+            desplazamiento += formato.size
+            if desplazamiento + longitud > len(datos):
+                break
+            valores = (*turno, bytes(datos[desplazamiento:desplazamiento + longitud]))
+            desplazamiento += longitud
+        elif tipo in (b'U', b'R'):
+            valores = ()
+        else:
+            raise FormatoRepeticionError(f"{ruta}: registro desconocido {tipo!r}")
+        registros.append((tipo, valores))
+    return registros
+
+
+def _leer_cabecera(datos, ruta):
+    if len(datos) < _CABECERA.size or datos[:4] != MAGIA:
+        raise FormatoRepeticionError(f"{ruta}: no es una repetición")
+    magia, version, flags, fecha, semilla = _CABECERA.unpack_from(datos)
+    if version > VERSION:
+        raise FormatoRepeticionError(f"{ruta}: versión {version} no soportada (máximo {VERSION})")
+    return CabeceraRepeticion(ruta, version, flags, fecha, semilla)
+
+
+def _descomprimir(datos, ruta, bits=zlib.MAX_WBITS):
+    """Registros de un tramo del flujo (bits negativos: tramo sin cabecera zlib)."""
+    try:
+        # Sin flush() final: lo que falte de un lote a medias simplemente no sale
+        flujo = zlib.decompressobj(bits).decompress(datos)
+    except zlib.error as error:
+        raise FormatoRepeticionError(f"{ruta}: datos comprimidos dañados ({error})") from None
+    return _decodificar_registros(flujo, ruta)
+
+
+def leer_repeticion(ruta):
+    """(cabecera, registros) de una repetición, aunque el archivo esté cortado."""
+    with open(ruta, 'rb') as archivo:
+        datos = archivo.read()
+    cabecera = _leer_cabecera(datos, ruta)
+    # El descompresor se para al final del flujo: el pie con el índice queda fuera
+    registros = _descomprimir(datos[_CABECERA.size:], ruta)
+    if not registros or registros[0][0] != b'S':
+        raise FormatoRepeticionError(f"{ruta}: falta la instantánea inicial")
+    return cabecera, registros
+
+
+# --- Reproducción ---
+
+class MotorRepeticion:
+    """
+    Vuelve a aplicar una repetición con las reglas del juego, sin pygame.
+    paso() aplica un registro (sirve para dibujarla al ritmo que se quiera) y
+    reproducir() la ejecuta entera a toda velocidad. Con verificar=True cada
+    turno y el resultado se comparan con lo grabado.
+    """
+
+    def __init__(self, ruta, verificar=True):
+        cabecera, registros = leer_repeticion(ruta)
+        self._iniciar(cabecera, registros, verificar)
+
+    @classmethod
+    def desde_registros(cls, cabecera, registros, verificar=True):
+        """Motor sobre un tramo de registros que empieza por 'S' o por un fotograma clave 'K'."""
+        motor = cls.__new__(cls)
+        motor._iniciar(cabecera, registros, verificar)
+        return motor
+
+    def _iniciar(self, cabecera, registros, verificar):
+        self.cabecera = cabecera
+        self.registros = registros
+        self.verificar = verificar
+        tipo, valores = registros[0]
+        # Turnos empezados hasta ahora; un fotograma clave va justo antes del turno que indica
+        self.turno = valores[0] - 1 if tipo == b'K' else 0
+        partida = partida_desde_bytes(valores[-1])
+        self.tablero = partida['tablero']
+        self.turn_manager = partida['turn_manager']
+        self.turn_queue = partida['turn_queue']
+        self.historial = partida['historial']
+        self.eventos = BusEventos()
+        self.turn_manager.conectar(self.eventos)
+        self.turn_queue.conectar(self.eventos)
+        self.historial.conectar(self.eventos)
+        self.eventos.suscribir('dano', self._al_recibir_dano)
+        self.eventos.suscribir('muerte', self._al_morir)
+
+        self.pieza_activa = self.turn_queue.get_current_piece() if partida['turno_empezado'] else None
+        self._bloque_rng = self.turn_manager.rng.getstate()[1][:_PALABRAS_RNG]
+        self.indice = 1
+        self.ganador = None
+        self.completa = self.registros[-1][0] == b'G'
+        self.estadisticas = {
+            'turnos': 0, 'movimientos': 0, 'ataques': 0, 'deshacer': 0, 'rehacer': 0,
+            'dano': {1: 0, 2: 0}, 'bajas': {1: 0, 2: 0},
+        }
+
+    @property
+    def terminada(self):
+        return self.indice >= len(self.registros)
+
+    def _divergencia(self, mensaje):
+        raise RepeticionDivergenteError(f"{self.cabecera.ruta}, registro {self.indice}: {mensaje}")
+
+    def _pieza(self, id_pieza):
+        pieza = self.turn_manager.registro.obtener(id_pieza)
+        if pieza is None or (self.verificar and pieza is not self.pieza_activa):
+            self._divergencia(f"la pieza {id_pieza} no es la que tiene el turno")
+        return pieza
+
+    def _sincronizar_rng(self, posicion):
+        version, _, gauss = self.turn_manager.rng.getstate()
+        self.turn_manager.rng.setstate((version, self._bloque_rng + (posicion,), gauss))
+
+    def _al_recibir_dano(self, pieza, cantidad):
+        self.estadisticas['dano'][3 - pieza.jugador] += cantidad
+
+    def _al_morir(self, pieza, casilla):
+        self.estadisticas['bajas'][pieza.jugador] += 1
+
+    def paso(self):
+        """Aplica el siguiente registro y lo devuelve como (tipo, valores)."""
+        tipo, valores = self.registros[self.indice]
+        tablero, eventos, turn_manager = self.tablero, self.eventos, self.turn_manager
+
+        if tipo == b'T':
+            id_pieza, reloj = valores
+            pieza = self.turn_queue.get_current_piece()
+            if self.verificar and (pieza is None or pieza.id_pieza != id_pieza or turn_manager.reloj != reloj):
+                self._divergencia(f"se esperaba el turno de {id_pieza} en el tic {reloj}, "
+                                  f"toca a {pieza and pieza.id_pieza} en el tic {turn_manager.reloj}")
+            self.pieza_activa = pieza
+            pieza.reiniciar_estado_turno()
+            eventos.emitir('turno', pieza, turn_manager.reloj)
+            self.turno += 1
+            self.estadisticas['turnos'] += 1
+
+        elif tipo == b'M':
+            id_pieza, fila, col = valores
+            pieza = self._pieza(id_pieza)
+            if self.verificar and tablero[fila][col] is not None:
+                self._divergencia(f"la casilla {(fila, col)} está ocupada")
+            origen = pieza.posicion
+            tablero[origen[0]][origen[1]] = None
+            tablero[fila][col] = pieza
+            pieza.posicion = (fila, col)
+            pieza.ha_movido = True
+            eventos.emitir('movimiento', pieza, origen, (fila, col))
+            self.estadisticas['movimientos'] += 1
+
+        elif tipo == b'A':
+            id_pieza, fila, col, posicion_rng = valores
+            pieza = self._pieza(id_pieza)
+            objetivo = tablero[fila][col]
+            if objetivo is None:
+                self._divergencia(f"no hay nadie en {(fila, col)} para atacar")
+            self._sincronizar_rng(posicion_rng)
+            pieza.ha_atacado = True
+            eventos.emitir('ataque', pieza, (fila, col))
+            objetivo.hp -= pieza.atk
+            eventos.emitir('dano', objetivo, pieza.atk)
+            if not objetivo.esta_viva() and turn_manager.registrar_muerte(objetivo):
+                tablero[fila][col] = None
+                eventos.emitir('muerte', objetivo, (fila, col))
+            self.estadisticas['ataques'] += 1
+
+        elif tipo == b'F':
+            id_pieza, posicion_rng = valores
+            self._sincronizar_rng(posicion_rng)
+            if id_pieza:
+                pieza = self._pieza(id_pieza)
+                eventos.emitir('fin_turno', pieza)
+                turn_manager.programar_siguiente_turno(pieza)
+            self.turn_queue.advance_turn()
+            self.pieza_activa = None
+
+        elif tipo == b'N':
+            self._bloque_rng = valores[0]
+
+        elif tipo == b'K':
+            turno, instantanea = valores
+            if self.verificar:
+                clave = LecturaPartida.desde_bytes(instantanea)
+                if (turno != self.turno + 1 or clave.cabecera.reloj != turn_manager.reloj
+                        or clave.cola() != self.turn_queue.ids()):
+                    self._divergencia(f"el fotograma clave del turno {turno} no coincide")
+            # Igual que el grabador: desde aquí el bloque es el que tenga el generador
+            self._bloque_rng = turn_manager.rng.getstate()[1][:_PALABRAS_RNG]
+
+        elif tipo in (b'U', b'R'):
+            rehacer = tipo == b'R'
+            cola = self.historial.rehacer(tablero) if rehacer else self.historial.deshacer(tablero)
+            if cola is None:
+                self._divergencia("no se puede " + ("rehacer" if rehacer else "deshacer"))
+            eventos.emitir('historial', 'rehacer' if rehacer else 'deshacer')
+            eventos.emitir('deshacer', tablero)
+            self.turn_queue.restaurar(cola)
+            self.pieza_activa = None
+            self.estadisticas['rehacer' if rehacer else 'deshacer'] += 1
+
+        elif tipo == b'G':
+            (grabado,) = valores
+            self.ganador = turn_manager.ganador()
+            if self.verificar and grabado and grabado != self.ganador:
+                self._divergencia(f"ganó el jugador {grabado}, las reglas dan {self.ganador}")
+
+        self.indice += 1
+        return tipo, valores
+
+    def reproducir(self):
+        """Aplica todos los registros que quedan y devuelve las estadísticas."""
+        inicio = time.perf_counter()
+        registros = self.indice
+        while not self.terminada:
+            self.paso()
+        if self.ganador is None:
+            self.ganador = self.turn_manager.ganador()
+        resultado = dict(self.estadisticas)
+        resultado.update(ganador=self.ganador, reloj=self.turn_manager.reloj, completa=self.completa,
+                         registros=self.indice - registros, segundos=time.perf_counter() - inicio)
+        return resultado
+
+
+class LineaTemporal:
+    """
+    Acceso por turno a una repetición. motor_en_turno(n) parte del fotograma
+    clave anterior más cercano: solo se descomprime y se aplica ese tramo.
+    Con el índice del pie el archivo se abre con mmap sin leer el flujo; una
+    repetición sin pie (cortada) se lee entera una vez y se indexa en memoria.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        with open(ruta, 'rb') as archivo:
+            try:
+                self._mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise FormatoRepeticionError(f"{ruta}: archivo vacío") from None
+        self._registros = None
+        self._tramo = None
+        self._motor = None
+        try:
+            self.cabecera = _leer_cabecera(self._mapa, ruta)
+            if not self._leer_indice():
+                self._indexar()
+        except (FormatoRepeticionError, struct.error):
+            self._mapa.close()
+            raise
+
+    def _leer_indice(self):
+        """Lee el índice del pie; False si la repetición no lo tiene."""
+        mapa = self._mapa
+        if len(mapa) < _CABECERA.size + _PIE.size or mapa[-4:] != MAGIA_INDICE:
+            return False
+        n_claves, self.turnos, _ = _PIE.unpack_from(mapa, len(mapa) - _PIE.size)
+        self._fin_flujo = len(mapa) - _PIE.size - n_claves * _ENTRADA_INDICE.size
+        self.claves = [_ENTRADA_INDICE.unpack_from(mapa, self._fin_flujo + i * _ENTRADA_INDICE.size)
+                       for i in range(n_claves)]
+        return True
+
+    def _indexar(self):
+        _, self._registros = leer_repeticion(self.ruta)
+        self.claves = [(0, 0)]
+        self.turnos = 0
+        for posicion, (tipo, valores) in enumerate(self._registros):
+            if tipo == b'K':
+                self.claves.append((valores[0], posicion))
+            elif tipo == b'T':
+                self.turnos += 1
+
+    def cerrar(self):
+        self._mapa.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def _registros_del_tramo(self, indice):
+        """Registros desde la clave `indice` hasta la siguiente."""
+        inicio = self.claves[indice][1]
+        if self._registros is not None:
+            fin = self.claves[indice + 1][1] if indice + 1 < len(self.claves) else len(self._registros)
+            return self._registros[inicio:fin]
+        fin = self.claves[indice + 1][1] if indice + 1 < len(self.claves) else self._fin_flujo
+        # La instantánea inicial va tras la cabecera zlib; las claves, tras un Z_FULL_FLUSH
+        bits = zlib.MAX_WBITS if inicio == _CABECERA.size else -zlib.MAX_WBITS
+        return _descomprimir(self._mapa[inicio:fin], self.ruta, bits)
+
+    def motor_en_turno(self, turno):
+        """
+        Motor (sin verificar) justo después de empezar el turno `turno`; 0 es el
+        estado inicial. Si el turno pedido está más adelante en el mismo tramo que
+        la última consulta, se sigue desde allí en lugar de volver a la clave.
+        El motor devuelto es compartido: no hay que modificarlo.
+        """
+        turno = max(0, min(turno, self.turnos))
+        indice = bisect_right(self.claves, (turno, float('inf'))) - 1
+        motor = self._motor
+        if indice != self._tramo or motor.turno > turno:
+            motor = MotorRepeticion.desde_registros(self.cabecera, self._registros_del_tramo(indice),
+                                                    verificar=False)
+            self._motor, self._tramo = motor, indice
+        while motor.turno < turno and not motor.terminada:
+            motor.paso()
+        return motor
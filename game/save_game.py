@@ -0,0 +1,353 @@
+"""
+Guardar y cargar partidas en un formato binario compacto y versionado.
+
+Estructura del archivo (little-endian):
+    cabecera fija   magia 'GRDF', versión, flags (vs IA, motor de la IA, turno empezado), fecha, semilla, reloj,
+                    turnos en el historial, piezas vivas de cada jugador, nº de secciones
+    tabla           (etiqueta, desplazamiento, longitud) por sección
+    secciones       'PIEZ' piezas (id, tipo, jugador, casilla, hp, flags de turno, proximo_turno)
+                    'COLA' ids de la cola de turnos
+                    'RNG ' estado completo del generador de la partida
+                    'HIST' historial de deshacer/rehacer (ver HistorialDeshacer.exportar);
+                           opcional, los fotogramas clave de las repeticiones no lo llevan
+
+La lectura usa mmap: abrir un archivo solo decodifica la cabecera y la tabla, y
+cada sección se decodifica al pedirla. Así se puede listar un directorio con
+miles de partidas leyendo únicamente sus cabeceras.
+"""
+
+import mmap
+import os
+import struct
+import time
+from array import array
+
+from .piece import crear_soldado, crear_paladin, crear_mago, crear_dragon, crear_destructor
+from .constants import FILAS, COLUMNAS
+from .game_setup import GeneradorPartida
+from .turn_manager import TurnManager
+from .turn_queue import TurnQueue
+from .undo_log import HistorialDeshacer
+
+MAGIA = b'GRDF'
+VERSION = 1
+EXTENSION = '.gfsave'
+DIRECTORIO_PARTIDAS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'partidas')
+
+# Flags de la cabecera
+VS_IA = 1
+TURNO_EMPEZADO = 2
+IA_MCTS = 4  # con VS_IA: la IA es la de Monte Carlo (sin él, alfa-beta)
+
+# magia, versión, flags, fecha, semilla, reloj, turnos, vivas J1, vivas J2, nº de secciones
+_CABECERA = struct.Struct('<4sHHdQqIBBB')
+_SECCION = struct.Struct('<4sII')
+# id, tipo, jugador, fila, columna, hp, flags, proximo_turno
+_PIEZA = struct.Struct('<HBBbbhBd')
+_ID = struct.Struct('<H')
+
+# Flags de pieza
+_HA_MOVIDO, _HA_ATACADO, _EN_JUEGO = 1, 2, 4
+
+# Tipos de pieza por código (el orden forma parte del formato: solo se añade al final)
+TIPOS_PIEZA = (
+    ('Soldado', crear_soldado),
+    ('Paladin', crear_paladin),
+    ('Mago', crear_mago),
+    ('Dragon', crear_dragon),
+    ('Destructor', crear_destructor),
+)
+_CODIGO_TIPO = {nombre: codigo for codigo, (nombre, _) in enumerate(TIPOS_PIEZA)}
+
+
+class FormatoPartidaError(ValueError):
+    """El archivo no es una partida guardada válida o es de una versión desconocida."""
+
+
+class CabeceraPartida:
+    """Metadatos de una partida guardada (lo único que se lee al listar)."""
+    __slots__ = ('ruta', 'version', 'flags', 'fecha', 'semilla', 'reloj', 'turnos', 'vivas')
+
+    def __init__(self, ruta, version, flags, fecha, semilla, reloj, turnos, vivas):
+        self.ruta = ruta
+        self.version = version
+        self.flags = flags
+        self.fecha = fecha
+        self.semilla = semilla
+        self.reloj = reloj
+        self.turnos = turnos
+        self.vivas = vivas
+
+    @property
+    def vs_ia(self):
+        return bool(self.flags & VS_IA)
+
+    @property
+    def motor_ia(self):
+        """Motor de la IA ('alfa_beta' o 'mcts'), o None en partidas sin IA."""
+        if not self.vs_ia:
+            return None
+        return 'mcts' if self.flags & IA_MCTS else 'alfa_beta'
+
+    def __repr__(self):
+        return (f"CabeceraPartida({os.path.basename(self.ruta)!r}, reloj={self.reloj}, "
+                f"turnos={self.turnos}, vivas={self.vivas}, vs_ia={self.vs_ia})")
+
+
+# --- Escritura ---
+
+def _seccion_piezas(piezas, en_juego):
+    partes = [_ID.pack(len(piezas))]
+    for pieza in sorted(piezas, key=lambda pieza: pieza.id_pieza):
+        viva = pieza in en_juego
+        # Las piezas muertas guardan la casilla en la que cayeron (deshacer las devuelve ahí).
+        fila, col = pieza.posicion if pieza.posicion is not None else (-1, -1)
+        flags = (_HA_MOVIDO * pieza.ha_movido) | (_HA_ATACADO * pieza.ha_atacado) | (_EN_JUEGO * viva)
+        partes.append(_PIEZA.pack(pieza.id_pieza, _CODIGO_TIPO[pieza.nombre], pieza.jugador,
+                                  fila, col, pieza.hp, flags, pieza.proximo_turno))
+    return b''.join(partes)
+
+
+def _seccion_cola(ids):
+    return _ID.pack(len(ids)) + b''.join(_ID.pack(id_pieza) for id_pieza in ids)
+
+
+def _seccion_rng(rng):
+    version, estado, gauss = rng.getstate()
+    return struct.pack('<Bd', version, gauss if gauss is not None else float('nan')) + array('I', estado).tobytes()
+
+
+def codificar_partida(turn_manager, turn_queue, historial, vs_ia=False, turno_empezado=True, motor_ia='alfa_beta'):
+    """
+    Bytes de la partida en el formato de guardado (sin tocar el disco).
+    Con historial=None no se guarda la sección 'HIST' ni las piezas muertas.
+    motor_ia solo cuenta con vs_ia ('alfa_beta' o 'mcts').
+    """
+    en_juego = set(turn_manager.registro)
+    piezas = {pieza.id_pieza: pieza for pieza in historial.piezas_conocidas()} if historial is not None else {}
+    piezas.update((pieza.id_pieza, pieza) for pieza in en_juego)
+
+    secciones = [
+        (b'PIEZ', _seccion_piezas(list(piezas.values()), en_juego)),
+        (b'COLA', _seccion_cola(turn_queue.ids())),
+        (b'RNG ', _seccion_rng(turn_manager.rng)),
+    ]
+    if historial is not None:
+        secciones.append((b'HIST', historial.exportar()))
+    flags = (VS_IA * bool(vs_ia)) | (TURNO_EMPEZADO * bool(turno_empezado)) | (IA_MCTS * (bool(vs_ia) and motor_ia == 'mcts'))
+    cabecera = _CABECERA.pack(MAGIA, VERSION, flags, time.time(), turn_manager.semilla or 0,
+                              turn_manager.reloj, len(historial) if historial is not None else 0,
+                              turn_manager.vivas_por_jugador.get(1, 0), turn_manager.vivas_por_jugador.get(2, 0),
+                              len(secciones))
+
+    desplazamiento = _CABECERA.size + _SECCION.size * len(secciones)
+    tabla = []
+    for etiqueta, datos in secciones:
+        tabla.append(_SECCION.pack(etiqueta, desplazamiento, len(datos)))
+        desplazamiento += len(datos)
+    return cabecera + b''.join(tabla) + b''.join(datos for _, datos in secciones)
+
+
+def guardar_partida(ruta, turn_manager, turn_queue, historial, vs_ia=False, turno_empezado=True, motor_ia='alfa_beta'):
+    """
+    Escribe la partida en `ruta` (primero en un temporal y después se renombra,
+    para no dejar nunca un archivo a medias). Devuelve la ruta.
+    """
+    datos = codificar_partida(turn_manager, turn_queue, historial, vs_ia, turno_empezado, motor_ia)
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    os.makedirs(directorio, exist_ok=True)
+    temporal = ruta + '.tmp'
+    with open(temporal, 'wb') as archivo:
+        archivo.write(datos)
+    os.replace(temporal, ruta)
+    return ruta
+
+
+def nueva_ruta_partida(directorio=DIRECTORIO_PARTIDAS):
+    """Ruta libre para una partida nueva, con la fecha en el nombre."""
+    base = time.strftime('partida_%Y%m%d_%H%M%S')
+    ruta = os.path.join(directorio, base + EXTENSION)
+    contador = 1
+    while os.path.exists(ruta):
+        contador += 1
+        ruta = os.path.join(directorio, f"{base}_{contador}{EXTENSION}")
+    return ruta
+
+
+# --- Lectura ---
+
+class LecturaPartida:
+    """
+    Partida guardada abierta con mmap. Solo la cabecera y la tabla de secciones
+    se decodifican al abrir; piezas, cola, generador e historial, al pedirlos.
+    """
+    def __init__(self, ruta):
+        self.ruta = ruta
+        with open(ruta, 'rb') as archivo:
+            try:
+                self._mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise FormatoPartidaError(f"{ruta}: archivo vacío") from None
+        try:
+            self.cabecera, self._secciones = _leer_cabecera(self._mapa, ruta)
+        except (FormatoPartidaError, struct.error):
+            self._mapa.close()
+            raise
+
+    @classmethod
+    def desde_bytes(cls, datos, nombre='<memoria>'):
+        """Misma lectura sobre unos bytes ya en memoria (p.ej. dentro de una repetición)."""
+        lectura = cls.__new__(cls)
+        lectura.ruta = nombre
+        lectura._mapa = datos
+        lectura.cabecera, lectura._secciones = _leer_cabecera(datos, nombre)
+        return lectura
+
+    def cerrar(self):
+        if isinstance(self._mapa, mmap.mmap):
+            self._mapa.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def seccion(self, etiqueta):
+        """Bytes de una sección (solo se leen del archivo las páginas que la contienen)."""
+        if etiqueta not in self._secciones:
+            raise FormatoPartidaError(f"{self.ruta}: falta la sección {etiqueta!r}")
+        desplazamiento, longitud = self._secciones[etiqueta]
+        if desplazamiento + longitud > len(self._mapa):
+            raise FormatoPartidaError(f"{self.ruta}: sección {etiqueta!r} truncada")
+        return self._mapa[desplazamiento:desplazamiento + longitud]
+
+    def piezas(self):
+        """Lista de (pieza, en_juego) reconstruidas con sus fábricas."""
+        datos = self.seccion(b'PIEZ')
+        (cantidad,) = _ID.unpack_from(datos)
+        resultado = []
+        for id_pieza, codigo, jugador, fila, col, hp, flags, proximo in _PIEZA.iter_unpack(
+                datos[_ID.size:_ID.size + cantidad * _PIEZA.size]):
+            pieza = TIPOS_PIEZA[codigo][1](jugador)
+            pieza.id_pieza = id_pieza
+            pieza.hp = hp
+            pieza.ha_movido = bool(flags & _HA_MOVIDO)
+            pieza.ha_atacado = bool(flags & _HA_ATACADO)
+            pieza.proximo_turno = proximo
+            pieza.posicion = (fila, col) if fila >= 0 else None
+            resultado.append((pieza, bool(flags & _EN_JUEGO)))
+        return resultado
+
+    def cola(self):
+        datos = self.seccion(b'COLA')
+        (cantidad,) = _ID.unpack_from(datos)
+        return [_ID.unpack_from(datos, _ID.size * (i + 1))[0] for i in range(cantidad)]
+
+    def estado_rng(self):
+        datos = self.seccion(b'RNG ')
+        version, gauss = struct.unpack_from('<Bd', datos)
+        estado = array('I')
+        estado.frombytes(datos[struct.calcsize('<Bd'):])
+        return (version, tuple(estado), None if gauss != gauss else gauss)
+
+    def historial(self):
+        """Bytes del historial, o None si la partida se guardó sin él."""
+        if b'HIST' not in self._secciones:
+            return None
+        return self.seccion(b'HIST')
+
+
+def _leer_cabecera(datos, ruta):
+    if len(datos) < _CABECERA.size or bytes(datos[:4]) != MAGIA:
+        raise FormatoPartidaError(f"{ruta}: no es una partida guardada")
+    magia, version, flags, fecha, semilla, reloj, turnos, vivas_1, vivas_2, n_secciones = \
+        _CABECERA.unpack_from(datos)
+    if version > VERSION:
+        raise FormatoPartidaError(f"{ruta}: versión {version} no soportada (máximo {VERSION})")
+    secciones = {}
+    for indice in range(n_secciones):
+        etiqueta, desplazamiento, longitud = _SECCION.unpack_from(datos, _CABECERA.size + _SECCION.size * indice)
+        secciones[etiqueta] = (desplazamiento, longitud)
+    cabecera = CabeceraPartida(ruta, version, flags, fecha, semilla, reloj, turnos, {1: vivas_1, 2: vivas_2})
+    return cabecera, secciones
+
+
+def leer_cabecera(ruta):
+    """Lee solo los metadatos de una partida guardada."""
+    with LecturaPartida(ruta) as lectura:
+        return lectura.cabecera
+
+
+def listar_partidas(directorio=DIRECTORIO_PARTIDAS):
+    """Cabeceras de las partidas guardadas en el directorio, de la más reciente a la más antigua."""
+    if not os.path.isdir(directorio):
+        return []
+    cabeceras = []
+    with os.scandir(directorio) as entradas:
+        for entrada in entradas:
+            if entrada.is_file() and entrada.name.endswith(EXTENSION):
+                try:
+                    cabeceras.append(leer_cabecera(entrada.path))
+                except (OSError, FormatoPartidaError, struct.error) as error:
+                    print(f"[Guardado] Se ignora {entrada.name}: {error}")
+    cabeceras.sort(key=lambda cabecera: cabecera.fecha, reverse=True)
+    return cabeceras
+
+
+def cargar_partida(ruta):
+    """
+    Reconstruye una partida guardada. Devuelve un dict con tablero,
+    turn_manager, turn_queue, historial (sin conectar a ningún BusEventos),
+    rng, vs_ia, motor_ia y turno_empezado (si la pieza al frente de la cola ya había
+    empezado su turno al guardar).
+    """
+    with LecturaPartida(ruta) as lectura:
+        return _reconstruir_partida(lectura)
+
+
+def partida_desde_bytes(datos):
+    """Como cargar_partida(), a partir de los bytes de codificar_partida()."""
+    return _reconstruir_partida(LecturaPartida.desde_bytes(datos))
+
+
+def _reconstruir_partida(lectura):
+    cabecera = lectura.cabecera
+    piezas = lectura.piezas()
+    ids_cola = lectura.cola()
+    estado_rng = lectura.estado_rng()
+    datos_historial = lectura.historial()
+
+    tablero = [[None for _ in range(COLUMNAS)] for _ in range(FILAS)]
+    proximos = {}
+    for pieza, en_juego in piezas:
+        if en_juego:
+            fila, col = pieza.posicion
+            tablero[fila][col] = pieza
+            proximos[pieza] = pieza.proximo_turno
+
+    rng = GeneradorPartida(cabecera.semilla)
+    turn_manager = TurnManager(tablero, rng)
+    turn_queue = TurnQueue(turn_manager)
+    # TurnManager y TurnQueue parten de cero al crearse: se restaura lo guardado encima.
+    for pieza, proximo in proximos.items():
+        pieza.proximo_turno = proximo
+    turn_manager.reloj = cabecera.reloj
+    turn_manager.restaurar_piezas(sorted(proximos, key=lambda pieza: pieza.id_pieza))
+    rng.setstate(estado_rng)
+    turn_queue.restaurar(ids_cola)
+
+    historial = HistorialDeshacer(turn_manager, turn_queue)
+    if datos_historial is not None:
+        historial.importar(bytes(datos_historial), [pieza for pieza, _ in piezas])
+
+    return {
+        'tablero': tablero,
+        'turn_manager': turn_manager,
+        'turn_queue': turn_queue,
+        'historial': historial,
+        'rng': rng,
+        'vs_ia': cabecera.vs_ia,
+        'motor_ia': cabecera.motor_ia,
+        'turno_empezado': bool(cabecera.flags & TURNO_EMPEZADO),
+    }
@@ -6,9 +6,13 @@ Cada estado maneja su propia lógica y renderizado.
 from .in_game import manejar_estado_en_juego
 from .confirmar_salir import manejar_estado_confirmar_salir
 from .fin_del_juego import manejar_estado_fin_juego
+from .cargar_partida import manejar_estado_cargar_partida
+from .repeticion import manejar_estado_repeticion
 
 __all__ = [
     'manejar_estado_en_juego',
     'manejar_estado_confirmar_salir',
     'manejar_estado_fin_juego',
+    'manejar_estado_cargar_partida',
+    'manejar_estado_repeticion',
 ]
\ No newline at end of file
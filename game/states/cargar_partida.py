@@ -0,0 +1,81 @@
+"""
+Estado: CARGAR PARTIDA
+Lista las partidas guardadas (solo se leen sus cabeceras) y permite elegir una
+"""
+
+import time
+
+import pygame
+from game.constants import *
+from game.save_game import listar_partidas
+
+POR_PAGINA = 8
+
+
+def manejar_estado_cargar_partida(pantalla, fuente_menu, fuente_ui):
+    """
+    Maneja la pantalla de selección de partida guardada.
+    
+    Args:
+        pantalla: Superficie de pygame
+        fuente_menu: Fuente grande para el título
+        fuente_ui: Fuente para la lista
+    
+    Returns:
+        tuple: (nuevo_estado, ruta) donde nuevo_estado es 'en_juego' (con la
+        ruta de la partida elegida), 'menu_principal' o 'saliendo' (ruta None)
+    """
+    partidas = listar_partidas()
+    pagina = 0
+    reloj = pygame.time.Clock()
+    
+    while True:
+        ancho_real, alto_real = pantalla.get_size()
+        pantalla.fill(COLOR_FONDO)
+        
+        texto_titulo = fuente_menu.render("Cargar partida", True, (255, 215, 0))
+        pantalla.blit(texto_titulo, texto_titulo.get_rect(center=(ancho_real / 2, 60)))
+        
+        # Lista de partidas de la página actual
+        filas = []
+        visibles = partidas[pagina * POR_PAGINA:(pagina + 1) * POR_PAGINA]
+        for i, cabecera in enumerate(visibles):
+            rect = pygame.Rect(ancho_real / 2 - 300, 120 + i * 55, 600, 45)
+            hover = rect.collidepoint(pygame.mouse.get_pos())
+            pygame.draw.rect(pantalla, (90, 90, 90) if hover else (60, 60, 60), rect, border_radius=6)
+            modo = {'alfa_beta': "vs IA", 'mcts': "vs IA (MCTS)"}.get(cabecera.motor_ia, "Local")
+            texto = (f"{time.strftime('%d/%m/%Y %H:%M', time.localtime(cabecera.fecha))}  -  {modo}  -  "
+                     f"Tic {cabecera.reloj}  -  J1: {cabecera.vivas[1]}  J2: {cabecera.vivas[2]}")
+            render = fuente_ui.render(texto, True, (255, 255, 255))
+            pantalla.blit(render, render.get_rect(midleft=(rect.x + 15, rect.centery)))
+            filas.append((rect, cabecera))
+        
+        if not partidas:
+            texto_vacio = fuente_ui.render("No hay partidas guardadas (pulsa G durante una partida)", True, (200, 200, 200))
+            pantalla.blit(texto_vacio, texto_vacio.get_rect(center=(ancho_real / 2, alto_real / 2)))
+        
+        paginas = max(1, (len(partidas) + POR_PAGINA - 1) // POR_PAGINA)
+        texto_instr = fuente_ui.render(f"Página {pagina + 1}/{paginas}  -  Flechas: cambiar página  -  Esc: volver",
+                                       True, (150, 150, 150))
+        pantalla.blit(texto_instr, texto_instr.get_rect(center=(ancho_real / 2, alto_real - 40)))
+        pygame.display.flip()
+        
+        # Manejo de eventos
+        for evento in pygame.event.get():
+            if evento.type == pygame.QUIT:
+                return ('saliendo', None)
+            
+            if evento.type == pygame.KEYDOWN:
+                if evento.key == pygame.K_ESCAPE:
+                    return ('menu_principal', None)
+                elif evento.key in (pygame.K_RIGHT, pygame.K_DOWN):
+                    pagina = min(pagina + 1, paginas - 1)
+                elif evento.key in (pygame.K_LEFT, pygame.K_UP):
+                    pagina = max(pagina - 1, 0)
+            
+            if evento.type == pygame.MOUSEBUTTONDOWN and evento.button == 1:
+                for rect, cabecera in filas:
+                    if rect.collidepoint(evento.pos):
+                        return ('en_juego', cabecera.ruta)
+        
+        reloj.tick(FPS)
@@ -5,56 +5,153 @@ Maneja la pantalla de victoria
 
 import pygame
 from game.constants import *
+from game import constants
 from game.audio import get_audio
+from game.drawing import dibujar_tablero, dibujar_piezas, dibujar_borde_turno
+from game.replay import LineaTemporal, FormatoRepeticionError
 
+# Turnos que avanzan Arriba/Abajo en el deslizador
+SALTO_LARGO = 10
 
-def manejar_estado_fin_juego(pantalla, ganador, fuente_menu, fuente_ui):
+
+def _rect_deslizador():
+    """Barra del deslizador de turnos, sobre la última fila del tablero."""
+    return pygame.Rect(constants.OFFSET_X + 40, constants.OFFSET_Y + constants.UI_ALTO + constants.ALTO_TABLERO - 40,
+                       constants.ANCHO_TABLERO - 80, 16)
+
+
+def _dibujar_turno(pantalla, motor, turno, total, ganador, fuente_menu, fuente_ui, CACHE_IMAGENES, fuente_hp):
+    """Tablero en el turno elegido, el mensaje de victoria arriba y el deslizador abajo."""
+    pantalla.fill(COLOR_FONDO)
+    dibujar_tablero(pantalla)
+    dibujar_borde_turno(pantalla, motor.pieza_activa)
+    dibujar_piezas(pantalla, motor.tablero, motor.pieza_activa, CACHE_IMAGENES, fuente_hp)
+
+    texto_fin = fuente_menu.render(f"¡El Jugador {ganador} ha ganado!", True, (255, 215, 0))
+    pantalla.blit(texto_fin, texto_fin.get_rect(midleft=(constants.OFFSET_X + 10, constants.OFFSET_Y + constants.UI_ALTO / 2)))
+
+    barra = _rect_deslizador()
+    fondo = pygame.Surface((barra.width + 20, 90), pygame.SRCALPHA)
+    fondo.fill((0, 0, 0, 170))
+    pantalla.blit(fondo, (barra.x - 10, barra.y - 60))
+    pygame.draw.rect(pantalla, (90, 90, 90), barra, border_radius=8)
+    if total:
+        relleno = barra.copy()
+        relleno.width = int(barra.width * turno / total)
+        pygame.draw.rect(pantalla, (255, 215, 0), relleno, border_radius=8)
+        pygame.draw.circle(pantalla, (255, 255, 255), (barra.x + relleno.width, barra.centery), 11)
+
+    texto_turno = fuente_ui.render(f"Turno {turno}/{total}  -  Tic {motor.turn_manager.reloj}  -  "
+                                   f"J1: {motor.turn_manager.vivas_por_jugador.get(1, 0)}  "
+                                   f"J2: {motor.turn_manager.vivas_por_jugador.get(2, 0)}", True, (255, 255, 255))
+    pantalla.blit(texto_turno, (barra.x, barra.y - 52))
+    texto_instr = fuente_ui.render("Izq/Der: turno  Arriba/Abajo: 10 turnos  R: repetición  Esc/Enter: menú",
+                                   True, (180, 180, 180))
+    pantalla.blit(texto_instr, (barra.x, barra.y - 28))
+
+
+def manejar_estado_fin_juego(pantalla, ganador, fuente_menu, fuente_ui, ruta_repeticion=None,
+                             CACHE_IMAGENES=None, fuente_hp=None):
     """
     Maneja el estado de fin del juego (pantalla de victoria).
-    
+    Si hay repetición de la partida se muestra el tablero con un deslizador para
+    saltar a cualquier turno (LineaTemporal: cada salto parte del fotograma
+    clave más cercano).
+
     Args:
         pantalla: Superficie de pygame
         ganador: Número del jugador ganador (1 o 2)
         fuente_menu: Fuente grande para el mensaje de victoria
         fuente_ui: Fuente para instrucciones
-    
+        ruta_repeticion: Repetición grabada de la partida (R para verla), o None
+        CACHE_IMAGENES, fuente_hp: para dibujar el tablero del deslizador
+
     Returns:
-        str: Nuevo estado ('menu_principal' o 'saliendo')
+        str: Nuevo estado ('menu_principal', 'repeticion' o 'saliendo')
     """
-    
+
     audio = get_audio()
-    
+
     # Reproducir sonido de victoria una sola vez
     if not hasattr(audio, '_victoria_sonada'):
         audio.play_victory()
         audio._victoria_sonada = True
-    
+
+    linea = None
+    if ruta_repeticion and CACHE_IMAGENES is not None and fuente_hp is not None:
+        try:
+            linea = LineaTemporal(ruta_repeticion)
+        except (OSError, FormatoRepeticionError) as error:
+            print(f"No se pudo abrir la repetición {ruta_repeticion}: {error}")
+
+    try:
+        return _bucle_fin_juego(pantalla, ganador, fuente_menu, fuente_ui, ruta_repeticion,
+                                linea, CACHE_IMAGENES, fuente_hp, audio)
+    finally:
+        if linea is not None:
+            linea.cerrar()
+
+
+def _bucle_fin_juego(pantalla, ganador, fuente_menu, fuente_ui, ruta_repeticion, linea, CACHE_IMAGENES, fuente_hp, audio):
     reloj = pygame.time.Clock()
-    
+    turno = linea.turnos if linea is not None else 0
+    arrastrando = False
+
     while True:
-        # Limpiar pantalla
-        pantalla.fill(COLOR_FONDO)
-        
-        # Texto de victoria
-        texto_fin = fuente_menu.render(f"¡El Jugador {ganador} ha ganado!", True, (255, 215, 0))
-        texto_instr = fuente_ui.render("Pulsa cualquier tecla para volver al menú", True, (255, 255, 255))
-        
-        rect_fin = texto_fin.get_rect(center=(ANCHO_VENTANA/2, ALTO_VENTANA/2 - 40))
-        rect_instr = texto_instr.get_rect(center=(ANCHO_VENTANA/2, ALTO_VENTANA/2 + 20))
-        
-        pantalla.blit(texto_fin, rect_fin)
-        pantalla.blit(texto_instr, rect_instr)
+        if linea is not None:
+            motor = linea.motor_en_turno(turno)
+            _dibujar_turno(pantalla, motor, turno, linea.turnos, ganador, fuente_menu, fuente_ui, CACHE_IMAGENES, fuente_hp)
+        else:
+            # Limpiar pantalla
+            pantalla.fill(COLOR_FONDO)
+
+            # Texto de victoria
+            texto_fin = fuente_menu.render(f"¡El Jugador {ganador} ha ganado!", True, (255, 215, 0))
+            instrucciones = "Pulsa cualquier tecla para volver al menú"
+            if ruta_repeticion:
+                instrucciones = "R: ver la repetición  -  " + instrucciones
+            texto_instr = fuente_ui.render(instrucciones, True, (255, 255, 255))
+
+            rect_fin = texto_fin.get_rect(center=(ANCHO_VENTANA/2, ALTO_VENTANA/2 - 40))
+            rect_instr = texto_instr.get_rect(center=(ANCHO_VENTANA/2, ALTO_VENTANA/2 + 20))
+
+            pantalla.blit(texto_fin, rect_fin)
+            pantalla.blit(texto_instr, rect_instr)
         pygame.display.flip()
-        
+
         # Manejo de eventos
         for evento in pygame.event.get():
             if evento.type == pygame.QUIT:
                 return 'saliendo'
-            
+
+            if linea is not None:
+                barra = _rect_deslizador()
+                if evento.type == pygame.MOUSEBUTTONDOWN and evento.button == 1 and barra.inflate(0, 20).collidepoint(evento.pos):
+                    arrastrando = True
+                elif evento.type == pygame.MOUSEBUTTONUP and evento.button == 1:
+                    arrastrando = False
+                if arrastrando and evento.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION):
+                    fraccion = min(max((evento.pos[0] - barra.x) / barra.width, 0.0), 1.0)
+                    turno = round(fraccion * linea.turnos)
+
+                if evento.type == pygame.KEYDOWN:
+                    saltos = {pygame.K_LEFT: -1, pygame.K_RIGHT: 1, pygame.K_DOWN: -SALTO_LARGO, pygame.K_UP: SALTO_LARGO}
+                    if evento.key in saltos:
+                        turno = min(max(turno + saltos[evento.key], 0), linea.turnos)
+                        continue
+                    if evento.key == pygame.K_HOME:
+                        turno = 0
+                        continue
+                    if evento.key == pygame.K_END:
+                        turno = linea.turnos
+                        continue
+
             if evento.type == pygame.KEYDOWN:
+                if evento.key == pygame.K_r and ruta_repeticion:
+                    return 'repeticion'
                 # Limpiar el flag de victoria para la próxima vez
                 if hasattr(audio, '_victoria_sonada'):
                     delattr(audio, '_victoria_sonada')
                 return 'menu_principal'
-        
-        reloj.tick(FPS)
\ No newline at end of file
+
+        reloj.tick(FPS)
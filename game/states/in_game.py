@@ -3,15 +3,17 @@ Estado: EN JUEGO
 Maneja toda la logica del juego principal
 """
 
-import copy
 import pygame
 import random
 from game import constants
 from game.drawing import (dibujar_tablero, dibujar_piezas, dibujar_resaltados, dibujar_ui,
                           dibujar_numeros_flotantes, dibujar_animacion_activa, dibujar_proyectiles,
-                          dibujar_borde_turno, obtener_boton_volver, obtener_boton_deshacer, obtener_boton_pasar)
+                          dibujar_borde_turno, obtener_boton_volver, obtener_boton_deshacer, obtener_boton_pasar,
+                          obtener_boton_rehacer, dibujar_ia_pensando)
 from game.turn_queue_display import dibujar_panel_turnos, get_animator
-from game.logic import calcular_casillas_posibles, calcular_ataques_posibles, verificar_ganador
+from game.game_setup import crear_estructuras_partida
+from game.turn_actions import puede_mover, puede_atacar
+from game.save_game import guardar_partida, nueva_ruta_partida
 from game.effects import (DamageText, MoveAnimation, MeleeAttackAnimation,
                           FadeOutAnimation, ProjectileAnimation)
 from game.audio import get_audio
@@ -32,6 +34,9 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
         - ganador
         - animacion_en_curso
         - superficie_blur
+        - ai_agent
+        - eventos, bitboard, hash_zobrist, cache_reglas, mapa_alcance, mapa_amenazas
+          (ver crear_estructuras_partida)
     """
     # Recuperar datos persistentes si existen
     if datos_persistentes:
@@ -42,6 +47,8 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
         animacion_en_curso = datos_persistentes.get('animacion_en_curso')
         superficie_blur = datos_persistentes.get('superficie_blur')
         ai_agent = datos_persistentes.get('ai_agent')
+        estructuras = {clave: datos_persistentes.get(clave) for clave in
+                       ('eventos', 'bitboard', 'hash_zobrist', 'cache_reglas', 'mapa_alcance', 'mapa_amenazas')}
     else:
         pieza_activa = None
         movimientos_resaltados = []
@@ -50,6 +57,15 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
         animacion_en_curso = None
         superficie_blur = None
         ai_agent = None
+        estructuras = {}
+    
+    if estructuras.get('eventos') is None:
+        estructuras = crear_estructuras_partida(tablero, turn_manager.reloj)
+        turn_manager.conectar(estructuras['eventos'])
+        turn_queue.conectar(estructuras['eventos'])
+        historial_turnos.conectar(estructuras['eventos'])
+    eventos = estructuras['eventos']
+    mapa_alcance = estructuras['mapa_alcance']
     
     audio = get_audio()
 
@@ -62,20 +78,22 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
             'ganador': ganador,
             'animacion_en_curso': animacion_en_curso,
             'superficie_blur': superficie_blur,
-            'ai_agent': ai_agent
+            'ai_agent': ai_agent,
+            **estructuras
         }
     
     def finalizar_turno():
         """Finaliza el turno actual y prepara el siguiente."""
         nonlocal pieza_activa, movimientos_resaltados, ataques_resaltados, ganador
         
-        resultado = verificar_ganador(turn_manager.piezas_en_juego)
+        resultado = turn_manager.ganador()
         if resultado is not None:
             ganador = resultado
             return 'fin_del_juego'
         
         if pieza_activa:
-            pieza_activa.calcular_siguiente_turno(turn_manager.reloj)
+            eventos.emitir('fin_turno', pieza_activa)
+            turn_manager.programar_siguiente_turno(pieza_activa)
         
         turn_queue.advance_turn()
         animator = get_animator()
@@ -89,6 +107,15 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
     reloj = pygame.time.Clock()
 
     delay_ia = 0
+    # Future de AIController.pensar mientras la IA busca su acción
+    decision_ia = None
+
+    def cancelar_decision_ia():
+        """Abandona la búsqueda de la IA en curso (al deshacer o al salir)."""
+        nonlocal decision_ia
+        if decision_ia is not None:
+            ai_agent.cancelar()
+            decision_ia = None
     
     while True:
         # --- Gestion de animaciones ---
@@ -98,8 +125,8 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
                 entidad_ended = animacion_en_curso.entidad
                 
                 if isinstance(animacion_en_curso, MoveAnimation):
-                    if entidad_ended.tipo_turno > 0 and not entidad_ended.ha_atacado:
-                        ataques_resaltados = calcular_ataques_posibles(entidad_ended, tablero)
+                    if puede_atacar(entidad_ended):
+                        ataques_resaltados = mapa_alcance.ataques(entidad_ended)
                         if not ataques_resaltados:
                             nuevo_estado = finalizar_turno()
                             if nuevo_estado == 'fin_del_juego':
@@ -108,15 +135,15 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
                         finalizar_turno()
                 
                 elif isinstance(animacion_en_curso, (MeleeAttackAnimation, ProjectileAnimation)):
-                    resultado = verificar_ganador(turn_manager.piezas_en_juego)
+                    resultado = turn_manager.ganador()
                     turn_queue.remove_dead_pieces()
                     if resultado is not None:
                         ganador = resultado
                         animacion_en_curso = None
                         return ('fin_del_juego', obtener_datos_actuales())
                     
-                    if entidad_ended.tipo_turno == 2 and not entidad_ended.ha_movido:
-                        movimientos_resaltados = calcular_casillas_posibles(entidad_ended, tablero)
+                    if puede_mover(entidad_ended):
+                        movimientos_resaltados = mapa_alcance.movimientos(entidad_ended)
                         if not movimientos_resaltados:
                             nuevo_estado = finalizar_turno()
                             if nuevo_estado == 'fin_del_juego':
@@ -134,8 +161,8 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
             numero.update()
         numeros_flotantes[:] = [n for n in numeros_flotantes if n.lifetime > 0]
         
-        # Comprobar fin del juego de forma redundante en cada ciclo.
-        resultado = verificar_ganador(turn_manager.piezas_en_juego)
+        # Comprobar fin del juego en cada ciclo (consulta O(1) sobre los contadores del TurnManager).
+        resultado = turn_manager.ganador()
         if resultado is not None:
             ganador = resultado
             return ('fin_del_juego', obtener_datos_actuales())
@@ -145,23 +172,15 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
             if pieza_encontrada:
                 pieza_activa = pieza_encontrada
                 pieza_activa.reiniciar_estado_turno()
+                # El historial (HistorialDeshacer) abre aquí la marca del turno.
+                eventos.emitir('turno', pieza_activa, turn_manager.reloj)
                 
-                estado_actual = {
-                    'tablero': copy.deepcopy(tablero),
-                    'piezas_en_juego': copy.deepcopy(turn_manager.piezas_en_juego),
-                    'reloj': turn_manager.reloj,
-                    'cola_turnos': [p.posicion for p in turn_queue.queue if p and p.esta_viva()],
-                }
-                historial_turnos.append(estado_actual)
-                if len(historial_turnos) > 5:
-                    historial_turnos.pop(0)
-                
-                movimientos_resaltados = calcular_casillas_posibles(pieza_activa, tablero)
-                ataques_resaltados = calcular_ataques_posibles(pieza_activa, tablero)
+                movimientos_resaltados = mapa_alcance.movimientos(pieza_activa)
+                ataques_resaltados = mapa_alcance.ataques(pieza_activa)
 
                 delay_ia = 30
             else:
-                resultado = verificar_ganador(turn_manager.piezas_en_juego)
+                resultado = turn_manager.ganador()
                 if resultado is not None:
                     ganador = resultado
                     return ('fin_del_juego', obtener_datos_actuales())
@@ -174,14 +193,25 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
         if es_turno_ia:
             if delay_ia > 0:
                 delay_ia -= 1
-            else:
-                accion = ai_agent.calcular_turno(
+            elif decision_ia is None:
+                # La IA piensa en otro hilo (AIController.pensar); aquí solo se recoge la acción
+                decision_ia = ai_agent.pensar(
                     tablero,
                     pieza_activa,
                     movimientos_resaltados,
-                    ataques_resaltados
+                    ataques_resaltados,
+                    mapa_alcance
                 )
 
+            if decision_ia is not None and decision_ia.done():
+                try:
+                    accion = ai_agent.accion_pensada(decision_ia, tablero, pieza_activa, movimientos_resaltados,
+                                                     ataques_resaltados, mapa_alcance)
+                except Exception as error:
+                    print(f"[IA] Error al pensar: {error}")
+                    accion = None
+                decision_ia = None
+
                 if not isinstance(accion, dict) or 'tipo' not in accion:
                     print("[IA] Acción inválida o nula. Pasando turno.")
                     accion = {'tipo': 'pasar'}
@@ -192,7 +222,7 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
 
                 elif accion['tipo'] == 'atacar' and pieza_activa.ha_atacado:
                     print("[IA] Acción inválida: ya atacó este turno. Forzando movimiento o pasando.")
-                    if pieza_activa.tipo_turno == 2 and not pieza_activa.ha_movido:
+                    if puede_mover(pieza_activa):
                         movimiento_destino = movimientos_resaltados[0] if movimientos_resaltados else None
                         if movimiento_destino is not None:
                             accion = {'tipo': 'mover', 'destino': movimiento_destino}
@@ -217,6 +247,7 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
                     tablero[dest_f][dest_c] = pieza_activa
                     pieza_activa.posicion = (dest_f, dest_c)
                     pieza_activa.ha_movido = True
+                    eventos.emitir('movimiento', pieza_activa, (vieja_fila, vieja_col), (dest_f, dest_c))
                     
                     movimientos_resaltados = []
                     ataques_resaltados = []
@@ -230,6 +261,7 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
 
                         if pieza_activa.tipo_ataque == 'ranged': audio.play_ranged_impact()
                         pieza_atacada.recibir_dano(pieza_activa.atk)
+                        eventos.emitir('dano', pieza_atacada, pieza_activa.atk)
                         
                         centro_x = constants.OFFSET_X + obj_c * constants.TAMANO_CASILLA + constants.TAMANO_CASILLA / 2
                         centro_y = constants.OFFSET_Y + obj_f * constants.TAMANO_CASILLA + constants.UI_ALTO + constants.TAMANO_CASILLA / 2
@@ -238,14 +270,15 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
 
                         if not pieza_atacada.esta_viva():
                             audio.play_death()
-                            if pieza_atacada in turn_manager.piezas_en_juego:
-                                turn_manager.piezas_en_juego.remove(pieza_atacada)
+                            if turn_manager.registrar_muerte(pieza_atacada):
                                 nueva_anim_muerte = FadeOutAnimation(pieza_atacada)
                                 animaciones_muerte.append(nueva_anim_muerte)
                                 tablero[obj_f][obj_c] = None
+                                eventos.emitir('muerte', pieza_atacada, (obj_f, obj_c))
                                 get_animator().iniciar_animacion_muerte(pieza_atacada)
                     
                     pieza_activa.ha_atacado = True
+                    eventos.emitir('ataque', pieza_activa, (obj_f, obj_c))
                     ataques_resaltados = []
                     movimientos_resaltados = []
 
@@ -264,19 +297,31 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
         # --- Manejo de Eventos ---
         for evento in pygame.event.get():
             if evento.type == pygame.QUIT:
+                cancelar_decision_ia()
                 return ('saliendo', obtener_datos_actuales())
             
             input_bloqueado = es_turno_ia or animacion_en_curso is not None
+            # Mientras la IA piensa se puede salir o deshacer (la búsqueda se cancela)
+            solo_botones = es_turno_ia and animacion_en_curso is None
             
-            if evento.type == pygame.MOUSEBUTTONDOWN and pieza_activa and not input_bloqueado                                       :
+            # G: guardar la partida (entre acciones del jugador)
+            if evento.type == pygame.KEYDOWN and evento.key == pygame.K_g and pieza_activa and not input_bloqueado:
+                ruta = guardar_partida(nueva_ruta_partida(), turn_manager, turn_queue, historial_turnos,
+                                       vs_ia=ai_agent is not None, turno_empezado=True,
+                                       motor_ia=ai_agent.motor if ai_agent is not None else None)
+                print(f"Partida guardada en {ruta}")
+            
+            if evento.type == pygame.MOUSEBUTTONDOWN and pieza_activa and (not input_bloqueado or solo_botones):
                 pos_clic = evento.pos
                 
                 BOTON_VOLVER = obtener_boton_volver()
                 BOTON_DESHACER = obtener_boton_deshacer()
                 BOTON_PASAR = obtener_boton_pasar()
+                BOTON_REHACER = obtener_boton_rehacer()
                 
                 if BOTON_VOLVER.collidepoint(pos_clic):
                     print("Volviendo al menu principal...")
+                    cancelar_decision_ia()
                     copia_pantalla = pantalla.copy()
                     ancho_real = pantalla.get_width()
                     alto_real = pantalla.get_height()
@@ -285,52 +330,24 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
                     velo_oscuro = pygame.Surface((ancho_real, alto_real), pygame.SRCALPHA)
                     velo_oscuro.fill((0, 0, 0, 150))
                     superficie_blur.blit(velo_oscuro, (0, 0))
-                    return ('confirmacion_salir', {
-                        'pieza_activa': pieza_activa,
-                        'movimientos_resaltados': movimientos_resaltados,
-                        'ataques_resaltados': ataques_resaltados,
-                        'ganador': ganador,
-                        'animacion_en_curso': animacion_en_curso,
-                        'superficie_blur': superficie_blur
-                    })
+                    return ('confirmacion_salir', obtener_datos_actuales())
                 
-                elif BOTON_DESHACER.collidepoint(pos_clic):
-                    # Necesitamos al menos 2 estados: el turno actual y el anterior
-                    if len(historial_turnos) >= 2:
-                        print("Deshaciendo el último movimiento...")
-                        
-                        # Descartamos el estado del turno actual (inicio del turno actual)
-                        historial_turnos.pop()
-                        estado_anterior = historial_turnos.pop()
-                        
-                        # Restaurar datos básicos
-                        tablero[:] = estado_anterior['tablero']
-                        turn_manager.piezas_en_juego = estado_anterior['piezas_en_juego'][:]
-                        turn_manager.reloj = estado_anterior['reloj']
+                elif BOTON_DESHACER.collidepoint(pos_clic) or BOTON_REHACER.collidepoint(pos_clic):
+                    rehacer = BOTON_REHACER.collidepoint(pos_clic)
+                    if historial_turnos.puede_rehacer() if rehacer else historial_turnos.puede_deshacer():
+                        print("Rehaciendo el turno..." if rehacer else "Deshaciendo el último movimiento...")
+                        cancelar_decision_ia()
                         
-                        # Reconstruir el tablero desde piezas_en_juego
-                        for fila in range(constants.FILAS):
-                            for col in range(constants.COLUMNAS):
-                                tablero[fila][col] = None
-                        
-                        for pieza in turn_manager.piezas_en_juego:
-                            fila, col = pieza.posicion
-                            tablero[fila][col] = pieza
+                        # Aplica los cambios anotados (o salta a un fotograma clave) y devuelve la cola guardada
+                        if rehacer:
+                            cola_guardada = historial_turnos.rehacer(tablero)
+                        else:
+                            cola_guardada = historial_turnos.deshacer(tablero)
                         
-                        # Limpiar piezas muertas
-                        for fila in range(constants.FILAS):
-                            for col in range(constants.COLUMNAS):
-                                pieza = tablero[fila][col]
-                                if pieza is not None and pieza.hp <= 0:
-                                    tablero[fila][col] = None
+                        eventos.emitir('historial', 'rehacer' if rehacer else 'deshacer')
+                        eventos.emitir('deshacer', tablero)
                         
-                        posiciones_cola = estado_anterior.get('cola_turnos', [])
-                        turn_queue.queue = []
-                        for pos in posiciones_cola:
-                            if 0 <= pos[0] < constants.FILAS and 0 <= pos[1] < constants.COLUMNAS:
-                                pieza = tablero[pos[0]][pos[1]]
-                                if pieza and pieza.esta_viva():
-                                    turn_queue.queue.append(pieza)
+                        turn_queue.restaurar(cola_guardada)
                         
                         animator = get_animator()
                         animator.resetear(turn_queue.queue)
@@ -343,13 +360,13 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
                         movimientos_resaltados.clear()
                         ataques_resaltados.clear()
                     else:
-                        print("No hay suficientes movimientos para deshacer.")
+                        print("No hay turnos para rehacer." if rehacer else "No hay suficientes movimientos para deshacer.")
                 
-                elif BOTON_PASAR.collidepoint(pos_clic):
+                elif BOTON_PASAR.collidepoint(pos_clic) and not input_bloqueado:
                     print("Pasando turno...")
                     finalizar_turno()
                 
-                else:
+                elif not input_bloqueado:
                     # Coordenadas relativas al tablero (sin offsets)
                     x_relativo = pos_clic[0] - constants.OFFSET_X
                     y_relativo = pos_clic[1] - constants.OFFSET_Y - constants.UI_ALTO
@@ -362,7 +379,7 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
                         # Verificar que la casilla estÃ¡ dentro de los lÃ­mites
                         if 0 <= fila_clic < constants.FILAS and 0 <= col_clic < constants.COLUMNAS:
                             if (fila_clic, col_clic) in ataques_resaltados:
-                                if not pieza_activa.ha_atacado:
+                                if puede_atacar(pieza_activa):
                                     pieza_atacada = tablero[fila_clic][col_clic]
                                     
                                     def aplicar_dano_callback():
@@ -371,6 +388,7 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
                                             audio.play_ranged_impact()
                                         
                                         pieza_atacada.recibir_dano(pieza_activa.atk)
+                                        eventos.emitir('dano', pieza_atacada, pieza_activa.atk)
                                         
                                         # Calcular posiciÃ³n en pÃ­xeles CON offsets
                                         centro_x = constants.OFFSET_X + col_clic * constants.TAMANO_CASILLA + constants.TAMANO_CASILLA / 2
@@ -381,15 +399,16 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
                                         
                                         if not pieza_atacada.esta_viva():
                                             audio.play_death()
-                                            if pieza_atacada in turn_manager.piezas_en_juego:
-                                                turn_manager.piezas_en_juego.remove(pieza_atacada)
+                                            if turn_manager.registrar_muerte(pieza_atacada):
                                                 nueva_anim_muerte = FadeOutAnimation(pieza_atacada)
                                                 animaciones_muerte.append(nueva_anim_muerte)
                                                 tablero[fila_clic][col_clic] = None
+                                                eventos.emitir('muerte', pieza_atacada, (fila_clic, col_clic))
                                                 animator = get_animator()
                                                 animator.iniciar_animacion_muerte(pieza_atacada)
                                     
                                     pieza_activa.ha_atacado = True
+                                    eventos.emitir('ataque', pieza_activa, (fila_clic, col_clic))
                                     ataques_resaltados = []
                                     movimientos_resaltados = []
                                     
@@ -407,7 +426,7 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
                                         audio.play_ranged_cast()
                             
                             elif (fila_clic, col_clic) in movimientos_resaltados:
-                                if not pieza_activa.ha_movido:
+                                if puede_mover(pieza_activa):
                                     vieja_fila, vieja_col = pieza_activa.posicion
                                     
                                     # Calcular posiciones en pÃ­xeles CON offsets
@@ -423,6 +442,7 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
                                     tablero[fila_clic][col_clic] = pieza_activa
                                     pieza_activa.posicion = (fila_clic, col_clic)
                                     pieza_activa.ha_movido = True
+                                    eventos.emitir('movimiento', pieza_activa, (vieja_fila, vieja_col), (fila_clic, col_clic))
                                     
                                     movimientos_resaltados = []
                                     ataques_resaltados = []
@@ -461,6 +481,8 @@ def manejar_estado_en_juego(pantalla, tablero, turn_manager, turn_queue, histori
         dibujar_numeros_flotantes(pantalla, numeros_flotantes)
         dibujar_ui(pantalla, pygame.font.SysFont("Arial", 20), pieza_activa)
         dibujar_panel_turnos(pantalla, turn_queue, CACHE_IMAGENES, pygame.font.SysFont("Arial", int(16 * constants.ESCALA_GLOBAL)))
+        if decision_ia is not None:
+            dibujar_ia_pensando(pantalla, pygame.font.SysFont("Arial", 20), pygame.time.get_ticks())
         
         pygame.display.flip()
         reloj.tick(constants.FPS)
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""
+Estado: REPETICIÓN
+Muestra una repetición grabada con el dibujado normal del tablero. El motor
+(game.replay) aplica un registro cada pocos fotogramas; aquí solo se dibuja.
+"""
+
+import pygame
+from game import constants
+from game.drawing import dibujar_tablero, dibujar_piezas, dibujar_borde_turno
+from game.turn_queue_display import dibujar_panel_turnos, get_animator
+from game.replay import MotorRepeticion, FormatoRepeticionError, RepeticionDivergenteError
+
+# Fotogramas entre dos registros (x1, x2, x4, x10, x20)
+VELOCIDADES = (20, 10, 5, 2, 1)
+
+
+def manejar_estado_repeticion(pantalla, ruta, CACHE_IMAGENES, fuente_hp, fuente_ui, estado_al_salir='menu_principal'):
+    """
+    Reproduce la repetición de `ruta`.
+    Espacio: pausa  -  Derecha: un paso  -  Arriba/Abajo: velocidad  -  Esc: salir
+
+    Returns:
+        str: `estado_al_salir` o 'saliendo'
+    """
+    try:
+        motor = MotorRepeticion(ruta, verificar=False)
+    except (OSError, FormatoRepeticionError) as error:
+        print(f"No se pudo abrir la repetición {ruta}: {error}")
+        return estado_al_salir
+
+    animator = get_animator()
+    animator.resetear(motor.turn_queue.queue)
+    reloj = pygame.time.Clock()
+    velocidad = 0
+    pausa = False
+    espera = 0
+
+    while True:
+        avanzar = False
+        for evento in pygame.event.get():
+            if evento.type == pygame.QUIT:
+                return 'saliendo'
+            if evento.type == pygame.KEYDOWN:
+                if evento.key == pygame.K_ESCAPE:
+                    animator.resetear([])
+                    return estado_al_salir
+                elif evento.key == pygame.K_SPACE:
+                    pausa = not pausa
+                elif evento.key == pygame.K_RIGHT:
+                    avanzar = True
+                elif evento.key == pygame.K_UP:
+                    velocidad = min(velocidad + 1, len(VELOCIDADES) - 1)
+                elif evento.key == pygame.K_DOWN:
+                    velocidad = max(velocidad - 1, 0)
+
+        if not pausa:
+            espera += 1
+            avanzar = avanzar or espera >= VELOCIDADES[velocidad]
+        if avanzar and not motor.terminada:
+            espera = 0
+            try:
+                tipo, _ = motor.paso()
+            except RepeticionDivergenteError as error:
+                print(error)
+                motor.indice = len(motor.registros)
+            else:
+                if tipo in (b'U', b'R'):
+                    animator.resetear(motor.turn_queue.queue)
+
+        # --- Dibujado ---
+        pantalla.fill(constants.COLOR_FONDO)
+        dibujar_tablero(pantalla)
+        dibujar_borde_turno(pantalla, motor.pieza_activa)
+        dibujar_piezas(pantalla, motor.tablero, motor.pieza_activa, CACHE_IMAGENES, fuente_hp)
+        dibujar_panel_turnos(pantalla, motor.turn_queue, CACHE_IMAGENES, pygame.font.SysFont("Arial", int(16 * constants.ESCALA_GLOBAL)))
+
+        estado = "Fin" if motor.terminada else ("Pausa" if pausa else f"x{VELOCIDADES[0] // VELOCIDADES[velocidad]}")
+        texto = fuente_ui.render(f"Repetición  -  Tic {motor.turn_manager.reloj}  -  {estado}  -  "
+                                 f"Espacio: pausa  Derecha: paso  Arriba/Abajo: velocidad  Esc: salir",
+                                 True, (255, 255, 255))
+        pantalla.blit(texto, (constants.OFFSET_X + 10, constants.OFFSET_Y + 15))
+        pygame.display.flip()
+        reloj.tick(constants.FPS)
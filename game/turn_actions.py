@@ -0,0 +1,157 @@
+"""
+Turnos legales completos.
+Reúne en un solo sitio las reglas de tipo_turno (0: mover o atacar, 1: mover y
+después atacar, 2: mover y atacar en cualquier orden) y genera de forma perezosa
+todos los turnos legales de una pieza: mover→atacar, atacar→mover, solo mover,
+solo atacar o pasar. La posición resultante de cada turno se construye solo
+cuando se pide, así una IA de búsqueda puede recorrer candidatos y podar sin
+crear un tablero por sucesor.
+
+Las acciones son tuplas ('mover', destino) o ('atacar', objetivo).
+"""
+
+import copy
+
+from .logic import calcular_casillas_posibles, calcular_ataques_posibles
+
+
+def puede_mover(pieza):
+    """Indica si la pieza aún puede moverse en este turno."""
+    if pieza.ha_movido:
+        return False
+    if pieza.ha_atacado:
+        return pieza.tipo_turno == 2
+    return True
+
+
+def puede_atacar(pieza):
+    """Indica si la pieza aún puede atacar en este turno."""
+    if pieza.ha_atacado:
+        return False
+    if pieza.ha_movido:
+        return pieza.tipo_turno > 0
+    return True
+
+
+def aplicar_accion(tablero, pieza, accion):
+    """
+    Aplica una acción sobre el tablero sin animaciones ni eventos.
+    Devuelve un registro para deshacerla con revertir_accion().
+    """
+    tipo, (fila, col) = accion
+    if tipo == 'mover':
+        origen = pieza.posicion
+        registro = ('mover', pieza, origen, pieza.ha_movido)
+        tablero[origen[0]][origen[1]] = None
+        tablero[fila][col] = pieza
+        pieza.posicion = (fila, col)
+        pieza.ha_movido = True
+        return registro
+
+    objetivo = tablero[fila][col]
+    registro = ('atacar', pieza, objetivo, pieza.ha_atacado)
+    objetivo.hp -= pieza.atk
+    if not objetivo.esta_viva():
+        tablero[fila][col] = None
+    pieza.ha_atacado = True
+    return registro
+
+
+def revertir_accion(tablero, registro):
+    """Deshace una acción aplicada con aplicar_accion()."""
+    if registro[0] == 'mover':
+        _, pieza, origen, ha_movido = registro
+        fila, col = pieza.posicion
+        tablero[fila][col] = None
+        tablero[origen[0]][origen[1]] = pieza
+        pieza.posicion = origen
+        pieza.ha_movido = ha_movido
+    else:
+        _, pieza, objetivo, ha_atacado = registro
+        objetivo.hp += pieza.atk
+        fila, col = objetivo.posicion
+        tablero[fila][col] = objetivo
+        pieza.ha_atacado = ha_atacado
+
+
+def _siguientes(tablero, pieza, accion, calcular):
+    """Resultado de `calcular` tras aplicar temporalmente una acción."""
+    registro = aplicar_accion(tablero, pieza, accion)
+    try:
+        return calcular(pieza, tablero)
+    finally:
+        revertir_accion(tablero, registro)
+
+
+class Turno:
+    """
+    Un turno legal completo de una pieza: de 0 a 2 acciones.
+    La posición resultante se calcula bajo demanda sobre el tablero con el que se
+    generó, así que hay que pedirla antes de modificar ese tablero.
+    """
+    __slots__ = ('pieza', 'acciones', '_tablero')
+
+    def __init__(self, pieza, tablero, acciones):
+        self.pieza = pieza
+        self.acciones = acciones
+        self._tablero = tablero
+
+    @property
+    def es_pasar(self):
+        return not self.acciones
+
+    def como_acciones(self):
+        """Acciones en el formato de AIController.calcular_turno."""
+        if not self.acciones:
+            return [{'tipo': 'pasar'}]
+        return [
+            {'tipo': 'mover', 'destino': casilla} if tipo == 'mover' else {'tipo': 'atacar', 'objetivo': casilla}
+            for tipo, casilla in self.acciones
+        ]
+
+    def posicion_resultante(self):
+        """
+        Devuelve un tablero nuevo con el turno aplicado. Solo se copian la pieza
+        activa y su objetivo; el resto de piezas se comparten con el original.
+        """
+        tablero = [fila[:] for fila in self._tablero]
+        pieza = copy.copy(self.pieza)
+        tablero[pieza.posicion[0]][pieza.posicion[1]] = pieza
+        for tipo, (fila, col) in self.acciones:
+            if tipo == 'atacar':
+                tablero[fila][col] = copy.copy(tablero[fila][col])
+            aplicar_accion(tablero, pieza, (tipo, (fila, col)))
+        return tablero
+
+    def __repr__(self):
+        return f"Turno({self.pieza!r}, {list(self.acciones)})"
+
+
+def generar_turnos(pieza, tablero):
+    """
+    Genera perezosamente los turnos legales completos de la pieza desde su
+    estado actual (respeta ha_movido / ha_atacado si el turno ya empezó).
+    Orden: turnos con ataque primero, luego los de solo movimiento y por último pasar.
+    Las acciones siguientes se calculan aplicando y revirtiendo la primera sobre
+    el tablero, que queda intacto entre un turno generado y el siguiente.
+    """
+    mover_despues = pieza.tipo_turno == 2 and not pieza.ha_movido
+    atacar_despues = pieza.tipo_turno > 0 and not pieza.ha_atacado
+
+    if puede_atacar(pieza):
+        for objetivo in calcular_ataques_posibles(pieza, tablero):
+            ataque = ('atacar', objetivo)
+            if mover_despues:
+                for destino in _siguientes(tablero, pieza, ataque, calcular_casillas_posibles):
+                    yield Turno(pieza, tablero, (ataque, ('mover', destino)))
+            yield Turno(pieza, tablero, (ataque,))
+
+    if puede_mover(pieza):
+        for destino in calcular_casillas_posibles(pieza, tablero):
+            movimiento = ('mover', destino)
+            if atacar_despues:
+                for objetivo in _siguientes(tablero, pieza, movimiento, calcular_ataques_posibles):
+                    yield Turno(pieza, tablero, (movimiento, ('atacar', objetivo)))
+            yield Turno(pieza, tablero, (movimiento,))
+
+    yield Turno(pieza, tablero, ())
@@ -0,0 +1,173 @@
+"""
+Análisis de equidad del orden de turnos, vectorizado con NumPy.
+Sirve para ajustar la agilidad: 1000 // agi convierte valores como 5.4, 5 o 4.8
+en intervalos enteros de tics, y el desempate aleatorio (una pieza actúa y las
+demás se retrasan un tic) reparte los turnos de una forma difícil de prever a ojo.
+
+Se simulan muchas réplicas independientes de la partida a la vez. Cada réplica es
+una fila de un array (réplicas, piezas) con el próximo turno de cada pieza, y
+cada paso avanza un turno en todas las réplicas con unas pocas operaciones sobre
+el array completo. Se reproducen las reglas de TurnManager y TurnQueue:
+- la pieza con menor proximo_turno sale de la agenda y entra en la cola;
+- si varias coinciden, una al azar sale y las demás se retrasan un tic;
+- cuando la pieza al frente de la cola termina su turno se reprograma desde el
+  reloj actual, que ya va por delante porque la cola se llenó hasta `tamano_cola`.
+  Con tamano_cola=1 se obtiene el planificador puro (el modelo de turn_forecast).
+
+El ejército no incluye muertes: mide solo el reparto por agilidad.
+"""
+
+import numpy as np
+
+
+def _tipos_de(ejercito):
+    """(nombres, agilidades) a partir de piezas o de pares (nombre, agi)."""
+    nombres, agilidades = [], []
+    for elemento in ejercito:
+        if hasattr(elemento, 'agi'):
+            nombres.append(elemento.nombre)
+            agilidades.append(elemento.agi)
+        else:
+            nombre, agi = elemento
+            nombres.append(nombre)
+            agilidades.append(agi)
+    return nombres, agilidades
+
+
+def simular_equidad(ejercito, tics=100_000, replicas=256, tamano_cola=5, umbral_inanicion=1.5, semilla=None):
+    """
+    Simula `replicas` partidas de `tics` tics cada una y devuelve las estadísticas
+    por pieza como arrays (una posición por pieza del ejército):
+    - turnos: turnos jugados (suma de todas las réplicas);
+    - espera_media / espera_maxima: tics entre dos turnos seguidos de la pieza;
+    - turnos_ajenos_max: turnos seguidos de otras piezas sin que juegue ella;
+    - inanicion: fracción de esperas mayores que umbral_inanicion × su intervalo;
+    - retrasos: tics de retraso por desempates, por turno jugado.
+    """
+    nombres, agilidades = _tipos_de(ejercito)
+    n = len(nombres)
+    if n == 0:
+        raise ValueError("El ejército no tiene piezas")
+    tamano_cola = max(1, min(tamano_cola, n))
+    rng = np.random.default_rng(semilla)
+
+    intervalos = np.floor_divide(1000, np.asarray(agilidades, dtype=float))
+    filas = np.arange(replicas)
+    infinito = np.inf
+
+    # Agenda: proximo_turno de cada pieza (inf mientras está en la cola)
+    tiempos = np.broadcast_to(intervalos, (replicas, n)).copy()
+    reloj = np.zeros(replicas)
+    # Cola circular sincronizada: todas las réplicas sacan y meten una pieza por paso
+    cola = np.zeros((replicas, tamano_cola), dtype=np.intp)
+    tiempos_cola = np.zeros((replicas, tamano_cola))
+
+    turnos = np.zeros((replicas, n), dtype=np.int64)
+    ultimo = np.zeros((replicas, n))
+    ultimo_paso = np.zeros((replicas, n), dtype=np.int64)
+    suma_espera = np.zeros((replicas, n))
+    espera_maxima = np.zeros((replicas, n))
+    turnos_ajenos_max = np.zeros((replicas, n), dtype=np.int64)
+    esperas_largas = np.zeros((replicas, n), dtype=np.int64)
+    retrasos = np.zeros((replicas, n), dtype=np.int64)
+    limite_espera = intervalos * umbral_inanicion
+
+    def sacar_de_agenda():
+        """Saca de la agenda la siguiente pieza de cada réplica (con desempate)."""
+        minimo = tiempos.min(axis=1)
+        empatadas = tiempos == minimo[:, None]
+        sorteo = np.where(empatadas, rng.random((replicas, n)), -1.0)
+        elegida = sorteo.argmax(axis=1)
+        empatadas[filas, elegida] = False
+        tiempos[empatadas] += 1
+        retrasos[empatadas] += 1
+        tiempos[filas, elegida] = infinito
+        reloj[:] = np.floor(minimo)
+        return elegida, minimo
+
+    for posicion in range(tamano_cola):
+        cola[:, posicion], tiempos_cola[:, posicion] = sacar_de_agenda()
+
+    paso = 0
+    while True:
+        posicion = paso % tamano_cola
+        pieza = cola[:, posicion]
+        tiempo = tiempos_cola[:, posicion]
+        activas = tiempo <= tics
+        if not activas.any():
+            break
+
+        # Estadísticas del turno que empieza (solo réplicas que no han terminado)
+        r, p, t = filas[activas], pieza[activas], tiempo[activas]
+        espera = t - ultimo[r, p]
+        turnos[r, p] += 1
+        suma_espera[r, p] += espera
+        # Cada réplica aporta un solo par (r, p): la asignación indexada no pisa nada.
+        espera_maxima[r, p] = np.maximum(espera_maxima[r, p], espera)
+        turnos_ajenos_max[r, p] = np.maximum(turnos_ajenos_max[r, p], paso - ultimo_paso[r, p])
+        esperas_largas[r, p] += espera > limite_espera[p]
+        ultimo[r, p] = t
+        ultimo_paso[r, p] = paso + 1
+
+        # Fin del turno: se reprograma desde el reloj y la cola se rellena
+        tiempos[filas, pieza] = reloj + intervalos[pieza]
+        cola[:, posicion], tiempos_cola[:, posicion] = sacar_de_agenda()
+        paso += 1
+
+    total = np.maximum(turnos.sum(axis=0), 1)
+    return {
+        'nombres': nombres,
+        'intervalos': intervalos,
+        'turnos': turnos.sum(axis=0),
+        'espera_media': suma_espera.sum(axis=0) / total,
+        'espera_maxima': espera_maxima.max(axis=0),
+        'turnos_ajenos_max': turnos_ajenos_max.max(axis=0),
+        'inanicion': esperas_largas.sum(axis=0) / total,
+        'retrasos': retrasos.sum(axis=0) / total,
+        'tics_simulados': tics * replicas,
+    }
+
+
+def equidad_por_tipo(ejercito, **opciones):
+    """
+    Agrupa simular_equidad() por tipo de pieza. Devuelve {nombre: estadísticas}
+    con la cuota de turnos real del tipo, la que le tocaría solo por su
+    intervalo (cuota_ideal), y las esperas e inanición del peor de sus piezas.
+    """
+    datos = simular_equidad(ejercito, **opciones)
+    nombres = np.asarray(datos['nombres'])
+    intervalos = datos['intervalos']
+    turnos = datos['turnos']
+    cuota_ideal = (1.0 / intervalos) / (1.0 / intervalos).sum()
+    total_turnos = max(int(turnos.sum()), 1)
+
+    resultado = {}
+    for nombre in dict.fromkeys(datos['nombres']):
+        mascara = nombres == nombre
+        turnos_tipo = int(turnos[mascara].sum())
+        resultado[nombre] = {
+            'piezas': int(mascara.sum()),
+            'intervalo': float(intervalos[mascara][0]),
+            'turnos': turnos_tipo,
+            'cuota': turnos_tipo / total_turnos,
+            'cuota_ideal': float(cuota_ideal[mascara].sum()),
+            'espera_media': float(np.average(datos['espera_media'][mascara], weights=np.maximum(turnos[mascara], 1))),
+            'espera_maxima': float(datos['espera_maxima'][mascara].max()),
+            'turnos_ajenos_max': int(datos['turnos_ajenos_max'][mascara].max()),
+            'inanicion': float(datos['inanicion'][mascara].max()),
+            'retrasos': float(datos['retrasos'][mascara].mean()),
+        }
+    return resultado
+
+
+def informe_equidad(por_tipo):
+    """Texto en columnas con el resultado de equidad_por_tipo()."""
+    lineas = [f"{'Tipo':<11}{'n':>3}{'interv.':>9}{'cuota':>8}{'ideal':>8}"
+              f"{'esp.med':>9}{'esp.max':>9}{'ajenos':>8}{'inanic.':>9}{'retraso':>9}"]
+    for nombre, d in por_tipo.items():
+        lineas.append(
+            f"{nombre:<11}{d['piezas']:>3}{d['intervalo']:>9.0f}{d['cuota']:>8.1%}{d['cuota_ideal']:>8.1%}"
+            f"{d['espera_media']:>9.1f}{d['espera_maxima']:>9.0f}{d['turnos_ajenos_max']:>8}"
+            f"{d['inanicion']:>9.2%}{d['retrasos']:>9.3f}"
+        )
+    return "\n".join(lineas)
@@ -0,0 +1,117 @@
+"""
+Previsión del orden de turnos sin tocar el estado de la partida.
+Trabaja sobre una instantánea de tríos (pieza, proximo_turno, agi) y simula el
+planificador de TurnManager: el menor proximo_turno actúa, vuelve a programarse
+a tiempo + 1000 // agi y, si varias piezas coinciden, una al azar actúa y las
+demás se retrasan un tic. Las piezas solo se usan como etiquetas: nunca se leen
+ni se modifican después de tomar la instantánea.
+
+Los empates se pueden tratar de dos formas:
+- pronosticar_turnos(): valores esperados. Un empate entre k piezas ocupa k
+  turnos seguidos en los que cada una tiene probabilidad 1/k, y todas se
+  reprograman desde su tiempo esperado (t + (k - 1) / 2). Es una sola pasada,
+  pensada para llamarse dentro de una búsqueda.
+- ramas_turnos(): ramas explícitas. Genera perezosamente cada forma de resolver
+  los empates, con su probabilidad exacta.
+
+Modelo: cada pieza se reprograma desde el tic en el que actúa (la cola visible
+de la partida puede desfasarse un poco, porque reprograma con el reloj ya
+adelantado).
+"""
+
+import heapq
+
+
+class TurnoPrevisto:
+    """Un turno previsto: su tiempo y las probabilidades ((pieza, p), ...) de quién lo juega."""
+    __slots__ = ('tiempo', 'probabilidades')
+
+    def __init__(self, tiempo, probabilidades):
+        self.tiempo = tiempo
+        self.probabilidades = probabilidades
+
+    @property
+    def pieza(self):
+        """Pieza más probable para este turno."""
+        return max(self.probabilidades, key=lambda par: par[1])[0]
+
+    def __repr__(self):
+        return f"TurnoPrevisto({self.tiempo}, {list(self.probabilidades)})"
+
+
+def instantanea_turnos(piezas):
+    """Tríos (pieza, proximo_turno, agi) de las piezas vivas, listos para prever."""
+    return tuple((pieza, pieza.proximo_turno, pieza.agi) for pieza in piezas if pieza.esta_viva())
+
+
+def _agenda_inicial(instantanea, reloj):
+    """Montículo de (tiempo, índice) con las entradas pendientes desde `reloj`."""
+    agenda = [(tiempo, indice) for indice, (_, tiempo, _) in enumerate(instantanea)
+              if reloj is None or tiempo > reloj]
+    heapq.heapify(agenda)
+    return agenda
+
+
+def _extraer_empate(agenda):
+    """Saca de la agenda todas las entradas con el menor tiempo."""
+    tiempo, indice = heapq.heappop(agenda)
+    empatadas = [indice]
+    while agenda and agenda[0][0] == tiempo:
+        empatadas.append(heapq.heappop(agenda)[1])
+    empatadas.sort()
+    return tiempo, empatadas
+
+
+def pronosticar_turnos(instantanea, n, reloj=None):
+    """
+    Devuelve los próximos n turnos como TurnoPrevisto, tratando los empates por
+    su valor esperado. Si se pasa `reloj`, se ignoran las entradas que ya no
+    están por delante de él (igual que TurnManager).
+    """
+    incrementos = [1000 // agi for _, _, agi in instantanea]
+    agenda = _agenda_inicial(instantanea, reloj)
+    turnos = []
+    while agenda and len(turnos) < n:
+        tiempo, empatadas = _extraer_empate(agenda)
+        k = len(empatadas)
+        if k == 1:
+            indice = empatadas[0]
+            turnos.append(TurnoPrevisto(tiempo, ((instantanea[indice][0], 1.0),)))
+            heapq.heappush(agenda, (tiempo + incrementos[indice], indice))
+            continue
+
+        probabilidades = tuple((instantanea[indice][0], 1.0 / k) for indice in empatadas)
+        for desfase in range(k):
+            turnos.append(TurnoPrevisto(tiempo + desfase, probabilidades))
+        esperado = tiempo + (k - 1) / 2
+        for indice in empatadas:
+            heapq.heappush(agenda, (esperado + incrementos[indice], indice))
+    return turnos[:n]
+
+
+def ramas_turnos(instantanea, n, reloj=None):
+    """
+    Genera perezosamente (probabilidad, secuencia) para cada resolución posible
+    de los empates en los próximos n turnos; secuencia es una tupla de
+    (tiempo, pieza). Las probabilidades de todas las ramas suman 1. El número de
+    ramas crece con los empates, así que conviene consumirlo con límite.
+    """
+    incrementos = [1000 // agi for _, _, agi in instantanea]
+
+    def expandir(agenda, secuencia, probabilidad):
+        if len(secuencia) >= n or not agenda:
+            yield probabilidad, tuple(secuencia)
+            return
+        agenda = list(agenda)
+        tiempo, empatadas = _extraer_empate(agenda)
+        for afortunada in empatadas:
+            siguiente = list(agenda)
+            heapq.heappush(siguiente, (tiempo + incrementos[afortunada], afortunada))
+            for retrasada in empatadas:
+                if retrasada != afortunada:
+                    heapq.heappush(siguiente, (tiempo + 1, retrasada))
+            secuencia.append((tiempo, instantanea[afortunada][0]))
+            yield from expandir(siguiente, secuencia, probabilidad / len(empatadas))
+            secuencia.pop()
+
+    yield from expandir(_agenda_inicial(instantanea, reloj), [], 1.0)
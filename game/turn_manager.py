@@ -1,63 +1,180 @@
+import heapq
 import random
 
+from .piece_registry import RegistroPiezas
+
 class TurnManager:
-    def __init__(self, tablero):
+    def __init__(self, tablero, rng=None):
         self.reloj = 0
-        self.piezas_en_juego = []
+        # Generador de la partida (ver game_setup.GeneradorPartida); lo comparte la IA.
+        self.rng = rng if rng is not None else random.Random()
+        # BusEventos de la partida (ver conectar); None si nadie escucha.
+        self.eventos = None
+        # Piezas en juego con ids estables e índices por jugador y tipo
+        self.registro = RegistroPiezas()
         # Recolectamos todas las piezas del tablero
         for fila in tablero:
             for pieza in fila:
                 if pieza is not None:
-                    self.piezas_en_juego.append(pieza)
+                    self.registro.registrar(pieza)
                     # Calculamos su primer turno al iniciar
                     pieza.calcular_siguiente_turno(0)
+        self._recontar()
+        self._reconstruir_agenda()
+
+    def conectar(self, eventos):
+        """
+        Emite 'reprogramacion' (pieza, proximo_turno_anterior) en el BusEventos
+        cada vez que cambia el próximo turno de una pieza (p.ej. para deshacer).
+        """
+        self.eventos = eventos
+
+    def _avisar_reprogramacion(self, pieza, anterior):
+        if self.eventos is not None:
+            self.eventos.emitir('reprogramacion', pieza, anterior)
+
+    @property
+    def piezas_en_juego(self):
+        """Lista de las piezas en juego, en orden de registro."""
+        return list(self.registro)
+
+    # --- Contadores de piezas vivas ---
+
+    def _recontar(self):
+        """Recalcula desde cero cuántas piezas vivas tiene cada jugador."""
+        self.vivas_por_jugador = {}
+        for pieza in self.registro:
+            if pieza.esta_viva():
+                self.vivas_por_jugador[pieza.jugador] = self.vivas_por_jugador.get(pieza.jugador, 0) + 1
+        # Jugadores que aún tienen al menos una pieza viva
+        self.jugadores_vivos = set(self.vivas_por_jugador)
+
+    def registrar_muerte(self, pieza):
+        """
+        Saca una pieza derrotada del juego y actualiza los contadores.
+        Devuelve False si la pieza ya no estaba en juego.
+        """
+        if not self.registro.quitar(pieza):
+            return False
+        self.desprogramar(pieza)
+        restantes = self.vivas_por_jugador[pieza.jugador] - 1
+        self.vivas_por_jugador[pieza.jugador] = restantes
+        if restantes == 0:
+            self.jugadores_vivos.discard(pieza.jugador)
+        return True
+
+    @property
+    def semilla(self):
+        return getattr(self.rng, 'semilla', None)
+
+    def restaurar_piezas(self, piezas):
+        """Reemplaza las piezas en juego (p.ej. al deshacer) y recuenta."""
+        self.registro.reemplazar(pieza for pieza in piezas if pieza.esta_viva())
+        self._recontar()
+        self._reconstruir_agenda()
+
+    def ganador(self):
+        """
+        Devuelve el jugador que gana si es el único con piezas vivas, o None si
+        el juego continúa (o no queda nadie). Sirve para cualquier número de jugadores.
+        """
+        if len(self.jugadores_vivos) == 1:
+            return next(iter(self.jugadores_vivos))
+        return None
     
-    def avanzar_reloj_y_obtener_pieza(self):
-        self.piezas_en_juego = [p for p in self.piezas_en_juego if p.esta_viva()]
+    # --- Agenda de turnos ---
+    # Montículo de entradas [proximo_turno, secuencia, pieza]. La entrada vigente
+    # de cada pieza está en _entradas; las demás se descartan al llegar a la cima
+    # (borrado perezoso), igual que las que ya quedaron atrás del reloj.
 
-        self.reloj += 1
-        piezas_con_turno = []
-        for pieza in self.piezas_en_juego:
-            if pieza.proximo_turno == self.reloj:
-                piezas_con_turno.append(pieza)
-        
-        if not piezas_con_turno:
+    def _reconstruir_agenda(self):
+        self._agenda = []
+        self._entradas = {}
+        self._secuencia = 0
+        for pieza in self.registro:
+            self.programar(pieza)
+
+    def programar(self, pieza):
+        """(Re)inserta la pieza en la agenda con su proximo_turno actual. O(log n)."""
+        self._secuencia += 1
+        entrada = [pieza.proximo_turno, self._secuencia, pieza]
+        self._entradas[pieza] = entrada
+        heapq.heappush(self._agenda, entrada)
+
+    def desprogramar(self, pieza):
+        """Quita la pieza de la agenda (p.ej. al morir). O(1) aquí, O(log n) al descartarla."""
+        self._entradas.pop(pieza, None)
+
+    def programar_siguiente_turno(self, pieza):
+        """Calcula el próximo turno de la pieza desde el reloj actual y la agenda."""
+        anterior = pieza.proximo_turno
+        pieza.calcular_siguiente_turno(self.reloj)
+        self.programar(pieza)
+        self._avisar_reprogramacion(pieza, anterior)
+
+    def _cima(self):
+        """Entrada vigente con el menor proximo_turno posterior al reloj, o None."""
+        agenda = self._agenda
+        while agenda:
+            entrada = agenda[0]
+            tiempo, _, pieza = entrada
+            if self._entradas.get(pieza) is not entrada:
+                heapq.heappop(agenda)
+            elif tiempo != pieza.proximo_turno:
+                # Alguien cambió proximo_turno sin pasar por programar(): se reinserta.
+                heapq.heappop(agenda)
+                self.programar(pieza)
+            elif tiempo <= self.reloj:
+                # El reloj ya pasó ese tic: la pieza no vuelve a tener turno hasta reprogramarla.
+                heapq.heappop(agenda)
+                del self._entradas[pieza]
+            else:
+                return entrada
+        return None
+
+    def avanzar_reloj_y_obtener_pieza(self):
+        """Avanza un solo tic. Devuelve la pieza con turno en ese tic, o None."""
+        entrada = self._cima()
+        if entrada is None or entrada[0] != self.reloj + 1:
+            self.reloj += 1
             return None
-        
-        if len(piezas_con_turno) == 1:
-            return piezas_con_turno[0]
-        else:
-            random.shuffle(piezas_con_turno)
-            pieza_afortunada = piezas_con_turno.pop(0)
-            for pieza_retrasada in piezas_con_turno:
-                pieza_retrasada.proximo_turno += 1
-            return pieza_afortunada
+        return self.obtener_siguiente_pieza_activa()
 
     def obtener_siguiente_pieza_activa(self):
-        """Avanza el reloj hasta encontrar la siguiente pieza que debe actuar."""
-        if not self.piezas_en_juego:
+        """
+        Salta el reloj directamente al siguiente tic con algún turno.
+        Si varias piezas coinciden, una al azar actúa y las demás se retrasan un tic.
+        """
+        entrada = self._cima()
+        if entrada is None:
             return None
 
-        while True:
-            self.reloj += 1
-            piezas_con_turno = []
-            for pieza in self.piezas_en_juego:
-                if pieza.proximo_turno == self.reloj:
-                    piezas_con_turno.append(pieza)
+        tiempo = entrada[0]
+        piezas_con_turno = []
+        while entrada is not None and entrada[0] == tiempo:
+            heapq.heappop(self._agenda)
+            del self._entradas[entrada[2]]
+            piezas_con_turno.append(entrada[2])
+            entrada = self._cima()
+        # proximo_turno puede ser float (1000 // agi con agi decimal); el reloj sigue siendo entero.
+        self.reloj = int(tiempo)
+
+        # --- Resolución de Conflictos ---
+        if len(piezas_con_turno) == 1:
+            return piezas_con_turno[0] # Solo una pieza tiene turno, la devolvemos
 
-            if not piezas_con_turno:
-                continue # Nadie tiene turno, el reloj sigue avanzando
+        # ¡Conflicto! Múltiples piezas en el mismo tic.
+        # Se parte del orden por id y no del de la agenda (que depende de cómo se
+        # reconstruyó): así el sorteo solo depende del generador, también tras
+        # deshacer, cargar una partida o reproducir una repetición.
+        piezas_con_turno.sort(key=lambda pieza: pieza.id_pieza)
+        self.rng.shuffle(piezas_con_turno)
+        pieza_afortunada = piezas_con_turno.pop(0) # La primera es la elegida
 
-            # --- Resolución de Conflictos ---
-            if len(piezas_con_turno) == 1:
-                return piezas_con_turno[0] # Solo una pieza tiene turno, la devolvemos
-            else:
-                # ¡Conflicto! Múltiples piezas en el mismo tic.
-                random.shuffle(piezas_con_turno)
-                pieza_afortunada = piezas_con_turno.pop(0) # La primera es la elegida
-                
-                # Retrasamos a las demás
-                for pieza_retrasada in piezas_con_turno:
-                    pieza_retrasada.proximo_turno += 1
-                
-                return pieza_afortunada
\ No newline at end of file
+        # Retrasamos a las demás
+        for pieza_retrasada in piezas_con_turno:
+            pieza_retrasada.proximo_turno += 1
+            self.programar(pieza_retrasada)
+            self._avisar_reprogramacion(pieza_retrasada, pieza_retrasada.proximo_turno - 1)
+
+        return pieza_afortunada
@@ -6,61 +6,62 @@ class TurnQueue:
     def __init__(self, turn_manager):
         """
         Inicializa la cola de turnos.
-        
+
         Args:
             turn_manager: Instancia de TurnManager que proporciona las piezas
+
+        La cola se mantiene válida por eventos (ver conectar): las lecturas no
+        filtran nada. `version` aumenta cada vez que la cola cambia, así quien
+        la dibuja puede saber si tiene que volver a sincronizarse.
         """
         self.turn_manager = turn_manager
         self.queue = []  # Cola de piezas activas
         self.max_size = 5
-        
+        self.version = 0
+        self._vista = ()
+
         # Llenar la cola inicial
         self._fill_queue()
-    
+
+    def conectar(self, eventos):
+        """Se suscribe al BusEventos de la partida."""
+        eventos.suscribir('muerte', self._al_morir)
+        eventos.suscribir('movimiento', self._al_mover)
+        eventos.suscribir('deshacer', self._al_deshacer)
+
+    def _cambio(self):
+        """Registra un cambio en la cola: nueva versión y nueva vista inmutable."""
+        self.version += 1
+        self._vista = tuple(self.queue)
+
     def get_max_size(self):
         """Devuelve el tamaño máximo dinámico de la cola.
         Es el menor entre 5 y el número de piezas activas.
         """
-        piezas_activas = [p for p in self.turn_manager.piezas_en_juego if p and p.esta_viva() and hasattr(p, 'posicion')]
-        return min(self.max_size, len(piezas_activas))
+        return min(self.max_size, len(self.turn_manager.registro))
 
     def _fill_queue(self):
         """Llena la cola hasta tener el número dinámico de piezas válidas."""
+        cambiada = False
         while len(self.queue) < self.get_max_size():
-            # CRÍTICO: Limpiar piezas muertas o inválidas de la cola
-            self.queue = [p for p in self.queue if p and p.esta_viva() and hasattr(p, 'posicion')]
-            
             # Obtener siguiente pieza del turn_manager
             siguiente = self.turn_manager.obtener_siguiente_pieza_activa()
-            
+
             if siguiente is None:
                 # No hay más piezas disponibles
                 break
-            
-            # Validar que la pieza esté viva y tenga posición antes de agregar
-            if siguiente.esta_viva() and hasattr(siguiente, 'posicion'):
-                # Agregar a la cola si no está ya presente
-                if siguiente not in self.queue:
-                    self.queue.append(siguiente)
-            else:
-                # Si la pieza no es válida, continuar buscando
-                continue
-    
+
+            # Agregar a la cola si no está ya presente
+            if siguiente not in self.queue:
+                self.queue.append(siguiente)
+                cambiada = True
+        if cambiada:
+            self._cambio()
+
     def get_current_piece(self):
-        """
-        Retorna la pieza que tiene el turno actual (primera de la cola).
-        Limpia piezas muertas antes de retornar.
-        """
-        # CRÍTICO: Filtrar piezas que no están vivas o no tienen posición válida
-        self.queue = [p for p in self.queue if p and p.esta_viva() and hasattr(p, 'posicion')]
-        
-        # Rellenar si es necesario
-        if len(self.queue) < self.get_max_size():
-            self._fill_queue()
-        
-        # Retornar primera pieza o None
+        """Retorna la pieza que tiene el turno actual (primera de la cola)."""
         return self.queue[0] if self.queue else None
-    
+
     def advance_turn(self):
         """
         Avanza al siguiente turno: remueve la primera pieza de la cola
@@ -68,44 +69,36 @@ class TurnQueue:
         """
         if not self.queue:
             return None
-        
+
         # Remover la primera pieza (turno completado)
-        pieza_completada = self.queue.pop(0)
-        
-        # CRÍTICO: Limpiar piezas muertas o inválidas de la cola
-        self.queue = [p for p in self.queue if p and p.esta_viva() and hasattr(p, 'posicion')]
-        
+        self.queue.pop(0)
+        self._cambio()
+
         # Llenar la cola de nuevo
         self._fill_queue()
-        
+
         # Retornar la nueva pieza activa
         return self.get_current_piece()
-    
+
     def get_queue(self):
         """
-        Retorna una copia de la cola actual.
-        Útil para la visualización.
+        Retorna la cola actual como tupla inmutable (sin copiar: se rehace solo
+        cuando la cola cambia). Útil para la visualización.
         """
-        # CRÍTICO: Filtrar piezas que no están vivas o no tienen posición válida
-        self.queue = [p for p in self.queue if p and p.esta_viva() and hasattr(p, 'posicion')]
-        
-        # Rellenar si es necesario
-        if len(self.queue) < self.get_max_size():
-            self._fill_queue()
-        
-        return list(self.queue)
-    
+        return self._vista
+
     def remove_dead_pieces(self):
         """
         Limpia explícitamente piezas muertas de la cola y la rellena.
-        Útil para llamar después de batallas.
+        Con la cola conectada a los eventos ya no debería encontrar ninguna;
+        se mantiene por si alguien mata piezas sin emitir 'muerte'.
         """
-        # CRÍTICO: Limpiar piezas muertas o inválidas
-        self.queue = [p for p in self.queue if p and p.esta_viva() and hasattr(p, 'posicion')]
-        
-        # Rellenar
+        vivas = [p for p in self.queue if p.esta_viva()]
+        if len(vivas) != len(self.queue):
+            self.queue = vivas
+            self._cambio()
         self._fill_queue()
-    
+
     def rebuild(self):
         """
         Reconstruye completamente la cola desde cero.
@@ -113,6 +106,45 @@ class TurnQueue:
         """
         # Vaciar la cola completamente
         self.queue = []
-        
+        self._cambio()
+
         # Llenar de nuevo desde el estado actual del turn_manager
-        self._fill_queue()
\ No newline at end of file
+        self._fill_queue()
+
+    def ids(self):
+        """Ids de las piezas en cola, en orden (es lo que se guarda en el historial)."""
+        return [pieza.id_pieza for pieza in self.queue]
+
+    def restaurar(self, ids):
+        """
+        Restaura la cola guardada en un estado del historial (ids de las piezas
+        en cola) una vez restauradas las piezas del turn_manager.
+        """
+        self.queue = []
+        registro = self.turn_manager.registro
+        for id_pieza in ids:
+            pieza = registro.obtener(id_pieza)
+            if pieza is not None and pieza.esta_viva():
+                self.queue.append(pieza)
+        self._cambio()
+        self._fill_queue()
+
+    # --- Eventos ---
+
+    def _al_morir(self, pieza, casilla):
+        if pieza in self.queue:
+            self.queue.remove(pieza)
+            self._cambio()
+        self._fill_queue()
+
+    def _al_mover(self, pieza, origen, destino):
+        # La cola no cambia de orden, pero quien la dibuja puede mostrar posiciones.
+        if pieza in self.queue:
+            self._cambio()
+
+    def _al_deshacer(self, tablero):
+        # Las piezas son las mismas, pero deshacer cambia sus proximo_turno y puede
+        # revivir piezas: la cola vieja ya no sirve. El estado en juego la rellena
+        # después con restaurar() con los ids que guardó el historial.
+        self.queue = []
+        self._cambio()
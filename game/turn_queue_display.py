@@ -18,6 +18,8 @@ class TurnQueueAnimator:
         self.slide_animation_duration = 20  # frames para completar la animación de deslizamiento
         self.death_animation_duration = 40  # frames para completar fade a gris
         self.fade_first_slot = False
+        # Versión de la TurnQueue con la que se sincronizaron los slots por última vez
+        self.version_sincronizada = None
 
     def inicializar_slots(self, cola_piezas):
         """Inicializa los slots con las piezas actuales."""
@@ -37,6 +39,7 @@ class TurnQueueAnimator:
         self.animating_slide = False
         self.slide_animation_progress = 0
         self.fade_first_slot = False
+        self.version_sincronizada = None
         self.inicializar_slots(cola_piezas)
     
     def iniciar_animacion_avanzar(self, nueva_cola):
@@ -70,8 +73,13 @@ class TurnQueueAnimator:
                     self.slots[i]['gray_progress'] = 0
                     self.slots[i]['death_timer'] = 0
     
-    def update(self, cola_real):
-        """Actualiza el estado de las animaciones."""
+    def update(self, cola_real, version=None):
+        """
+        Actualiza el estado de las animaciones.
+        Si se pasa la versión de la TurnQueue, solo se resincroniza cuando la cola
+        cambió o cuando termina alguna animación que bloqueaba slots.
+        """
+        animacion_terminada = False
         # Actualizar animación de muerte (fade a gris)
         for slot in self.slots:
             if slot['graying']:
@@ -86,6 +94,7 @@ class TurnQueueAnimator:
                 # Si completó la animación de muerte, limpiar el slot
                 if slot['death_timer'] >= self.death_animation_duration:
                     # Marcar como no gris para que se pueda actualizar
+                    animacion_terminada = True
                     slot['graying'] = False
                     slot['gray_progress'] = 0
                     slot['death_timer'] = 0
@@ -96,13 +105,16 @@ class TurnQueueAnimator:
             
             if self.slide_animation_progress >= self.slide_animation_duration:
                 # Animación completada
+                animacion_terminada = True
                 self.animating_slide = False
                 self.slide_animation_progress = 0
                 self.fade_first_slot = False
         
         # Sincronizar con la cola real si no hay animaciones activas
         if not self.animating_slide:
-            self.sincronizar_con_cola(cola_real)
+            if version is None or version != self.version_sincronizada or animacion_terminada:
+                self.sincronizar_con_cola(cola_real)
+                self.version_sincronizada = version
     
     def get_slot_offset(self, slot_index, altura_slot):
         """Calcula el offset Y para un slot durante la animación."""
@@ -157,7 +169,7 @@ def dibujar_panel_turnos(pantalla, turn_queue, cache_imagenes, fuente_ui):
         _animator.inicializar_slots(cola)
     
     # Actualizar animaciones
-    _animator.update(cola)
+    _animator.update(cola, turn_queue.version)
     
     # Calcular dimensiones y posición del panel
     panel_x = constants.OFFSET_X + constants.ANCHO_TABLERO
@@ -182,7 +194,7 @@ def dibujar_panel_turnos(pantalla, turn_queue, cache_imagenes, fuente_ui):
     espacio_disponible = panel_alto - margen_superior - 20  # 20 de margen inferior
     altura_slot = int(espacio_disponible / 5.75)
     espacio_superior = altura_slot * 0.75
-    cantidad_a_mostrar = min(5, len(turn_queue.queue))
+    cantidad_a_mostrar = min(5, len(cola))
    
     for i in range(cantidad_a_mostrar):
         if i >= len(_animator.slots):
@@ -0,0 +1,418 @@
+"""
+Historial para deshacer y rehacer basado en deltas (patrón comando).
+En lugar de copiar el tablero y todas las piezas al empezar cada turno, se
+escucha el BusEventos y se anota cada cambio de forma que se pueda aplicar en
+los dos sentidos:
+    mover       (id, origen, destino)
+    dano        (id, cantidad)
+    muerte      (id, casilla)
+    reprogramar (id, proximo_turno anterior, proximo_turno nuevo)
+Cada turno abre una marca con lo poco que no llega por eventos: el reloj, el
+estado del generador aleatorio y los ids de la cola. Deshacer revierte los
+cambios anotados en orden inverso, así que cuesta O(cambios) y las piezas
+siguen siendo los mismos objetos (sin copias que dejen referencias colgando).
+
+Almacenamiento compacto:
+- Cada turno cerrado se guarda como bytes empaquetados con struct (cabecera +
+  un registro de pocos bytes por cambio), con las piezas referidas por id.
+- El estado del generador (624 palabras) solo cambia de verdad cada 624
+  números; se guarda una vez por bloque y las marcas apuntan al bloque. Los
+  bloques cuentan para el presupuesto, así que al plegar o descartar turnos se
+  quitan los que ya no usa ninguna cabecera y se renumeran los demás.
+- El tope es un presupuesto de bytes, no un número de turnos. Al pasarse, los
+  turnos más antiguos se pliegan en una foto base (el estado completo al
+  empezar el turno más antiguo que queda) y, cada `intervalo_claves` turnos
+  plegados, se guarda una copia de la foto como fotograma clave. Más allá de
+  los deltas, deshacer salta de clave en clave; si las claves ocupan demasiado
+  se descarta una de cada dos (la del primer turno se conserva siempre).
+
+Línea temporal: claves antiguas -> foto base -> turnos con deltas. `_posicion`
+indica en qué punto está la partida: 0..len(_marcas) dentro de los deltas, o
+negativa cuando se ha retrocedido hasta una clave. Lo que queda por delante se
+puede rehacer hasta que se anota un cambio nuevo.
+"""
+
+import struct
+from array import array
+
+# Registros de cambio: código, id de pieza y datos
+_MOVER, _DANO, _MUERTE, _REPROGRAMAR = 1, 2, 3, 4
+_FORMATOS = {
+    _MOVER: struct.Struct('<BHBBBB'),
+    _DANO: struct.Struct('<BHh'),
+    _MUERTE: struct.Struct('<BHBB'),
+    _REPROGRAMAR: struct.Struct('<BHdd'),
+}
+# Cabecera de marca: reloj, bloque del generador, índice en el bloque, tamaño de la cola
+_CABECERA = struct.Struct('<qIHB')
+_ID = struct.Struct('<H')
+# Pieza en una foto: id, fila, columna, hp, proximo_turno
+_PIEZA_FOTO = struct.Struct('<HBBhd')
+# Exportación: presupuesto, intervalo, plegados, posición, nº de bloques, marcas y claves
+_ESTADO = struct.Struct('<QIIiIII')
+_LONGITUD = struct.Struct('<I')
+_PALABRAS_RNG = 624
+
+
+def _bloque_rng(datos):
+    """Bloque del generador al que apunta la cabecera de una marca o foto."""
+    return _CABECERA.unpack_from(datos)[1]
+
+
+class MarcaTurno:
+    """Turno en curso: cabecera empaquetada y cambios anotados desde que empezó."""
+    __slots__ = ('cabecera', 'cambios')
+
+    def __init__(self, cabecera):
+        self.cabecera = cabecera
+        self.cambios = bytearray()
+
+
+class HistorialDeshacer:
+    def __init__(self, turn_manager, turn_queue, presupuesto_bytes=1 << 20, intervalo_claves=25):
+        self.turn_manager = turn_manager
+        self.turn_queue = turn_queue
+        self.presupuesto_bytes = presupuesto_bytes
+        self.intervalo_claves = intervalo_claves
+
+        self._piezas = {pieza.id_pieza: pieza for pieza in turn_manager.registro}
+        self._bloques_rng = []
+        self._marcas = []
+        self._posicion = 0
+        self._abierta = None
+        self._base = None
+        self._claves = []
+        self._plegados = 0
+        self.bytes_usados = 0
+
+    def conectar(self, eventos):
+        """Se suscribe al BusEventos de la partida."""
+        eventos.suscribir('turno', self._al_empezar_turno)
+        eventos.suscribir('movimiento', lambda pieza, origen, destino:
+                          self._anotar(pieza, _MOVER, *origen, *destino))
+        eventos.suscribir('dano', lambda pieza, cantidad: self._anotar(pieza, _DANO, cantidad))
+        eventos.suscribir('muerte', lambda pieza, casilla: self._anotar(pieza, _MUERTE, *casilla))
+        eventos.suscribir('reprogramacion', lambda pieza, anterior:
+                          self._anotar(pieza, _REPROGRAMAR, anterior, pieza.proximo_turno))
+
+    def __len__(self):
+        """Turnos a los que se puede volver (con deltas o por fotograma clave)."""
+        return self._posicion + len(self._claves)
+
+    def estadisticas(self):
+        return {
+            'bytes': self.bytes_usados,
+            'presupuesto': self.presupuesto_bytes,
+            'turnos_con_deltas': len(self._marcas),
+            'fotogramas_clave': len(self._claves),
+            'bloques_rng': len(self._bloques_rng),
+        }
+
+    # --- Anotación ---
+
+    def _al_empezar_turno(self, pieza, reloj):
+        abierta = self._abierta
+        self._abierta = MarcaTurno(self._cabecera_actual())
+        if abierta is not None and abierta.cambios:
+            self._guardar_marca(bytes(abierta.cabecera + abierta.cambios))
+            self._posicion += 1
+            self._ajustar_presupuesto()
+        if self._base is None:
+            self._base = self._foto_actual(self._abierta.cabecera)
+            self.bytes_usados += len(self._base)
+
+    def _anotar(self, pieza, codigo, *datos):
+        if self._abierta is None:
+            # Cambios anteriores al primer turno (llenado inicial de la cola): no se deshacen.
+            return
+        if not self._abierta.cambios:
+            self._descartar_futuro()
+        self._piezas[pieza.id_pieza] = pieza
+        self._abierta.cambios += _FORMATOS[codigo].pack(codigo, pieza.id_pieza, *datos)
+
+    def _guardar_marca(self, datos):
+        self._marcas.append(datos)
+        self.bytes_usados += len(datos)
+
+    def _descartar_futuro(self):
+        """Un cambio nuevo invalida lo que se podía rehacer."""
+        if self._posicion < 0:
+            # Se había vuelto a una clave: pasa a ser la foto base de una historia nueva.
+            indice = len(self._claves) + self._posicion
+            for datos in self._marcas + self._claves[indice + 1:] + [self._base]:
+                self.bytes_usados -= len(datos)
+            self._base = self._claves[indice]
+            del self._claves[indice:]
+            self._marcas = []
+            self._posicion = 0
+            # El primer plegado de la historia nueva vuelve a guardar esta foto como clave.
+            self._plegados = 0
+            self._podar_bloques_rng()
+        elif self._posicion < len(self._marcas):
+            for datos in self._marcas[self._posicion:]:
+                self.bytes_usados -= len(datos)
+            del self._marcas[self._posicion:]
+            self._podar_bloques_rng()
+
+    # --- Presupuesto y fotogramas clave ---
+
+    def _ajustar_presupuesto(self):
+        while self.bytes_usados > self.presupuesto_bytes and self._posicion > 0:
+            if self._plegados % self.intervalo_claves == 0:
+                self._claves.append(self._base)
+                self.bytes_usados += len(self._base)
+            marca = self._marcas.pop(0)
+            self._posicion -= 1
+            self._plegados += 1
+            nueva_base = self._plegar(self._base, marca, self._marcas[0][:self._tamano_cabecera(self._marcas[0])]
+                                      if self._marcas else self._abierta.cabecera)
+            self.bytes_usados += len(nueva_base) - len(self._base) - len(marca)
+            # El bloque del turno plegado puede haberse quedado sin cabeceras que lo usen
+            bloque_plegado = _bloque_rng(self._base)
+            self._base = nueva_base
+            if not self._aclarar_claves() and _bloque_rng(nueva_base) != bloque_plegado:
+                self._podar_bloques_rng()
+
+    def _aclarar_claves(self):
+        """
+        Si las claves (con los bloques del generador que solo usan ellas) ocupan
+        más de un cuarto del presupuesto, se queda una de cada dos. Devuelve si
+        descartó alguna (entonces ya ha podado los bloques).
+        """
+        bloques = {_bloque_rng(clave) for clave in self._claves} - {_bloque_rng(self._base)}
+        ocupado = sum(len(clave) for clave in self._claves) + len(bloques) * _PALABRAS_RNG * 4
+        if ocupado > self.presupuesto_bytes // 4 and len(self._claves) > 1:
+            descartadas = self._claves[1::2]
+            self._claves = self._claves[::2]
+            self.bytes_usados -= sum(len(clave) for clave in descartadas)
+            self.intervalo_claves *= 2
+            self._podar_bloques_rng()
+            return True
+        return False
+
+    def _podar_bloques_rng(self):
+        """Quita los bloques del generador que no usa ninguna cabecera y renumera el resto."""
+        cabeceras = self._marcas + self._claves + [self._base] + [self._abierta.cabecera if self._abierta else None]
+        usados = sorted({_bloque_rng(datos) for datos in cabeceras if datos is not None})
+        if len(usados) == len(self._bloques_rng):
+            return
+        self.bytes_usados -= (len(self._bloques_rng) - len(usados)) * _PALABRAS_RNG * 4
+        self._bloques_rng = [self._bloques_rng[bloque] for bloque in usados]
+        nuevos = {bloque: indice for indice, bloque in enumerate(usados)}
+
+        def renumerar(datos):
+            if datos is None:
+                return None
+            reloj, bloque, indice, tamano_cola = _CABECERA.unpack_from(datos)
+            return _CABECERA.pack(reloj, nuevos[bloque], indice, tamano_cola) + datos[_CABECERA.size:]
+
+        self._marcas = [renumerar(datos) for datos in self._marcas]
+        self._claves = [renumerar(datos) for datos in self._claves]
+        self._base = renumerar(self._base)
+        if self._abierta is not None:
+            self._abierta.cabecera = renumerar(self._abierta.cabecera)
+
+    def _plegar(self, foto, marca, cabecera_siguiente):
+        """Foto del estado tras aplicar los cambios de una marca a otra foto."""
+        piezas = self._leer_foto(foto)
+        for codigo, id_pieza, datos in self._leer_cambios(marca, self._tamano_cabecera(marca)):
+            if codigo == _MOVER:
+                piezas[id_pieza][0:2] = datos[2:4]
+            elif codigo == _DANO:
+                piezas[id_pieza][2] -= datos[0]
+            elif codigo == _MUERTE:
+                del piezas[id_pieza]
+            else:
+                piezas[id_pieza][3] = datos[1]
+        return self._escribir_foto(cabecera_siguiente, piezas)
+
+    # --- Empaquetado ---
+
+    def _cabecera_actual(self):
+        version, estado, gauss = self.turn_manager.rng.getstate()
+        palabras = array('I', estado[:-1])
+        if not self._bloques_rng or self._bloques_rng[-1] != palabras:
+            self._bloques_rng.append(palabras)
+            self.bytes_usados += len(palabras) * palabras.itemsize
+        cola = self.turn_queue.ids()
+        return (_CABECERA.pack(self.turn_manager.reloj, len(self._bloques_rng) - 1, estado[-1], len(cola))
+                + b''.join(_ID.pack(id_pieza) for id_pieza in cola))
+
+    def _tamano_cabecera(self, datos):
+        return _CABECERA.size + _ID.size * datos[_CABECERA.size - 1]
+
+    def _restaurar_cabecera(self, datos):
+        """Restaura reloj y generador; devuelve los ids de la cola."""
+        reloj, bloque, indice, tamano_cola = _CABECERA.unpack_from(datos)
+        self.turn_manager.reloj = reloj
+        self.turn_manager.rng.setstate((3, tuple(self._bloques_rng[bloque]) + (indice,), None))
+        return [_ID.unpack_from(datos, _CABECERA.size + _ID.size * i)[0] for i in range(tamano_cola)]
+
+    def _leer_cambios(self, datos, inicio=0):
+        cambios = []
+        desplazamiento = inicio
+        while desplazamiento < len(datos):
+            formato = _FORMATOS[datos[desplazamiento]]
+            codigo, id_pieza, *resto = formato.unpack_from(datos, desplazamiento)
+            cambios.append((codigo, id_pieza, resto))
+            desplazamiento += formato.size
+        return cambios
+
+    def _foto_actual(self, cabecera):
+        piezas = {pieza.id_pieza: [*pieza.posicion, pieza.hp, pieza.proximo_turno]
+                  for pieza in self.turn_manager.registro}
+        return self._escribir_foto(cabecera, piezas)
+
+    def _escribir_foto(self, cabecera, piezas):
+        return cabecera + b''.join(_PIEZA_FOTO.pack(id_pieza, *valores) for id_pieza, valores in piezas.items())
+
+    def _leer_foto(self, foto):
+        return {id_pieza: [fila, col, hp, proximo]
+                for id_pieza, fila, col, hp, proximo in _PIEZA_FOTO.iter_unpack(foto[self._tamano_cabecera(foto):])}
+
+    # --- Aplicación sobre la partida ---
+
+    def _aplicar(self, tablero, cambios, hacia_atras):
+        for codigo, id_pieza, datos in (reversed(cambios) if hacia_atras else cambios):
+            pieza = self._piezas[id_pieza]
+            if codigo == _MOVER:
+                fila_origen, col_origen, fila, col = datos
+                if hacia_atras:
+                    fila_origen, col_origen, fila, col = fila, col, fila_origen, col_origen
+                tablero[fila_origen][col_origen] = None
+                tablero[fila][col] = pieza
+                pieza.posicion = (fila, col)
+            elif codigo == _DANO:
+                pieza.hp += datos[0] if hacia_atras else -datos[0]
+            elif codigo == _MUERTE:
+                fila, col = datos
+                tablero[fila][col] = pieza if hacia_atras else None
+                pieza.posicion = (fila, col)
+            else:
+                pieza.proximo_turno = datos[0] if hacia_atras else datos[1]
+
+    def _aplicar_foto(self, tablero, foto):
+        for fila in tablero:
+            fila[:] = [None] * len(fila)
+        for id_pieza, (fila, col, hp, proximo) in self._leer_foto(foto).items():
+            pieza = self._piezas[id_pieza]
+            pieza.posicion = (fila, col)
+            pieza.hp = hp
+            pieza.proximo_turno = proximo
+            tablero[fila][col] = pieza
+
+    def _recolocar_piezas(self, tablero):
+        """Sincroniza el turn_manager con las piezas que quedan en el tablero."""
+        piezas = [pieza for fila in tablero for pieza in fila if pieza is not None]
+        self.turn_manager.restaurar_piezas(sorted(piezas, key=lambda pieza: pieza.id_pieza))
+
+    # --- Guardado (ver save_game.py) ---
+
+    def piezas_conocidas(self):
+        """Todas las piezas a las que puede referirse el historial, vivas o no."""
+        return list(self._piezas.values())
+
+    def exportar(self):
+        """Serializa el historial completo (ya está empaquetado: solo se concatena)."""
+        partes = [_ESTADO.pack(self.presupuesto_bytes, self.intervalo_claves, self._plegados,
+                               self._posicion, len(self._bloques_rng), len(self._marcas), len(self._claves))]
+        partes.extend(bloque.tobytes() for bloque in self._bloques_rng)
+        blobs = list(self._marcas) + list(self._claves) + [self._base or b'']
+        if self._abierta is not None:
+            blobs += [self._abierta.cabecera, bytes(self._abierta.cambios)]
+        for blob in blobs:
+            partes.append(_LONGITUD.pack(len(blob)))
+            partes.append(blob)
+        return b''.join(partes)
+
+    def importar(self, datos, piezas):
+        """Restaura un historial exportado; `piezas` son todas las piezas por id."""
+        (self.presupuesto_bytes, self.intervalo_claves, self._plegados, self._posicion,
+         n_bloques, n_marcas, n_claves) = _ESTADO.unpack_from(datos)
+        desplazamiento = _ESTADO.size
+        self._bloques_rng = []
+        for _ in range(n_bloques):
+            bloque = array('I')
+            bloque.frombytes(datos[desplazamiento:desplazamiento + _PALABRAS_RNG * bloque.itemsize])
+            self._bloques_rng.append(bloque)
+            desplazamiento += _PALABRAS_RNG * bloque.itemsize
+
+        blobs = []
+        while desplazamiento < len(datos):
+            (longitud,) = _LONGITUD.unpack_from(datos, desplazamiento)
+            desplazamiento += _LONGITUD.size
+            blobs.append(bytes(datos[desplazamiento:desplazamiento + longitud]))
+            desplazamiento += longitud
+
+        self._marcas = blobs[:n_marcas]
+        self._claves = blobs[n_marcas:n_marcas + n_claves]
+        self._base = blobs[n_marcas + n_claves] or None
+        self._abierta = None
+        if len(blobs) > n_marcas + n_claves + 1:
+            cabecera, cambios = blobs[n_marcas + n_claves + 1:]
+            self._abierta = MarcaTurno(cabecera)
+            self._abierta.cambios += cambios
+        self._piezas = {pieza.id_pieza: pieza for pieza in piezas}
+        self.bytes_usados = (sum(map(len, self._marcas)) + sum(map(len, self._claves))
+                             + len(self._base or b'') + len(self._bloques_rng) * _PALABRAS_RNG * 4)
+
+    # --- Deshacer / rehacer ---
+
+    def puede_deshacer(self):
+        """Hay algún turno anterior al actual (con deltas o en una clave)."""
+        return self._abierta is not None and len(self) > 0
+
+    def puede_rehacer(self):
+        return (self._abierta is not None and not self._abierta.cambios
+                and (self._posicion < 0 or self._posicion + 1 < len(self._marcas)))
+
+    def deshacer(self, tablero):
+        """
+        Vuelve al inicio del turno anterior: revierte lo hecho en el turno en
+        curso y en el anterior (o salta al fotograma clave anterior) y restaura
+        el reloj, el generador y las piezas del turn_manager. Devuelve los ids
+        de la cola a restaurar, o None si no hay turno anterior: quien llama
+        emite después 'deshacer' y llama a turn_queue.restaurar(ids).
+        """
+        if not self.puede_deshacer():
+            return None
+        abierta = self._abierta
+        self._abierta = None
+        if abierta.cambios:
+            self._aplicar(tablero, self._leer_cambios(abierta.cambios), hacia_atras=True)
+
+        if self._posicion > 0:
+            if self._posicion == len(self._marcas):
+                # Marca solo con la cabecera, para poder rehacer hasta este turno.
+                self._guardar_marca(abierta.cabecera)
+            self._posicion -= 1
+            marca = self._marcas[self._posicion]
+            self._aplicar(tablero, self._leer_cambios(marca, self._tamano_cabecera(marca)), hacia_atras=True)
+            self._recolocar_piezas(tablero)
+            return self._restaurar_cabecera(marca)
+
+        if self._posicion == 0 and not self._marcas:
+            self._guardar_marca(abierta.cabecera)
+        self._posicion -= 1
+        clave = self._claves[len(self._claves) + self._posicion]
+        self._aplicar_foto(tablero, clave)
+        self._recolocar_piezas(tablero)
+        return self._restaurar_cabecera(clave)
+
+    def rehacer(self, tablero):
+        """Inverso de deshacer(): avanza al inicio del turno siguiente ya jugado."""
+        if not self.puede_rehacer():
+            return None
+        self._abierta = None
+        self._posicion += 1
+
+        if self._posicion <= 0:
+            foto = self._claves[len(self._claves) + self._posicion] if self._posicion < 0 else self._base
+            self._aplicar_foto(tablero, foto)
+            self._recolocar_piezas(tablero)
+            return self._restaurar_cabecera(foto)
+
+        marca = self._marcas[self._posicion - 1]
+        self._aplicar(tablero, self._leer_cambios(marca, self._tamano_cabecera(marca)), hacia_atras=False)
+        self._recolocar_piezas(tablero)
+        return self._restaurar_cabecera(self._marcas[self._posicion])
@@ -0,0 +1,157 @@
+"""
+Hash Zobrist de posiciones y caché LRU de generación de movimientos.
+
+La posición es el contenido del tablero más, por cada pieza, su HP y sus
+banderas ha_movido/ha_atacado, y el reloj del planificador. El hash de 64 bits
+se actualiza de forma incremental con los eventos de la partida.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+from .logic import calcular_casillas_posibles, calcular_ataques_posibles
+
+MASCARA_64 = (1 << 64) - 1
+
+# Claves generadas bajo demanda, memorizadas por sus partes
+_CLAVES = {}
+
+
+def clave_zobrist(*partes):
+    """
+    Clave aleatoria de 64 bits para una combinación de partes, p.ej. ('hp', fila, col, 5).
+    Se deriva con blake2b, así es la misma en todas las ejecuciones (útil para
+    comparar hashes entre partidas guardadas o repeticiones).
+    """
+    clave = _CLAVES.get(partes)
+    if clave is None:
+        resumen = hashlib.blake2b(repr(partes).encode('utf-8'), digest_size=8).digest()
+        clave = int.from_bytes(resumen, 'little')
+        _CLAVES[partes] = clave
+    return clave
+
+
+def aporte_pieza(pieza):
+    """Parte del hash que corresponde a una pieza en su casilla actual."""
+    fila, col = pieza.posicion
+    valor = clave_zobrist('pieza', fila, col, pieza.nombre, pieza.jugador)
+    valor ^= clave_zobrist('hp', fila, col, pieza.hp)
+    if pieza.ha_movido:
+        valor ^= clave_zobrist('movido', fila, col)
+    if pieza.ha_atacado:
+        valor ^= clave_zobrist('atacado', fila, col)
+    return valor
+
+
+def hash_posicion(tablero, reloj=0):
+    """Calcula el hash de una posición desde cero."""
+    valor = clave_zobrist('reloj', reloj)
+    for fila in tablero:
+        for pieza in fila:
+            if pieza is not None:
+                valor ^= aporte_pieza(pieza)
+    return valor
+
+
+class HashZobrist:
+    """
+    Hash de la posición de la partida, mantenido por eventos.
+    Guarda el aporte de cada pieza para poder retirarlo con un XOR cuando cambia.
+    """
+    def __init__(self, tablero, reloj=0):
+        self.reloj = reloj
+        self.reconstruir(tablero)
+
+    def conectar(self, eventos):
+        """Se suscribe al BusEventos de la partida."""
+        eventos.suscribir('movimiento', lambda pieza, origen, destino: self.actualizar_pieza(pieza))
+        eventos.suscribir('dano', lambda pieza, cantidad: self.actualizar_pieza(pieza))
+        eventos.suscribir('muerte', lambda pieza, casilla: self.quitar_pieza(pieza))
+        eventos.suscribir('ataque', lambda pieza, objetivo: self.actualizar_pieza(pieza))
+        eventos.suscribir('turno', self._al_iniciar_turno)
+        eventos.suscribir('deshacer', self.reconstruir)
+
+    def reconstruir(self, tablero):
+        self._aportes = {}
+        self.valor = clave_zobrist('reloj', self.reloj)
+        for fila in tablero:
+            for pieza in fila:
+                if pieza is not None:
+                    aporte = aporte_pieza(pieza)
+                    self._aportes[pieza] = aporte
+                    self.valor ^= aporte
+
+    def actualizar_pieza(self, pieza):
+        nuevo = aporte_pieza(pieza)
+        self.valor ^= self._aportes.get(pieza, 0) ^ nuevo
+        self._aportes[pieza] = nuevo
+
+    def quitar_pieza(self, pieza):
+        self.valor ^= self._aportes.pop(pieza, 0)
+
+    def fijar_reloj(self, reloj):
+        self.valor ^= clave_zobrist('reloj', self.reloj) ^ clave_zobrist('reloj', reloj)
+        self.reloj = reloj
+
+    def _al_iniciar_turno(self, pieza, reloj):
+        self.fijar_reloj(reloj)
+        self.actualizar_pieza(pieza)
+
+
+class CacheReglasLRU:
+    """
+    Caché LRU de calcular_casillas_posibles / calcular_ataques_posibles.
+    La clave es (hash, casilla de la pieza, tipo de consulta): con el hash de
+    la posición, la casilla identifica a la pieza aunque sea una copia
+    (p.ej. tras deshacer), así que las posiciones repetidas aciertan.
+    """
+    def __init__(self, capacidad=4096):
+        self.capacidad = capacidad
+        self._entradas = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def _consultar(self, clave, calcular):
+        entradas = self._entradas
+        resultado = entradas.get(clave)
+        if resultado is not None:
+            entradas.move_to_end(clave)
+            self.aciertos += 1
+            return list(resultado)
+
+        self.fallos += 1
+        resultado = calcular()
+        entradas[clave] = tuple(resultado)
+        if len(entradas) > self.capacidad:
+            entradas.popitem(last=False)
+        return resultado
+
+    def movimientos(self, pieza, tablero, hash_posicion, bitboard=None):
+        return self._consultar(
+            (hash_posicion, pieza.posicion, 'mov'),
+            lambda: calcular_casillas_posibles(pieza, tablero, bitboard)
+        )
+
+    def ataques(self, pieza, tablero, hash_posicion, bitboard=None):
+        return self._consultar(
+            (hash_posicion, pieza.posicion, 'atk'),
+            lambda: calcular_ataques_posibles(pieza, tablero, bitboard)
+        )
+
+    def tasa_aciertos(self):
+        total = self.aciertos + self.fallos
+        return self.aciertos / total if total else 0.0
+
+    def estadisticas(self):
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': self.tasa_aciertos(),
+            'entradas': len(self._entradas),
+            'capacidad': self.capacidad,
+        }
+
+    def limpiar(self):
+        self._entradas.clear()
+        self.aciertos = 0
+        self.fallos = 0
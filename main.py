@@ -14,18 +14,24 @@ from game.constants import *
 from game import constants
 from game.menu import mostrar_menu
 from game.tutorial import mostrar_tutorial
-from game.game_setup import crear_nuevo_juego
+from game.game_setup import crear_nuevo_juego, crear_estructuras_partida, GeneradorPartida
 from game.turn_manager import TurnManager
 from game.turn_queue import TurnQueue
+from game.undo_log import HistorialDeshacer
+from game.save_game import cargar_partida, FormatoPartidaError
+from game.replay import GrabadorRepeticion, nueva_ruta_repeticion
+from game.turn_actions import puede_mover, puede_atacar
 from game.assets import cargar_svgs
 from game.audio import init_audio, get_audio
-from game.ai_rival import AIController
+from game.ai_rival import AIController, NIVEL_POR_DEFECTO
 
 # Importar estados del juego
 from game.states import (
     manejar_estado_en_juego,
     manejar_estado_confirmar_salir,
-    manejar_estado_fin_juego
+    manejar_estado_fin_juego,
+    manejar_estado_cargar_partida,
+    manejar_estado_repeticion
 )
 
 
@@ -41,6 +47,32 @@ def pausar_al_salir():
 atexit.register(pausar_al_salir)
 
 
+def preparar_datos_en_juego(tablero, turn_manager, turn_queue, historial_turnos, ai_agent):
+    """Crea las estructuras de la partida, las conecta al bus de eventos y devuelve datos_en_juego."""
+    datos_en_juego = {
+        'pieza_activa': None,
+        'movimientos_resaltados': [],
+        'ataques_resaltados': [],
+        'ganador': None,
+        'animacion_en_curso': None,
+        'superficie_blur': None,
+        'ai_agent': ai_agent
+    }
+    datos_en_juego.update(crear_estructuras_partida(tablero, turn_manager.reloj))
+    turn_manager.conectar(datos_en_juego['eventos'])
+    turn_queue.conectar(datos_en_juego['eventos'])
+    historial_turnos.conectar(datos_en_juego['eventos'])
+    return datos_en_juego
+
+
+def empezar_grabacion(turn_manager, turn_queue, historial_turnos, datos_en_juego, turno_empezado=False):
+    """Empieza a grabar la repetición de la partida (se escribe en segundo plano)."""
+    grabador = GrabadorRepeticion(nueva_ruta_repeticion(), turn_manager, turn_queue, historial_turnos,
+                                  vs_ia=datos_en_juego['ai_agent'] is not None, turno_empezado=turno_empezado)
+    grabador.conectar(datos_en_juego['eventos'])
+    return grabador
+
+
 def main():
     """Función principal del juego"""
     
@@ -165,7 +197,9 @@ def main():
     tablero = None
     turn_manager = None
     turn_queue = None
-    historial_turnos = []
+    historial_turnos = None
+    grabador = None
+    ruta_repeticion = None
     numeros_flotantes = []
     animaciones_muerte = []
     CACHE_IMAGENES = {}
@@ -195,38 +229,64 @@ def main():
         if estado_juego == 'menu_principal':
             estado_juego, pantalla, es_fullscreen = mostrar_menu(pantalla, fuente_menu, es_fullscreen)
         
-            gamemode_ai = estado_juego in ('en_juego_vs_ia', 'en_juego_ia')
+            gamemode_ai = estado_juego in ('en_juego_vs_ia', 'en_juego_vs_ia_mcts', 'en_juego_ia')
+            motor_ia = 'mcts' if estado_juego == 'en_juego_vs_ia_mcts' else 'alfa_beta'
 
             # Si el usuario inicia un juego nuevo, inicializar todo
             if estado_juego == 'en_juego' or gamemode_ai:
+                rng_partida = GeneradorPartida()
                 tablero = crear_nuevo_juego()
-                turn_manager = TurnManager(tablero)
+                turn_manager = TurnManager(tablero, rng_partida)
                 turn_queue = TurnQueue(turn_manager)
-                historial_turnos = []
+                historial_turnos = HistorialDeshacer(turn_manager, turn_queue)
                 numeros_flotantes = []
                 animaciones_muerte = []
 
                 # Configurar IA
                 ai_agent = None
                 if gamemode_ai:
-                    ai_agent = AIController(team_id=2)
+                    ai_agent = AIController(team_id=2, rng=rng_partida, nivel=NIVEL_POR_DEFECTO, motor=motor_ia)
                 
                 # Resetear datos del estado en_juego
-                datos_en_juego = {
-                    'pieza_activa': None,
-                    'movimientos_resaltados': [],
-                    'ataques_resaltados': [],
-                    'ganador': None,
-                    'animacion_en_curso': None,
-                    'superficie_blur': None,
-                    'ai_agent': ai_agent
-                }
+                datos_en_juego = preparar_datos_en_juego(tablero, turn_manager, turn_queue, historial_turnos, ai_agent)
+                grabador = empezar_grabacion(turn_manager, turn_queue, historial_turnos, datos_en_juego)
 
                 estado_juego = 'en_juego'
                 # Forzar música de batalla al iniciar partida
                 audio.set_music_mode('battle')
                 continue
         
+        # ===== CARGAR PARTIDA =====
+        elif estado_juego == 'cargar_partida':
+            estado_juego, ruta = manejar_estado_cargar_partida(pantalla, fuente_menu, fuente_ui)
+            if ruta is not None:
+                try:
+                    partida = cargar_partida(ruta)
+                except (OSError, FormatoPartidaError) as error:
+                    print(f"No se pudo cargar {ruta}: {error}")
+                    estado_juego = 'cargar_partida'
+                    continue
+                tablero = partida['tablero']
+                turn_manager = partida['turn_manager']
+                turn_queue = partida['turn_queue']
+                historial_turnos = partida['historial']
+                numeros_flotantes = []
+                animaciones_muerte = []
+                ai_agent = AIController(team_id=2, rng=partida['rng'], nivel=NIVEL_POR_DEFECTO,
+                                        motor=partida['motor_ia']) if partida['vs_ia'] else None
+                datos_en_juego = preparar_datos_en_juego(tablero, turn_manager, turn_queue, historial_turnos, ai_agent)
+                
+                # Si se guardó a mitad de turno, se sigue con la misma pieza y sus acciones restantes
+                pieza_activa = turn_queue.get_current_piece()
+                if partida['turno_empezado'] and pieza_activa is not None:
+                    mapa_alcance = datos_en_juego['mapa_alcance']
+                    datos_en_juego['pieza_activa'] = pieza_activa
+                    datos_en_juego['movimientos_resaltados'] = mapa_alcance.movimientos(pieza_activa) if puede_mover(pieza_activa) else []
+                    datos_en_juego['ataques_resaltados'] = mapa_alcance.ataques(pieza_activa) if puede_atacar(pieza_activa) else []
+                grabador = empezar_grabacion(turn_manager, turn_queue, historial_turnos, datos_en_juego,
+                                             turno_empezado=datos_en_juego['pieza_activa'] is not None)
+                print(f"Partida cargada: {ruta}")
+        
         # ===== EN JUEGO =====
         elif estado_juego == 'en_juego':
             estado_juego, datos_en_juego = manejar_estado_en_juego(
@@ -242,6 +302,11 @@ def main():
                 fuente_damage,
                 datos_en_juego
             )
+            if estado_juego in ('fin_del_juego', 'saliendo') and grabador is not None:
+                grabador.cerrar(datos_en_juego['ganador'])
+                ruta_repeticion = grabador.ruta
+            if estado_juego in ('fin_del_juego', 'saliendo') and datos_en_juego['ai_agent'] is not None:
+                datos_en_juego['ai_agent'].cerrar()
         
         # ===== CONFIRMACIÓN DE SALIR =====
         elif estado_juego == 'confirmacion_salir':
@@ -251,6 +316,10 @@ def main():
                 fuente_menu,
                 fuente_ui
             )
+            if estado_juego in ('menu_principal', 'saliendo') and grabador is not None:
+                grabador.cerrar()
+            if estado_juego in ('menu_principal', 'saliendo') and datos_en_juego['ai_agent'] is not None:
+                datos_en_juego['ai_agent'].cerrar()
         
         # ===== TUTORIAL =====
         elif estado_juego == 'tutorial':
@@ -262,11 +331,21 @@ def main():
                 pantalla,
                 datos_en_juego['ganador'],
                 fuente_menu,
-                fuente_ui
+                fuente_ui,
+                ruta_repeticion,
+                CACHE_IMAGENES,
+                fuente_hp
             )
         
+        # ===== REPETICIÓN =====
+        elif estado_juego == 'repeticion':
+            estado_juego = manejar_estado_repeticion(pantalla, ruta_repeticion, CACHE_IMAGENES, fuente_hp, fuente_ui,
+                                                     estado_al_salir='fin_del_juego')
+        
         # ===== SALIR =====
         elif estado_juego == 'saliendo':
+            if grabador is not None:
+                grabador.cerrar()
             break
     
     # --- SALIDA LIMPIA ---